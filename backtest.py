@@ -0,0 +1,203 @@
+from typing import NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class BacktestResult(NamedTuple):
+    """
+    Outcome of a backtest, aligned with the rows of the input data.
+    """
+    position: np.ndarray  # Position held during each bar
+    equity: np.ndarray    # Equity marked to market at each close
+    trades: pd.DataFrame  # One row per trade
+
+
+TRADE_COLUMNS = ["entry_time", "exit_time", "direction", "size", "entry_price", "exit_price", "pnl", "bars", "closed"]
+
+
+def run_backtest(
+    df: pd.DataFrame,
+    signals: np.ndarray,
+    size: float = 1.0,
+    commission: float = 0.0,
+    slippage: float = 0.0,
+    stop_loss: Optional[float] = None,
+    take_profit: Optional[float] = None,
+    initial_equity: float = 0.0
+) -> BacktestResult:
+    """
+    Run a strategy's signals over OHLC data.
+
+    ``signals[i]`` is the position wanted after the close of bar ``i``
+    (1 long, -1 short, 0 flat; NaN counts as flat); it is filled at the open
+    of bar ``i + 1``, so a strategy can never trade on the bar it looked at.
+    Positions are always entered and left as a whole, so every trade is
+    charged the same costs as the equity curve; the quantity is set with
+    ``size``.
+    Without stops the whole computation is vectorized; stop-loss and
+    take-profit exits depend on the path inside each trade and use the
+    event-driven loop instead.
+
+    Args:
+        df: DataFrame with columns Time, Open, High, Low, Close
+        signals: Target position per bar (-1, 0 or 1), same length as ``df``
+        size: Quantity traded for a position of 1
+        commission: Cost per unit traded, in price units
+        slippage: Price penalty per unit traded, in price units
+        stop_loss: Distance from the entry price that closes a losing trade
+        take_profit: Distance from the entry price that closes a winning trade
+        initial_equity: Equity before the first bar
+
+    Returns:
+        BacktestResult with positions, equity curve and trades
+    """
+    signals = np.nan_to_num(np.asarray(signals, dtype=np.float64))
+    if len(signals) != len(df):
+        raise ValueError(f"Expected {len(df)} signals, got {len(signals)}")
+    invalid = ~np.isin(signals, (-1.0, 0.0, 1.0))
+    if invalid.any():
+        row = int(np.argmax(invalid))
+        raise ValueError(f"Signals must be -1, 0 or 1, got {signals[row]} at row {row}")
+
+    prices = {name: df[name].to_numpy(dtype=np.float64) for name in ("Open", "High", "Low", "Close")}
+    times = df["Time"].to_numpy()
+
+    if stop_loss is None and take_profit is None:
+        return _run_vectorized(prices, times, signals, size, commission, slippage, initial_equity)
+    return _run_event_driven(prices, times, signals, size, commission, slippage, stop_loss, take_profit, initial_equity)
+
+
+def _run_vectorized(prices, times, signals, size, commission, slippage, initial_equity) -> BacktestResult:
+    """Backtest without stops: positions, PnL and trades as array operations."""
+    opens, closes = prices["Open"], prices["Close"]
+    count = len(opens)
+
+    # Orders are filled at the next open
+    position = np.concatenate(([0.0], signals[:-1]))
+    previous = np.concatenate(([0.0], position[:-1]))
+    previous_close = np.concatenate((opens[:1], closes[:-1]))
+
+    # Gap between the previous close and this open, then the bar itself
+    pnl = previous * (opens - previous_close) + position * (closes - opens)
+    costs = np.abs(position - previous) * (commission + slippage)
+    equity = initial_equity + np.cumsum((pnl - costs) * size)
+
+    # A trade is a run of bars with the same non-zero position
+    starts = np.flatnonzero(position != previous)
+    ends = np.concatenate((starts[1:], [count]))
+    held = position[starts] != 0
+    starts, ends = starts[held], ends[held]
+    direction = position[starts]
+
+    closed = ends < count
+    exit_rows = np.minimum(ends, count - 1)
+    sign = np.sign(direction)
+    entry_price = opens[starts] + sign * slippage
+    exit_price = np.where(closed, opens[exit_rows] - sign * slippage, closes[exit_rows])
+    trade_costs = np.abs(direction) * commission * np.where(closed, 2, 1)
+    trade_pnl = (direction * (exit_price - entry_price) - trade_costs) * size
+
+    trades = pd.DataFrame({
+        "entry_time": times[starts],
+        "exit_time": times[exit_rows],
+        "direction": direction,
+        "size": np.abs(direction) * size,
+        "entry_price": entry_price,
+        "exit_price": exit_price,
+        "pnl": trade_pnl,
+        "bars": ends - starts,
+        "closed": closed,
+    }, columns=TRADE_COLUMNS)
+
+    return BacktestResult(position=position, equity=equity, trades=trades)
+
+
+def _run_event_driven(prices, times, signals, size, commission, slippage, stop_loss, take_profit,
+                      initial_equity) -> BacktestResult:
+    """Backtest bar by bar, for exits that depend on the path inside a trade."""
+    opens, highs = prices["Open"].tolist(), prices["High"].tolist()
+    lows, closes = prices["Low"].tolist(), prices["Close"].tolist()
+    signal_list = signals.tolist()
+    count = len(opens)
+    unit_cost = commission + slippage
+
+    position = np.zeros(count)
+    equity = np.empty(count)
+    trades = []
+
+    held = 0.0
+    entry_row = 0
+    entry_open = 0.0
+    cash = initial_equity
+    last_close = opens[0] if count else 0.0
+    # After a stop, stay flat until the strategy asks for another position
+    stopped_signal = None
+
+    def record_trade(row: int, price: float, closed: bool) -> None:
+        sign = 1.0 if held > 0 else -1.0
+        entry_price = entry_open + sign * slippage
+        exit_price = price - sign * slippage if closed else price
+        cost = abs(held) * commission * (2 if closed else 1)
+        trades.append((
+            times[entry_row], times[row], held, abs(held) * size, entry_price, exit_price,
+            (held * (exit_price - entry_price) - cost) * size,
+            row - entry_row + (0 if closed else 1), closed
+        ))
+
+    for row in range(count):
+        open_price = opens[row]
+        pnl = held * (open_price - last_close)
+
+        # Fill the order of the previous bar at this open
+        target = signal_list[row - 1] if row else 0.0
+        if stopped_signal is not None:
+            if target == stopped_signal:
+                target = 0.0
+            else:
+                stopped_signal = None
+        if target != held:
+            if held:
+                record_trade(row, open_price, True)
+            pnl -= abs(target - held) * unit_cost
+            if target:
+                entry_row, entry_open = row, open_price
+            held = target
+        position[row] = held
+
+        # Stop-loss first (conservative when both levels are touched), then take-profit
+        exit_price = None
+        if held:
+            sign = 1.0 if held > 0 else -1.0
+            adverse = lows[row] if sign > 0 else highs[row]
+            favorable = highs[row] if sign > 0 else lows[row]
+            if stop_loss is not None:
+                level = entry_open - sign * stop_loss
+                if sign * (adverse - level) <= 0:
+                    # A gap through the level fills at the open
+                    exit_price = open_price if sign * (open_price - level) <= 0 else level
+            if exit_price is None and take_profit is not None:
+                level = entry_open + sign * take_profit
+                if sign * (favorable - level) >= 0:
+                    exit_price = open_price if sign * (open_price - level) >= 0 else level
+
+        if exit_price is not None:
+            record_trade(row, exit_price, True)
+            pnl += held * (exit_price - open_price) - abs(held) * unit_cost
+            stopped_signal = target
+            held = 0.0
+        else:
+            pnl += held * (closes[row] - open_price)
+
+        last_close = closes[row]
+        cash += pnl * size
+        equity[row] = cash
+
+    if held:
+        record_trade(count - 1, closes[-1], False)
+
+    return BacktestResult(
+        position=position,
+        equity=equity,
+        trades=pd.DataFrame(trades, columns=TRADE_COLUMNS)
+    )
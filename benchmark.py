@@ -0,0 +1,410 @@
+"""
+Headless rendering benchmark of ``utils.DragZoomApp``.
+
+Every run builds the chart on synthetic OHLC data (see ``synthetic``) of
+increasing size and times the construction, ``initialize_chart``, full
+redraws and sequences of wheel zooms, drag zooms and pans (each event
+followed by the redraw frame it schedules). Results are written as JSON
+so that two runs can be compared.
+
+By default the Tk canvases are replaced by a recording stub, so no display
+is needed and the timings cover the Python side of the pipeline (data
+access, coordinate math and the number of Tk calls). ``--backend tk`` uses
+real Tk widgets instead, which needs a display.
+
+Usage:
+    python benchmark.py --rows 1000 100000 1000000 --output bench.json
+    python benchmark.py --rows 1000 100000 --compare bench.json
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tkinter as tk
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import utils
+from synthetic import generate_ohlcv
+
+
+DEFAULT_ROWS = [1_000, 10_000, 100_000, 1_000_000]
+
+# Size of the chart area
+CANVAS_WIDTH = 1100
+CANVAS_HEIGHT = 700
+
+
+class StubCanvas:
+    """
+    Stand-in for ``tk.Canvas`` that records items instead of drawing them.
+
+    Only the methods used by the chart are implemented. Items are kept as
+    ``[kind, coords, options]`` so that moves and scales cost about what
+    they cost in Tk's own bookkeeping, and every call is counted.
+    """
+
+    def __init__(self, master: Any = None, width: int = CANVAS_WIDTH, height: int = CANVAS_HEIGHT, **options: Any):
+        self.width = width
+        self.height = height
+        self.items: Dict[int, List[Any]] = {}
+        self.calls = 0
+        self._next_id = 0
+
+    def _create(self, kind: str, coords: tuple, options: Dict[str, Any]) -> int:
+        self.calls += 1
+        self._next_id += 1
+        if len(coords) == 1:
+            coords = coords[0]
+        tags = options.get("tags", ())
+        options["tags"] = (tags,) if isinstance(tags, str) else tuple(tags)
+        self.items[self._next_id] = [kind, list(coords), options]
+        return self._next_id
+
+    def create_line(self, *coords: Any, **options: Any) -> int:
+        return self._create("line", coords, options)
+
+    def create_rectangle(self, *coords: Any, **options: Any) -> int:
+        return self._create("rectangle", coords, options)
+
+    def create_text(self, *coords: Any, **options: Any) -> int:
+        return self._create("text", coords, options)
+
+    def _find(self, tag: Any) -> List[int]:
+        if tag == "all":
+            return list(self.items)
+        if isinstance(tag, int):
+            return [tag] if tag in self.items else []
+        return [item for item, (_, _, options) in self.items.items() if tag in options["tags"]]
+
+    def find_withtag(self, tag: Any) -> List[int]:
+        return self._find(tag)
+
+    def find_all(self) -> List[int]:
+        return list(self.items)
+
+    def coords(self, tag: Any, *coords: Any) -> List[float]:
+        self.calls += 1
+        found = self._find(tag)
+        if not found:
+            return []
+        if coords:
+            self.items[found[0]][1] = list(coords[0] if len(coords) == 1 else coords)
+        return self.items[found[0]][1]
+
+    def itemconfig(self, tag: Any, **options: Any) -> None:
+        self.calls += 1
+        for item in self._find(tag):
+            self.items[item][2].update(options)
+
+    itemconfigure = itemconfig
+
+    def delete(self, *tags: Any) -> None:
+        self.calls += 1
+        for tag in tags:
+            for item in self._find(tag):
+                del self.items[item]
+
+    def move(self, tag: Any, dx: float, dy: float) -> None:
+        self.calls += 1
+        for item in self._find(tag):
+            coords = self.items[item][1]
+            coords[0::2] = [x + dx for x in coords[0::2]]
+            coords[1::2] = [y + dy for y in coords[1::2]]
+
+    def scale(self, tag: Any, x_origin: float, y_origin: float, x_scale: float, y_scale: float) -> None:
+        self.calls += 1
+        for item in self._find(tag):
+            coords = self.items[item][1]
+            coords[0::2] = [x_origin + (x - x_origin) * x_scale for x in coords[0::2]]
+            coords[1::2] = [y_origin + (y - y_origin) * y_scale for y in coords[1::2]]
+
+    def winfo_width(self) -> int:
+        return self.width
+
+    def winfo_height(self) -> int:
+        return self.height
+
+    def _ignore(self, *args: Any, **options: Any) -> None:
+        self.calls += 1
+
+    bind = tag_bind = tag_raise = tag_lower = grid = destroy = _ignore
+
+
+class StubRoot:
+    """Stand-in for ``tk.Tk``; scheduled callbacks are kept but never run."""
+
+    def __init__(self):
+        self.scheduled = 0
+
+    def after(self, delay_ms: int, callback: Optional[Callable] = None, *args: Any) -> str:
+        self.scheduled += 1
+        return f"after#{self.scheduled}"
+
+    def after_idle(self, callback: Callable, *args: Any) -> str:
+        return self.after(0, callback, *args)
+
+    def after_cancel(self, job: str) -> None:
+        pass
+
+    def winfo_toplevel(self) -> "StubRoot":
+        return self
+
+    def _ignore(self, *args: Any, **options: Any) -> None:
+        pass
+
+    columnconfigure = rowconfigure = bind = title = geometry = withdraw = update = destroy = _ignore
+
+
+@contextmanager
+def headless() -> Iterator[None]:
+    """Replace ``tk.Canvas`` by ``StubCanvas`` for the widgets created inside the block."""
+    with mock.patch.object(tk, "Canvas", StubCanvas):
+        yield
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident memory of the process in MB, if the platform reports it."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def summarize(durations: List[float]) -> Dict[str, float]:
+    """
+    Summarize the latencies of a phase.
+
+    Args:
+        durations: Durations in seconds
+
+    Returns:
+        Dict with count, mean, p50, p95 and max, in milliseconds
+    """
+    values = np.asarray(durations) * 1000
+    return {
+        "count": len(values),
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "max_ms": float(values.max())
+    }
+
+
+def count_items(app: utils.DragZoomApp) -> Dict[str, int]:
+    """Count the canvas items of the chart, per canvas."""
+    canvases = {
+        "chart": app.canvas,
+        "price_axis": app.canvas_price,
+        "time_axis": app.canvas_date,
+    }
+    for index, pane in enumerate(app._all_panes()):
+        canvases[f"pane_{index}"] = pane.canvas
+    counts = {name: len(canvas.find_all()) for name, canvas in canvases.items()}
+    counts["total"] = sum(counts.values())
+    return counts
+
+
+def count_calls(app: utils.DragZoomApp) -> int:
+    """Count the canvas calls made so far (stub canvases only)."""
+    canvases = [app.canvas, app.canvas_price, app.canvas_date] + [pane.canvas for pane in app._all_panes()]
+    return sum(getattr(canvas, "calls", 0) for canvas in canvases)
+
+
+def _timed(action: Callable[[], None], durations: List[float]) -> None:
+    """Run an action and record its duration."""
+    start = time.perf_counter()
+    action()
+    durations.append(time.perf_counter() - start)
+
+
+def _frame(app: utils.DragZoomApp, handler: Callable[..., None], *args: Any) -> None:
+    """Handle one event and draw the frame it schedules."""
+    handler(*args)
+    app.scheduler.flush()
+
+
+def _event(x: float = 0, y: float = 0, delta: int = 0) -> SimpleNamespace:
+    """Build the attributes of a Tk event read by the handlers."""
+    return SimpleNamespace(x=x, y=y, delta=delta)
+
+
+def run_case(rows: int, events: int, redraws: int, backend: str, profile: bool = False, seed: int = 0) -> Dict[str, Any]:
+    """
+    Benchmark the chart on one dataset.
+
+    Args:
+        rows: Number of 1-minute bars
+        events: Number of events of each interaction sequence
+        redraws: Number of full redraws
+        backend: "stub" or "tk"
+        profile: Also report the app's own per-method timings
+            (see ``DragZoomApp.set_instrumentation``)
+        seed: Seed of the synthetic data
+
+    Returns:
+        Dict with the latencies of each phase, item counts and peak RSS
+    """
+    df = generate_ohlcv(rows, seed=seed)
+    phases: Dict[str, List[float]] = {}
+
+    if backend == "tk":
+        root = tk.Tk()
+        root.geometry(f"{CANVAS_WIDTH + 100}x{CANVAS_HEIGHT + 110}")
+        patch = mock.patch.object(utils.DragZoomApp, "initialize_chart", lambda app: None)
+    else:
+        root = StubRoot()
+        patch = headless()
+
+    try:
+        with patch:
+            start = time.perf_counter()
+            app = utils.DragZoomApp(root, df)
+            phases["construct"] = [time.perf_counter() - start]
+        app.set_instrumentation(profile)
+
+        if backend == "tk":
+            # Let Tk size the canvases, then hide the window
+            root.update()
+            _timed(lambda: utils.DragZoomApp.initialize_chart(app), phases.setdefault("initialize_chart", []))
+            root.withdraw()
+        else:
+            _timed(app.initialize_chart, phases.setdefault("initialize_chart", []))
+
+        for _ in range(redraws):
+            _timed(app.draw_chart, phases.setdefault("draw_chart", []))
+
+        # Zoom out then back in with the wheel
+        for index in range(events):
+            delta = -120 if index < events // 2 else 120
+            _timed(lambda: _frame(app, app.mouse_wheel_zoom, _event(delta=delta)), phases.setdefault("wheel_zoom", []))
+
+        # Drag along the time axis, then along the price axis
+        for axis, name in (("x", "drag_zoom_x"), ("y", "drag_zoom_y")):
+            app.start_drag(_event(500, 300), axis)
+            for index in range(events):
+                position = 500 + (index if index < events // 2 else events - index)
+                _timed(
+                    lambda: _frame(app, app.drag_to_zoom, _event(position, position), axis),
+                    phases.setdefault(name, [])
+                )
+            app.stop_drag(_event(), axis)
+
+        # Pan towards older bars and back
+        app.start_drag(_event(500, 300), "canvas")
+        x = 500
+        for index in range(events):
+            x += 4 if index < events // 2 else -4
+            _timed(lambda: _frame(app, app.drag_to_pan, _event(x, 300), "canvas"), phases.setdefault("pan", []))
+        app.stop_drag(_event(), "canvas")
+
+        return {
+            "rows": rows,
+            "phases": {name: summarize(durations) for name, durations in phases.items()},
+            "items": count_items(app),
+            "canvas_calls": count_calls(app) if backend == "stub" else None,
+            "peak_rss_mb": peak_rss_mb(),
+            "profile": app.profiler.report() if profile else None
+        }
+    finally:
+        root.destroy()
+
+
+def run(
+    rows: List[int], events: int = 100, redraws: int = 10, backend: str = "stub", profile: bool = False
+) -> Dict[str, Any]:
+    """
+    Benchmark every dataset size, smallest first.
+
+    The peak RSS is the peak of the whole process, so it reflects the
+    largest dataset run so far.
+
+    Returns:
+        Dict with the run's environment and the result of each size
+    """
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "backend": backend,
+            "events": events,
+            "redraws": redraws,
+            "profile": profile,
+            "canvas": [CANVAS_WIDTH, CANVAS_HEIGHT]
+        },
+        "results": [run_case(count, events, redraws, backend, profile) for count in sorted(rows)]
+    }
+
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """
+    Compare the median latencies of two runs.
+
+    Args:
+        previous: Result of an earlier ``run``
+        current: Result of a new ``run``
+
+    Returns:
+        One line per phase and dataset size found in both runs
+    """
+    lines = []
+    previous_results = {result["rows"]: result for result in previous["results"]}
+    for result in current["results"]:
+        before = previous_results.get(result["rows"])
+        if before is None:
+            continue
+        for phase, stats in result["phases"].items():
+            if phase not in before["phases"]:
+                continue
+            old, new = before["phases"][phase]["p50_ms"], stats["p50_ms"]
+            ratio = new / old if old else float("inf")
+            lines.append(f"{result['rows']:>10} {phase:<18} {old:10.3f} -> {new:10.3f} ms  x{ratio:.2f}")
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the chart rendering pipeline.")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS, help="Dataset sizes to run")
+    parser.add_argument("--events", type=int, default=100, help="Events per interaction sequence")
+    parser.add_argument("--redraws", type=int, default=10, help="Number of full redraws")
+    parser.add_argument("--backend", choices=["stub", "tk"], default="stub", help="Canvas implementation")
+    parser.add_argument("--profile", action="store_true", help="Include the app's per-method timings")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Print the change against a previous JSON file")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.events, args.redraws, args.backend, args.profile)
+
+    for result in results["results"]:
+        print(f"{result['rows']:,} rows (items: {result['items']['total']}, peak RSS: {result['peak_rss_mb']} MB)")
+        for phase, stats in result["phases"].items():
+            print(f"  {phase:<18} p50 {stats['p50_ms']:9.3f} ms  p95 {stats['p95_ms']:9.3f} ms  max {stats['max_ms']:9.3f} ms")
+        for method, stats in (result["profile"] or {}).items():
+            print(f"    {method:<20} x{stats['count']:<6} mean {stats['mean_ms']:9.3f} ms  items {stats['mean_items']:8.1f}")
+
+    if args.compare:
+        with open(args.compare) as previous_file:
+            print("\n".join(compare(json.load(previous_file), results)))
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
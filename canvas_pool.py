@@ -0,0 +1,144 @@
+import tkinter as tk
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+class CanvasItemPool:
+    """
+    A reusable set of canvas items of a single kind.
+
+    Instead of deleting and recreating items on every redraw, the pool keeps
+    its item IDs alive and moves them with ``canvas.coords``. Options such as
+    the fill color are only sent to Tk when they actually change, and unused
+    items are hidden rather than deleted.
+    """
+
+    def __init__(self, canvas: tk.Canvas, kind: str, tags: Tuple[str, ...], **options: Any):
+        """
+        Initialize an empty pool.
+
+        Args:
+            canvas: Canvas that owns the items
+            kind: Item type ("line", "rectangle" or "text")
+            tags: Tags shared by every item of the pool
+            **options: Options applied to every item at creation
+        """
+        self.canvas = canvas
+        self.kind = kind
+        self.tags = tags
+        self.options = options
+
+        self.items: List[int] = []
+        self._styles: List[Dict[str, Any]] = []
+        self._hidden: List[bool] = []
+        self.active = 0
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def resize(self, capacity: int) -> None:
+        """
+        Grow or shrink the pool to exactly ``capacity`` items.
+
+        Args:
+            capacity: Number of items to keep alive
+        """
+        create = getattr(self.canvas, f"create_{self.kind}")
+        while len(self.items) < capacity:
+            coords = (0, 0) if self.kind == "text" else (0, 0, 0, 0)
+            item = create(
+                *coords,
+                state="hidden",
+                tags=self.tags,
+                **self.options
+            )
+            self.items.append(item)
+            self._styles.append({})
+            self._hidden.append(True)
+
+        if len(self.items) > capacity:
+            self.canvas.delete(*self.items[capacity:])
+            del self.items[capacity:]
+            del self._styles[capacity:]
+            del self._hidden[capacity:]
+            self.active = min(self.active, capacity)
+
+    def draw(
+        self,
+        coords: Sequence[Sequence[float]],
+        styles: Optional[Sequence[Dict[str, Any]]] = None
+    ) -> None:
+        """
+        Position the first ``len(coords)`` items and hide the rest.
+
+        The pool grows when more items are needed and shrinks when less than
+        half of it has been used, so its size follows the viewport rather than
+        each individual redraw.
+
+        Args:
+            coords: Coordinates for each visible item
+            styles: Optional per-item options (e.g. fill color or text)
+        """
+        count = len(coords)
+        if count > len(self.items) or count < len(self.items) // 2:
+            self.resize(count)
+
+        for index in range(count):
+            self.place(index, coords[index], None if styles is None else styles[index])
+
+        for index in range(count, self.active):
+            if not self._hidden[index]:
+                self.canvas.itemconfig(self.items[index], state="hidden")
+                self._hidden[index] = True
+
+        self.active = count
+
+    def place(
+        self,
+        index: int,
+        coords: Sequence[float],
+        style: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Position and show a single item of the pool.
+
+        Args:
+            index: Slot of the item, below ``len(self)``
+            coords: Coordinates of the item
+            style: Optional options (e.g. fill color or text)
+        """
+        item = self.items[index]
+        self.canvas.coords(item, *coords)
+
+        if style is not None:
+            cached = self._styles[index]
+            changed = {key: value for key, value in style.items() if cached.get(key) != value}
+            if changed:
+                self.canvas.itemconfig(item, **changed)
+                cached.update(changed)
+
+        if self._hidden[index]:
+            self.canvas.itemconfig(item, state="normal")
+            self._hidden[index] = False
+
+    def shift(self, count: int) -> None:
+        """
+        Rotate the active slots so the last ``count`` ones come first.
+
+        Used when the drawn content scrolls by ``count`` slots: after moving
+        the whole layer on the canvas, the items that were in slots
+        ``[0, active - count)`` already show the right content in their new
+        slots, and only the first ``count`` (recycled) slots need ``place``.
+
+        Args:
+            count: Number of slots to rotate by
+        """
+        if self.active == 0 or count % self.active == 0:
+            return
+        count %= self.active
+        for values in (self.items, self._styles, self._hidden):
+            active = values[:self.active]
+            values[:self.active] = active[-count:] + active[:-count]
+
+    def clear(self) -> None:
+        """Hide every item of the pool without releasing it."""
+        self.draw([])
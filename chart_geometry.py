@@ -0,0 +1,336 @@
+import numpy as np
+from typing import Dict, NamedTuple, Optional, Tuple
+
+
+class CandleGeometry(NamedTuple):
+    """
+    Ready-to-draw pixel coordinates for a run of candlesticks.
+
+    Row ``i`` of every array describes the same candle. Candles are ordered
+    from the newest (rightmost) to the oldest (leftmost), matching the order
+    in which the chart lays them out.
+    """
+    x: np.ndarray       # Candle centre x-coordinates, shape (n,)
+    wicks: np.ndarray   # (x0, y_high, x1, y_low) per candle, shape (n, 4)
+    bodies: np.ndarray  # (x_left, y_open, x_right, y_close) per candle, shape (n, 4)
+    up: np.ndarray      # True where Close >= Open, shape (n,)
+
+
+def price_transform(graph_params: Dict[str, float], zoom_factor: float) -> Tuple[float, float]:
+    """
+    Collapse the chart's price-to-pixel mapping into a single affine transform.
+
+    The mapping used by ``Viewport.price_to_y`` (normalise by the
+    price range, zoom around the rendering midpoint, then flip into canvas
+    coordinates) is linear in the price, so it reduces to ``y = a * price + b``.
+
+    Args:
+        graph_params: Dict with price_min, price_height_ratio, height_ratio
+            and canvas_height
+        zoom_factor: Vertical zoom factor (``Viewport.scale_y``)
+
+    Returns:
+        Tuple of (a, b)
+    """
+    price_min = graph_params['price_min']
+    price_height_ratio = graph_params['price_height_ratio']
+    height_ratio = graph_params['height_ratio']
+    canvas_height = graph_params['canvas_height']
+
+    midpoint = height_ratio * canvas_height / 2
+    a = zoom_factor / price_height_ratio
+    b = (canvas_height
+         - midpoint * (1 + zoom_factor)
+         - (1 - height_ratio) * canvas_height / 2
+         - a * price_min)
+    return a, b
+
+
+def prices_to_y(prices: np.ndarray, transform: Tuple[float, float]) -> np.ndarray:
+    """
+    Convert an array of prices to canvas y-coordinates.
+
+    Args:
+        prices: Price values
+        transform: (a, b) coefficients from ``price_transform``
+
+    Returns:
+        Array of y-coordinates with the same shape as ``prices``
+    """
+    a, b = transform
+    return np.asarray(prices, dtype=np.float64) * a + b
+
+
+def compute_candle_geometry(
+    opens: np.ndarray,
+    highs: np.ndarray,
+    lows: np.ndarray,
+    closes: np.ndarray,
+    x_start: float,
+    step: float,
+    candle_width: float,
+    transform: Tuple[float, float]
+) -> CandleGeometry:
+    """
+    Compute wick and body coordinates for a slice of OHLC data in one pass.
+
+    The input arrays are in chronological order (oldest first); the last bar
+    is placed at ``x_start`` and each earlier bar ``step`` pixels to its left.
+
+    Args:
+        opens: Open prices
+        highs: High prices
+        lows: Low prices
+        closes: Close prices
+        x_start: x-coordinate of the newest candle
+        step: Horizontal distance between two candles, in pixels
+        candle_width: Width of a candle body, in pixels
+        transform: (a, b) coefficients from ``price_transform``
+
+    Returns:
+        CandleGeometry ordered from newest to oldest
+    """
+    # Stack the four price columns so the affine transform runs once
+    prices = np.stack([highs, lows, opens, closes])[:, ::-1]
+    high_y, low_y, open_y, close_y = prices_to_y(prices, transform)
+
+    count = prices.shape[1]
+    x = x_start - np.arange(count, dtype=np.float64) * step
+    half_width = candle_width / 2
+
+    wicks = np.column_stack((x, high_y, x, low_y))
+    bodies = np.column_stack((x - half_width, open_y, x + half_width, close_y))
+    up = (np.asarray(closes) >= np.asarray(opens))[::-1]
+
+    return CandleGeometry(x=x, wicks=wicks, bodies=bodies, up=up)
+
+
+class MinMaxPyramid:
+    """
+    Power-of-two levels of High maxima and Low minima.
+
+    Level ``k`` holds the max High and min Low of consecutive blocks of
+    ``2 ** k`` bars, aligned on multiples of ``2 ** k``. Looking up the
+    envelope of a block at any level is a single array access.
+    """
+
+    def __init__(self, highs: np.ndarray, lows: np.ndarray):
+        """
+        Build every level of the pyramid.
+
+        Args:
+            highs: High prices
+            lows: Low prices
+        """
+        self.count = len(highs)
+        self.highs = [np.asarray(highs, dtype=np.float64)]
+        self.lows = [np.asarray(lows, dtype=np.float64)]
+
+        while len(self.highs[-1]) > 1:
+            high, low = self.highs[-1], self.lows[-1]
+            if len(high) % 2:
+                # Repeat the last value so every block has a pair
+                high = np.append(high, high[-1])
+                low = np.append(low, low[-1])
+            self.highs.append(np.maximum(high[0::2], high[1::2]))
+            self.lows.append(np.minimum(low[0::2], low[1::2]))
+
+    def level_for(self, step: float) -> int:
+        """
+        Get the lowest level whose blocks are at least one pixel wide.
+
+        Args:
+            step: Horizontal distance between two bars, in pixels
+
+        Returns:
+            Pyramid level
+        """
+        if step >= 1:
+            return 0
+        level = int(np.ceil(np.log2(1 / step)))
+        return min(level, len(self.highs) - 1)
+
+
+class SparseTable:
+    """
+    Constant-time range queries (max, min, ...) over a fixed array.
+
+    A classic sparse table stores ``log2(n)`` levels of ``n`` values. To keep
+    memory small on long histories, the levels are built over the reductions
+    of blocks of ``block`` values instead; a query combines at most two table
+    lookups with the partial blocks at both ends, so its cost is bounded by
+    ``block`` whatever the length of the range.
+    """
+
+    def __init__(self, values: np.ndarray, reduce: np.ufunc = np.maximum, block: int = 64):
+        """
+        Build the table.
+
+        Args:
+            values: Values to query
+            reduce: Idempotent binary ufunc (``np.maximum`` or ``np.minimum``)
+            block: Number of values summarized by each table entry
+        """
+        self.values = np.asarray(values)
+        self.reduce = reduce
+        self.block = block
+
+        count = len(self.values) // block
+        blocks = reduce.reduce(self.values[:count * block].reshape(count, block), axis=1) if count else self.values[:0]
+        self.levels = [blocks]
+        width = 1
+        while 2 * width <= count:
+            previous = self.levels[-1]
+            self.levels.append(reduce(previous[:-width], previous[width:]))
+            width *= 2
+
+    def query(self, start: int, end: int):
+        """
+        Reduce ``values[start:end]``.
+
+        Args:
+            start: First index
+            end: Index after the last one
+
+        Returns:
+            The reduced value, or None if the range is empty
+        """
+        start, end = max(int(start), 0), min(int(end), len(self.values))
+        if end <= start:
+            return None
+
+        first_block = -(-start // self.block)
+        end_block = end // self.block
+        if end_block - first_block < 1:
+            return self.reduce.reduce(self.values[start:end])
+
+        level = (end_block - first_block).bit_length() - 1
+        table = self.levels[level]
+        result = self.reduce(table[first_block], table[end_block - (1 << level)])
+        # Partial blocks at both ends
+        for part in (self.values[start:first_block * self.block], self.values[end_block * self.block:end]):
+            if len(part):
+                result = self.reduce(result, self.reduce.reduce(part))
+        return result
+
+
+def compute_lod_geometry(
+    opens: np.ndarray,
+    closes: np.ndarray,
+    pyramid: MinMaxPyramid,
+    start: int,
+    end: int,
+    x_start: float,
+    step: float,
+    body_ratio: float,
+    transform: Tuple[float, float],
+    newest: Optional[Tuple[float, float, float, float]] = None
+) -> CandleGeometry:
+    """
+    Compute one high/low envelope per pixel column for sub-pixel candles.
+
+    Bars are grouped in aligned blocks of the pyramid level matching
+    ``step``; each block is drawn as a single candle going from the open of
+    its first bar to the close of its last bar, with the block's extremes as
+    wick. The work is proportional to the number of columns, not bars,
+    except for the newest block: it stops at row ``end - 1`` (later rows may
+    not be revealed yet) and is aggregated from the rows themselves.
+
+    Args:
+        opens: Open prices of the whole series
+        closes: Close prices of the whole series
+        pyramid: MinMaxPyramid built over the whole series
+        start: First visible row
+        end: Row after the last visible row
+        x_start: x-coordinate of row ``end - 1``
+        step: Horizontal distance between two bars, in pixels
+        body_ratio: Body width as a fraction of the column width
+        transform: (a, b) coefficients from ``price_transform``
+        newest: Optional (open, high, low, close) replacing row ``end - 1``,
+            e.g. a bar still being formed during a replay
+
+    Returns:
+        CandleGeometry with one entry per column, newest first
+    """
+    level = pyramid.level_for(step)
+    block = 1 << level
+
+    if end <= start:
+        empty = np.empty(0)
+        return CandleGeometry(x=empty, wicks=empty.reshape(0, 4), bodies=empty.reshape(0, 4), up=empty.astype(bool))
+
+    blocks = np.arange(start // block, (end - 1) // block + 1)
+    first_rows = blocks * block
+    last_rows = np.minimum(first_rows + block, end) - 1
+
+    block_opens = opens[first_rows]
+    block_highs = pyramid.highs[level][blocks]
+    block_lows = pyramid.lows[level][blocks]
+    block_closes = closes[last_rows]
+
+    # Aggregate the newest block from its rows up to ``end`` only
+    first = first_rows[-1]
+    newest_highs = pyramid.highs[0][first:end]
+    newest_lows = pyramid.lows[0][first:end]
+    if newest is not None:
+        newest_highs = np.append(newest_highs[:-1], newest[1])
+        newest_lows = np.append(newest_lows[:-1], newest[2])
+        block_closes[-1] = newest[3]
+        if first == end - 1:
+            block_opens[-1] = newest[0]
+    block_highs[-1] = newest_highs.max()
+    block_lows[-1] = newest_lows.min()
+
+    # Position the newest block at the centre of the bars it covers
+    newest_center = (first_rows[-1] + last_rows[-1]) / 2
+    x_newest = x_start - (end - 1 - newest_center) * step
+    column_step = block * step
+
+    return compute_candle_geometry(
+        block_opens,
+        block_highs,
+        block_lows,
+        block_closes,
+        x_newest,
+        column_step,
+        column_step * body_ratio,
+        transform
+    )
+
+
+def compute_polyline(
+    values: np.ndarray,
+    start: int,
+    end: int,
+    x_start: float,
+    step: float,
+    transform: Tuple[float, float]
+) -> np.ndarray:
+    """
+    Compute the flat coordinate list of a line through rows ``[start, end)``.
+
+    The result is meant for a single multi-point ``create_line``/``coords``
+    call. Rows without a value (NaN) are skipped, and when bars are narrower
+    than half a pixel only every n-th row is kept, so the number of points
+    follows the canvas width rather than the number of bars.
+
+    Args:
+        values: Values of the whole series
+        start: First row
+        end: Row after the last row
+        x_start: x-coordinate of row ``end - 1``
+        step: Horizontal distance between two bars, in pixels
+        transform: (a, b) coefficients mapping a value to a y-coordinate
+
+    Returns:
+        Array ``[x0, y0, x1, y1, ...]`` in chronological order
+    """
+    stride = max(1, int(0.5 / step)) if step > 0 else 1
+    # Count back from the newest row so that it is always kept
+    rows = np.arange(end - 1, start - 1, -stride)[::-1]
+    points = np.asarray(values, dtype=np.float64)[rows]
+    kept = ~np.isnan(points)
+
+    x = x_start - (end - 1 - rows[kept]) * step
+    y = prices_to_y(points[kept], transform)
+    return np.column_stack((x, y)).ravel()
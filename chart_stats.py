@@ -0,0 +1,153 @@
+import math
+from typing import Dict, NamedTuple, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# Rows read to estimate the tick size, spread over the whole series
+TICK_SAMPLE_SIZE = 10_000
+
+
+class ChartStatistics(NamedTuple):
+    """
+    Summary values of an OHLC series used to lay out the price axis.
+    """
+    price_min: float  # Lowest Low
+    price_max: float  # Highest High
+    tick_size: float  # Smallest price increment found in the data
+    count: int        # Number of rows
+
+
+def compute_statistics(df: pd.DataFrame) -> ChartStatistics:
+    """
+    Compute the statistics of an OHLC series in one pass over High and Low.
+
+    Args:
+        df: DataFrame with columns High, Low and Close
+
+    Returns:
+        ChartStatistics of ``df``
+    """
+    if len(df) == 0:
+        return ChartStatistics(0.0, 0.0, 0.01, 0)
+
+    highs = df["High"].to_numpy(dtype=np.float64)
+    lows = df["Low"].to_numpy(dtype=np.float64)
+
+    return ChartStatistics(
+        price_min=float(lows.min()),
+        price_max=float(highs.max()),
+        tick_size=estimate_tick_size(df["Close"].to_numpy(dtype=np.float64)),
+        count=len(df)
+    )
+
+
+def estimate_tick_size(prices: np.ndarray, max_decimals: int = 8) -> float:
+    """
+    Find the number of decimals the prices are quoted with.
+
+    Args:
+        prices: Price values
+        max_decimals: Largest number of decimals considered
+
+    Returns:
+        ``10 ** -decimals`` for the smallest number of decimals that
+        represents every sampled price
+    """
+    sample = prices[::max(1, len(prices) // TICK_SAMPLE_SIZE)]
+    sample = sample[np.isfinite(sample)]
+    for decimals in range(max_decimals + 1):
+        scaled = sample * 10 ** decimals
+        if np.all(np.abs(scaled - np.round(scaled)) < 1e-6 * np.maximum(1.0, np.abs(scaled))):
+            return 10.0 ** -decimals
+    return 10.0 ** -max_decimals
+
+
+def nice_number(value: float, round_result: bool) -> float:
+    """
+    Get a "nice" number (1, 2 or 5 times a power of ten) close to a value.
+
+    Args:
+        value: Positive value
+        round_result: Round to the nearest nice number if True, otherwise
+            take the smallest nice number not below ``value``
+
+    Returns:
+        Nice number
+    """
+    exponent = math.floor(math.log10(value))
+    fraction = value / 10 ** exponent
+
+    if round_result:
+        thresholds = ((1.5, 1), (3, 2), (7, 5))
+        nice = next((nice for limit, nice in thresholds if fraction < limit), 10)
+    else:
+        thresholds = ((1, 1), (2, 2), (5, 5))
+        nice = next((nice for limit, nice in thresholds if fraction <= limit), 10)
+
+    return nice * 10.0 ** exponent
+
+
+def nice_ticks(low: float, high: float, target: int = 7, minimum_step: float = 0.0) -> Tuple[np.ndarray, float]:
+    """
+    Pick round tick values covering a range ("nice numbers" labeling).
+
+    Args:
+        low: Lowest value of the axis
+        high: Highest value of the axis
+        target: Desired number of ticks
+        minimum_step: Smallest step allowed (e.g. the tick size of the data)
+
+    Returns:
+        Tuple of (tick values within ``[low, high]``, step between ticks)
+    """
+    if not high > low:
+        return np.empty(0), 0.0
+
+    step = nice_number((high - low) / max(1, target - 1), True)
+    if minimum_step > 0 and step < minimum_step:
+        step = nice_number(minimum_step, False)
+
+    first = math.ceil(low / step)
+    last = math.floor(high / step)
+    return np.arange(first, last + 1) * step, step
+
+
+def step_decimals(step: float) -> int:
+    """Number of decimals needed to tell apart ticks ``step`` apart."""
+    return max(0, -math.floor(math.log10(step) + 1e-9)) if step > 0 else 0
+
+
+class StatisticsCache:
+    """
+    ChartStatistics per time frame, computed once per dataset.
+
+    Each entry remembers the DataFrame it was computed from and is rebuilt
+    when a different DataFrame is passed for the same time frame, i.e. when
+    the data changes.
+    """
+
+    def __init__(self):
+        self.entries: Dict[str, Tuple[pd.DataFrame, ChartStatistics]] = {}
+
+    def get(self, time_frame: str, df: pd.DataFrame) -> ChartStatistics:
+        """
+        Get the statistics of a time frame's data.
+
+        Args:
+            time_frame: Time frame of ``df``
+            df: Data of the time frame
+
+        Returns:
+            ChartStatistics of ``df``
+        """
+        entry = self.entries.get(time_frame)
+        if entry is None or entry[0] is not df:
+            entry = (df, compute_statistics(df))
+            self.entries[time_frame] = entry
+        return entry[1]
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self.entries.clear()
@@ -1,4 +1,5 @@
 import customtkinter as ctk
+from collections import OrderedDict
 from screens.home import HomeScreen
 from screens.settings import SettingsScreen
 from screens.profile import ProfileScreen
@@ -7,8 +8,13 @@ from screens.replay import ReplayScreen
 WIDTH = 800
 HEIGHT = 600
 
+# Écrans lourds jamais détruits une fois créés
+KEEP_ALIVE_SCREENS = ("ReplayScreen",)
+# Nombre d'autres écrans cachés gardés en mémoire (les plus anciens sont détruits)
+MAX_CACHED_SCREENS = 2
+
 class MainApp(ctk.CTk):
-    def __init__(self):
+    def __init__(self, keep_alive : tuple = KEEP_ALIVE_SCREENS, max_cached_screens : int = MAX_CACHED_SCREENS):
         super().__init__()
 
         # Configuration de la fenêtre principale
@@ -31,6 +37,11 @@ class MainApp(ctk.CTk):
         # Dictionnaire pour stocker les écrans
         self.frames_class : dict[ctk.CTkFrame] = {}
 
+        # Cache des écrans déjà construits, du moins au plus récemment affiché
+        self.frames : OrderedDict[str, ctk.CTkFrame] = OrderedDict()
+        self.keep_alive = keep_alive
+        self.max_cached_screens = max_cached_screens
+
         # Création et stockage des écrans
         for F in (HomeScreen, SettingsScreen, ProfileScreen, ReplayScreen):
             page_name = F.__name__
@@ -41,8 +52,25 @@ class MainApp(ctk.CTk):
 
     def show_frame(self, page_name : str):
         self.frame.pack_forget()
-        self.frame = self.frames_class[page_name](self.container,controller = self)
+        if self.frame not in self.frames.values():
+            self.frame.destroy()
+
+        # Réutiliser l'écran s'il est encore en cache
+        frame = self.frames.pop(page_name, None)
+        if frame is None or not frame.winfo_exists():
+            frame = self.frames_class[page_name](self.container,controller = self)
+        self.frames[page_name] = frame
+
+        self.frame = frame
         self.frame.pack(expand = True,fill = "both")
+        self.evict_frames()
+
+    def evict_frames(self):
+        """Détruit les écrans cachés les moins récemment affichés au-delà de la limite."""
+        evictable = [name for name, frame in self.frames.items()
+                     if name not in self.keep_alive and frame is not self.frame]
+        while len(evictable) > self.max_cached_screens:
+            self.frames.pop(evictable.pop(0)).destroy()
 
     def exit_fullscreen(self, event=None):
         """Quitte le mode plein écran."""
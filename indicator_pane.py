@@ -0,0 +1,177 @@
+import tkinter as tk
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from canvas_pool import CanvasItemPool
+from chart_geometry import compute_polyline
+from indicators import Indicator
+
+
+# Colors given in turn to the lines of the indicators added to a chart
+LINE_COLORS = ["#2962FF", "#FF6D00", "#AA00FF", "#00897B", "#D50000", "#6D4C41", "#C51162", "#2E7D32"]
+
+
+class IndicatorPane:
+    """
+    A strip below the main chart showing one indicator on its own scale.
+
+    The pane shares the horizontal layout of the chart (same visible rows,
+    ``x_start`` and step) and draws each line of the indicator as a single
+    polyline, so a redraw costs one Tk call per line whatever the number of
+    bars. The vertical scale is the indicator's fixed ``bounds`` or the
+    range of the visible values.
+    """
+
+    def __init__(self, root: tk.Misc, indicator: Indicator, colors: Dict[str, str], height: int = 100):
+        """
+        Create the pane's canvases (not placed yet).
+
+        Args:
+            root: Widget holding the chart grid
+            indicator: Indicator to plot
+            colors: Color of each line
+            height: Height of the pane in pixels
+        """
+        self.indicator = indicator
+        self.colors = colors
+        self.height = height
+        self.margin = 8
+
+        self.canvas = tk.Canvas(root, bg="white", height=height)
+        self.axis = tk.Canvas(root, bg="white", width=100, height=height)
+
+        self.lines = CanvasItemPool(self.canvas, "line", ("indicator",), width=1.5)
+        self.labels = CanvasItemPool(self.axis, "text", ("labels",), fill="black", anchor="w", font=("Arial", 9))
+
+    def place(self, row: int) -> None:
+        """Put the pane on a row of the chart grid."""
+        self.canvas.grid(row=row, column=0, sticky="ew")
+        self.axis.grid(row=row, column=1, sticky="ns")
+
+    def destroy(self) -> None:
+        """Remove the pane's canvases."""
+        self.canvas.destroy()
+        self.axis.destroy()
+
+    def _value_range(self, values: Dict[str, np.ndarray], start: int, end: int) -> Optional[Tuple[float, float]]:
+        """Get the (low, high) scale for the visible rows, or None if nothing is defined."""
+        if self.indicator.bounds is not None:
+            return self.indicator.bounds
+
+        visible = np.concatenate([line[start:end] for line in values.values()])
+        visible = visible[~np.isnan(visible)]
+        if len(visible) == 0:
+            return None
+        low, high = float(visible.min()), float(visible.max())
+        if high == low:
+            low, high = low - 1, high + 1
+        return low, high
+
+    def draw(self, values: Dict[str, np.ndarray], start: int, end: int, x_start: float, step: float) -> None:
+        """
+        Redraw the pane for the chart's visible rows.
+
+        Args:
+            values: Lines of the indicator (see ``DragZoomApp.indicator_values``)
+            start: First visible row
+            end: Row after the last visible row
+            x_start: x-coordinate of row ``end - 1``
+            step: Horizontal distance between two bars, in pixels
+        """
+        value_range = self._value_range(values, start, end)
+        if value_range is None:
+            self.lines.clear()
+            self.labels.clear()
+            return
+
+        # Highest value at the top of the pane
+        low, high = value_range
+        a = -(self.height - 2 * self.margin) / (high - low)
+        b = self.height - self.margin - a * low
+
+        coords, styles = [], []
+        for name in self.indicator.lines:
+            points = compute_polyline(values[name], start, end, x_start, step, (a, b))
+            if len(points) >= 4:
+                coords.append(points.tolist())
+                styles.append({'fill': self.colors[name]})
+        self.lines.draw(coords, styles)
+
+        self.labels.draw(
+            [(5, self.margin), (5, self.height - self.margin)],
+            [{'text': f"{high:.2f}"}, {'text': f"{low:.2f}"}]
+        )
+
+
+class VolumePane:
+    """
+    Volume histogram below the main chart.
+
+    Bars follow the horizontal layout of the candles and are colored like
+    them. The scale fits the highest visible volume, read from a sparse
+    table in constant time, so panning never rescans the Volume column.
+    """
+
+    def __init__(self, root: tk.Misc, height: int = 80):
+        """
+        Create the pane's canvases (not placed yet).
+
+        Args:
+            root: Widget holding the chart grid
+            height: Height of the pane in pixels
+        """
+        self.height = height
+        self.margin = 5
+
+        self.canvas = tk.Canvas(root, bg="white", height=height)
+        self.axis = tk.Canvas(root, bg="white", width=100, height=height)
+
+        self.bars = CanvasItemPool(self.canvas, "rectangle", ("volume",))
+        self.labels = CanvasItemPool(self.axis, "text", ("labels",), fill="black", anchor="w", font=("Arial", 9))
+
+    def place(self, row: int) -> None:
+        """Put the pane on a row of the chart grid."""
+        self.canvas.grid(row=row, column=0, sticky="ew")
+        self.axis.grid(row=row, column=1, sticky="ns")
+
+    def destroy(self) -> None:
+        """Remove the pane's canvases."""
+        self.canvas.destroy()
+        self.axis.destroy()
+
+    def draw(
+        self,
+        volumes: np.ndarray,
+        up: np.ndarray,
+        max_volume: Optional[float],
+        x_start: float,
+        step: float,
+        bar_width: float
+    ) -> None:
+        """
+        Redraw the histogram.
+
+        Args:
+            volumes: Volume of each visible row (or block of rows), oldest first
+            up: True where the row closed at or above its open
+            max_volume: Highest visible volume, or None if nothing is visible
+            x_start: x-coordinate of the last entry
+            step: Horizontal distance between two entries of ``volumes``, in pixels
+            bar_width: Width of a bar, in pixels
+        """
+        if not max_volume or len(volumes) == 0:
+            self.bars.clear()
+            self.labels.clear()
+            return
+
+        scale = (self.height - self.margin) / max_volume
+        x = x_start - np.arange(len(volumes))[::-1] * step
+        half_width = bar_width / 2
+        tops = self.height - np.asarray(volumes, dtype=np.float64) * scale
+
+        rectangles = np.column_stack((x - half_width, tops, x + half_width, np.full(len(x), self.height)))
+        colors = np.where(up, "#A5D6A7", "#EF9A9A").tolist()
+        self.bars.draw(rectangles.tolist(), [{'fill': color, 'outline': color} for color in colors])
+
+        self.labels.draw([(5, self.margin)], [{'text': f"{max_volume:,.0f}"}])
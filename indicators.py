@@ -0,0 +1,602 @@
+import copy
+import math
+from collections import deque
+from typing import Dict, Hashable, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from resampling import to_datetime64
+
+
+# Above this many new bars, a cached series is recomputed with the vectorized
+# path instead of being extended bar by bar
+STREAM_LIMIT = 512
+
+
+class Bar(NamedTuple):
+    """
+    One OHLCV bar, as fed to the streaming updates.
+    """
+    time: np.datetime64
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+
+def bars(df: pd.DataFrame, start: int = 0, end: Optional[int] = None, times: Optional[np.ndarray] = None):
+    """
+    Iterate over rows ``[start, end)`` of a DataFrame as ``Bar`` tuples.
+
+    A missing Volume column counts as a volume of 1 for every bar.
+
+    Args:
+        df: DataFrame with columns Time, Open, High, Low, Close and
+            optionally Volume
+        start: First row
+        end: Row after the last row (default: every row)
+        times: ``datetime64`` times of every row of ``df``; needed for
+            time-of-day columns, whose dates only follow from the whole series
+
+    Returns:
+        Iterator of Bar
+    """
+    return _bars(bar_columns(df, times), start, end)
+
+
+def bar_columns(df: pd.DataFrame, times: Optional[np.ndarray] = None) -> Tuple[np.ndarray, ...]:
+    """Get the arrays ``bars`` reads, in the field order of ``Bar``."""
+    if times is None:
+        times = to_datetime64(df["Time"])
+    volumes = df["Volume"].to_numpy() if "Volume" in df.columns else np.ones(len(df))
+    return (times,) + tuple(df[name].to_numpy() for name in ("Open", "High", "Low", "Close")) + (volumes,)
+
+
+def _bars(columns: Tuple[np.ndarray, ...], start: int = 0, end: Optional[int] = None):
+    """Iterate over rows ``[start, end)`` of the output of ``bar_columns``."""
+    times, *values = (column[start:end] for column in columns)
+    return map(Bar, list(times), *(column.tolist() for column in values))
+
+
+class Indicator:
+    """
+    Base class of the indicators.
+
+    An indicator has two paths that give the same values:
+
+    - ``compute`` evaluates the whole history at once with array operations,
+      for the initial load;
+    - ``update`` takes one new bar and returns the latest values in O(1),
+      for bars revealed one at a time. ``seed`` primes the streaming state
+      from a history so that updates can continue where it ends.
+
+    ``peek`` returns the values a bar would produce without committing it,
+    for a bar that is still being formed.
+    """
+
+    # Name used in cache keys
+    name = ""
+
+    # Names of the output lines
+    lines: Tuple[str, ...] = ()
+
+    # Whether the lines are plotted on the price scale (True) or in a separate pane
+    overlay = True
+
+    # Fixed (low, high) scale of the pane, or None to fit the visible values
+    bounds: Optional[Tuple[float, float]] = None
+
+    @property
+    def params(self) -> Tuple:
+        """Parameters identifying the indicator in a cache."""
+        return ()
+
+    @property
+    def key(self) -> Tuple:
+        """Cache key of the indicator."""
+        return (self.name,) + self.params
+
+    def compute(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        Compute the indicator over a whole history.
+
+        Args:
+            df: OHLC(V) data
+
+        Returns:
+            Dict mapping each line name to an array aligned with ``df``
+            (NaN where the indicator is not defined yet)
+        """
+        raise NotImplementedError
+
+    def reset(self) -> None:
+        """Forget the streaming state."""
+        raise NotImplementedError
+
+    def update(self, bar: Bar) -> Tuple[float, ...]:
+        """
+        Add one bar to the streaming state.
+
+        Args:
+            bar: The next bar
+
+        Returns:
+            Values of every line after this bar, in the order of ``lines``
+        """
+        raise NotImplementedError
+
+    def peek(self, bar: Bar) -> Tuple[float, ...]:
+        """Values ``update(bar)`` would return, without changing the state."""
+        raise NotImplementedError
+
+    def seed(self, df: pd.DataFrame, start: int = 0, end: Optional[int] = None,
+             times: Optional[np.ndarray] = None) -> None:
+        """
+        Prime the streaming state with rows ``[start, end)`` of ``df``.
+
+        ``times`` is passed on to ``bars``.
+
+        The default replays the bars through ``update``; indicators override
+        it to derive their state from the vectorized path or from the last
+        few bars only, so seeding after a long history stays cheap.
+        """
+        end = len(df) if end is None else end
+        self.reset()
+        for bar in bars(df, start, end, times):
+            self.update(bar)
+
+
+def _column(df: pd.DataFrame, name: str) -> pd.Series:
+    return df[name].astype(np.float64)
+
+
+class SMA(Indicator):
+    """Simple moving average."""
+
+    name = "sma"
+    lines = ("sma",)
+
+    def __init__(self, period: int = 20):
+        self.period = period
+        self.reset()
+
+    @property
+    def params(self) -> Tuple:
+        return (self.period,)
+
+    def seed(self, df: pd.DataFrame, start: int = 0, end: Optional[int] = None,
+             times: Optional[np.ndarray] = None) -> None:
+        # Only the last window matters
+        end = len(df) if end is None else end
+        super().seed(df, max(start, end - self.period), end, times)
+
+    def compute(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        return {"sma": _column(df, "Close").rolling(self.period).mean().to_numpy()}
+
+    def reset(self) -> None:
+        self.window = deque()
+        self.total = 0.0
+
+    def peek(self, bar: Bar) -> Tuple[float, ...]:
+        if len(self.window) + 1 < self.period:
+            return (math.nan,)
+        dropped = self.window[0] if len(self.window) == self.period else 0.0
+        return ((self.total + bar.close - dropped) / self.period,)
+
+    def update(self, bar: Bar) -> Tuple[float, ...]:
+        values = self.peek(bar)
+        self.window.append(bar.close)
+        self.total += bar.close
+        if len(self.window) > self.period:
+            self.total -= self.window.popleft()
+        return values
+
+
+class EMA(Indicator):
+    """Exponential moving average, starting from the first close."""
+
+    name = "ema"
+    lines = ("ema",)
+
+    def __init__(self, period: int = 20):
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self.reset()
+
+    @property
+    def params(self) -> Tuple:
+        return (self.period,)
+
+    def compute(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        values = self._smooth(df).to_numpy(copy=True)
+        values[:self.period - 1] = np.nan
+        return {"ema": values}
+
+    def _smooth(self, df: pd.DataFrame) -> pd.Series:
+        return _column(df, "Close").ewm(alpha=self.alpha, adjust=False).mean()
+
+    def seed(self, df: pd.DataFrame, start: int = 0, end: Optional[int] = None,
+             times: Optional[np.ndarray] = None) -> None:
+        end = len(df) if end is None else end
+        self.reset()
+        if end > start:
+            self.value = float(self._smooth(df.iloc[start:end]).iat[-1])
+            self.count = end - start
+
+    def reset(self) -> None:
+        self.value = math.nan
+        self.count = 0
+
+    def _next(self, bar: Bar) -> float:
+        return bar.close if self.count == 0 else self.value + self.alpha * (bar.close - self.value)
+
+    def peek(self, bar: Bar) -> Tuple[float, ...]:
+        return (self._next(bar) if self.count + 1 >= self.period else math.nan,)
+
+    def update(self, bar: Bar) -> Tuple[float, ...]:
+        values = self.peek(bar)
+        self.value = self._next(bar)
+        self.count += 1
+        return values
+
+
+class RSI(Indicator):
+    """Relative strength index with Wilder's smoothing."""
+
+    name = "rsi"
+    lines = ("rsi",)
+    overlay = False
+    bounds = (0.0, 100.0)
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.alpha = 1.0 / period
+        self.reset()
+
+    @property
+    def params(self) -> Tuple:
+        return (self.period,)
+
+    def compute(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        gains, losses = self._averages(df)
+        values = _rsi(gains, losses)
+        values[:self.period] = np.nan
+        return {"rsi": values}
+
+    def _averages(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """Smoothed gains and losses of every bar."""
+        changes = _column(df, "Close").diff()
+        gains = changes.clip(lower=0).ewm(alpha=self.alpha, adjust=False).mean().to_numpy(copy=True)
+        losses = (-changes).clip(lower=0).ewm(alpha=self.alpha, adjust=False).mean().to_numpy(copy=True)
+        return gains, losses
+
+    def seed(self, df: pd.DataFrame, start: int = 0, end: Optional[int] = None,
+             times: Optional[np.ndarray] = None) -> None:
+        end = len(df) if end is None else end
+        self.reset()
+        if end > start:
+            gains, losses = self._averages(df.iloc[start:end])
+            self.gain, self.loss = float(gains[-1]), float(losses[-1])
+            self.last_close = float(df["Close"].iat[end - 1])
+            self.count = end - start
+
+    def reset(self) -> None:
+        self.last_close = math.nan
+        self.gain = math.nan
+        self.loss = math.nan
+        self.count = 0
+
+    def _next(self, bar: Bar) -> Tuple[float, float]:
+        if self.count == 0:
+            return math.nan, math.nan
+        change = bar.close - self.last_close
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        if self.count == 1:
+            return gain, loss
+        return self.gain + self.alpha * (gain - self.gain), self.loss + self.alpha * (loss - self.loss)
+
+    def peek(self, bar: Bar) -> Tuple[float, ...]:
+        if self.count < self.period:
+            return (math.nan,)
+        gain, loss = self._next(bar)
+        return (float(_rsi(gain, loss)),)
+
+    def update(self, bar: Bar) -> Tuple[float, ...]:
+        values = self.peek(bar)
+        self.gain, self.loss = self._next(bar)
+        self.last_close = bar.close
+        self.count += 1
+        return values
+
+
+def _rsi(gains, losses):
+    """RSI from average gains and losses; 100 when there is no loss at all."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(losses == 0, 100.0, 100.0 - 100.0 / (1.0 + np.divide(gains, losses)))
+
+
+class ATR(Indicator):
+    """Average true range with Wilder's smoothing."""
+
+    name = "atr"
+    lines = ("atr",)
+    overlay = False
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.alpha = 1.0 / period
+        self.reset()
+
+    @property
+    def params(self) -> Tuple:
+        return (self.period,)
+
+    def compute(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        values = self._smooth(df)
+        values[:self.period - 1] = np.nan
+        return {"atr": values}
+
+    def _smooth(self, df: pd.DataFrame) -> np.ndarray:
+        """Smoothed true range of every bar."""
+        highs = df["High"].to_numpy(dtype=np.float64)
+        lows = df["Low"].to_numpy(dtype=np.float64)
+        previous = np.concatenate(([np.nan], df["Close"].to_numpy(dtype=np.float64)[:-1]))
+        # fmax ignores the missing previous close of the first bar
+        true_range = np.fmax(highs - lows, np.fmax(np.abs(highs - previous), np.abs(lows - previous)))
+        return pd.Series(true_range).ewm(alpha=self.alpha, adjust=False).mean().to_numpy(copy=True)
+
+    def seed(self, df: pd.DataFrame, start: int = 0, end: Optional[int] = None,
+             times: Optional[np.ndarray] = None) -> None:
+        end = len(df) if end is None else end
+        self.reset()
+        if end > start:
+            self.value = float(self._smooth(df.iloc[start:end])[-1])
+            self.last_close = float(df["Close"].iat[end - 1])
+            self.count = end - start
+
+    def reset(self) -> None:
+        self.last_close = math.nan
+        self.value = math.nan
+        self.count = 0
+
+    def _next(self, bar: Bar) -> float:
+        true_range = bar.high - bar.low
+        if self.count:
+            true_range = max(true_range, abs(bar.high - self.last_close), abs(bar.low - self.last_close))
+            return self.value + self.alpha * (true_range - self.value)
+        return true_range
+
+    def peek(self, bar: Bar) -> Tuple[float, ...]:
+        return (self._next(bar) if self.count + 1 >= self.period else math.nan,)
+
+    def update(self, bar: Bar) -> Tuple[float, ...]:
+        values = self.peek(bar)
+        self.value = self._next(bar)
+        self.last_close = bar.close
+        self.count += 1
+        return values
+
+
+class Bollinger(Indicator):
+    """Bollinger bands: moving average plus and minus a multiple of the standard deviation."""
+
+    name = "bollinger"
+    lines = ("middle", "upper", "lower")
+
+    def __init__(self, period: int = 20, width: float = 2.0):
+        self.period = period
+        self.width = width
+        self.reset()
+
+    @property
+    def params(self) -> Tuple:
+        return (self.period, self.width)
+
+    def seed(self, df: pd.DataFrame, start: int = 0, end: Optional[int] = None,
+             times: Optional[np.ndarray] = None) -> None:
+        # Only the last window matters
+        end = len(df) if end is None else end
+        super().seed(df, max(start, end - self.period), end, times)
+
+    def compute(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        rolling = _column(df, "Close").rolling(self.period)
+        middle = rolling.mean().to_numpy()
+        deviation = rolling.std(ddof=0).to_numpy()
+        return {
+            "middle": middle,
+            "upper": middle + self.width * deviation,
+            "lower": middle - self.width * deviation,
+        }
+
+    def reset(self) -> None:
+        self.window = deque()
+        self.total = 0.0
+        self.squares = 0.0
+
+    def peek(self, bar: Bar) -> Tuple[float, ...]:
+        if len(self.window) + 1 < self.period:
+            return (math.nan, math.nan, math.nan)
+        dropped = self.window[0] if len(self.window) == self.period else 0.0
+        mean = (self.total + bar.close - dropped) / self.period
+        variance = (self.squares + bar.close ** 2 - dropped ** 2) / self.period - mean ** 2
+        deviation = math.sqrt(max(variance, 0.0))
+        return (mean, mean + self.width * deviation, mean - self.width * deviation)
+
+    def update(self, bar: Bar) -> Tuple[float, ...]:
+        values = self.peek(bar)
+        self.window.append(bar.close)
+        self.total += bar.close
+        self.squares += bar.close ** 2
+        if len(self.window) > self.period:
+            dropped = self.window.popleft()
+            self.total -= dropped
+            self.squares -= dropped ** 2
+        return values
+
+
+class VWAP(Indicator):
+    """Volume-weighted average of the typical price, restarting every day."""
+
+    name = "vwap"
+    lines = ("vwap",)
+
+    def __init__(self):
+        self.reset()
+
+    def seed(self, df: pd.DataFrame, start: int = 0, end: Optional[int] = None,
+             times: Optional[np.ndarray] = None) -> None:
+        # Only the bars of the last day count: find where it starts
+        end = len(df) if end is None else end
+        self.reset()
+        if end <= start:
+            return
+        if times is None:
+            times = to_datetime64(df["Time"])
+        days = times[start:end].astype("datetime64[D]")
+        first = start + int(np.searchsorted(days, days[-1]))
+        super().seed(df, first, end, times)
+
+    def compute(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        typical = (df["High"].to_numpy(dtype=np.float64) + df["Low"].to_numpy(dtype=np.float64)
+                   + df["Close"].to_numpy(dtype=np.float64)) / 3
+        volumes = df["Volume"].to_numpy(dtype=np.float64) if "Volume" in df.columns else np.ones(len(df))
+        days = to_datetime64(df["Time"]).astype("datetime64[D]")
+
+        # Cumulative sums restarted at the first bar of every day
+        day_starts = np.flatnonzero(np.concatenate(([True], days[1:] != days[:-1])))
+        lengths = np.diff(np.concatenate((day_starts, [len(days)])))
+
+        def session_cumsum(values: np.ndarray) -> np.ndarray:
+            totals = np.cumsum(values)
+            before = np.concatenate(([0.0], totals))[day_starts]
+            return totals - np.repeat(before, lengths)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return {"vwap": session_cumsum(typical * volumes) / session_cumsum(volumes)}
+
+    def reset(self) -> None:
+        self.day = None
+        self.weighted = 0.0
+        self.volume = 0.0
+
+    def _next(self, bar: Bar) -> Tuple[np.datetime64, float, float]:
+        day = np.datetime64(bar.time, "D")
+        weighted, volume = (self.weighted, self.volume) if day == self.day else (0.0, 0.0)
+        typical = (bar.high + bar.low + bar.close) / 3
+        return day, weighted + typical * bar.volume, volume + bar.volume
+
+    def peek(self, bar: Bar) -> Tuple[float, ...]:
+        _, weighted, volume = self._next(bar)
+        return (weighted / volume if volume else math.nan,)
+
+    def update(self, bar: Bar) -> Tuple[float, ...]:
+        values = self.peek(bar)
+        self.day, self.weighted, self.volume = self._next(bar)
+        return values
+
+
+class IndicatorCache:
+    """
+    Indicator series per (indicator, parameters, time frame).
+
+    Each entry keeps the values of the first bars of a frame, the streaming
+    state of the indicator after those bars, and grows as more bars are
+    requested: a few new bars go through ``update``, a large jump is
+    recomputed with the vectorized path. Shorter requests are answered from
+    the stored values since every indicator only looks backwards; a shorter
+    request with a partial bar rewinds the entry to that length.
+    """
+
+    def __init__(self):
+        self.entries: Dict[Tuple[Hashable, ...], Tuple[Indicator, Dict[str, np.ndarray], int]] = {}
+        # Arrays of the last frame read by _extend, to skip DataFrame lookups per bar
+        self._columns: Tuple[Optional[pd.DataFrame], Tuple[np.ndarray, ...]] = (None, ())
+
+    def get(
+        self,
+        indicator: Indicator,
+        time_frame: str,
+        df: pd.DataFrame,
+        count: Optional[int] = None,
+        partial: Optional[Bar] = None,
+        times: Optional[np.ndarray] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Get the values of an indicator over the first ``count`` rows of a frame.
+
+        Args:
+            indicator: Indicator (its ``key`` identifies the entry)
+            time_frame: Time frame of ``df``
+            df: Data of the time frame
+            count: Number of complete rows (default: every row)
+            partial: Bar still being formed after those rows, if any; its
+                values are appended without entering the cached state
+            times: ``datetime64`` times of every row of ``df`` (see ``bars``)
+
+        Returns:
+            Dict mapping each line name to an array of ``count`` values, plus
+            one if ``partial`` is given
+        """
+        count = len(df) if count is None else count
+        key = indicator.key + (time_frame,)
+        entry = self.entries.get(key)
+
+        if entry is None or entry[2] < count - STREAM_LIMIT:
+            entry = self._compute(key, indicator, df, count, times)
+        elif entry[2] < count:
+            entry = self._extend(key, entry, df, count, times)
+
+        stream, values, length = entry
+        if partial is not None and length != count:
+            # The entry is ahead of the request (e.g. after seeking back):
+            # rewind it once, the later rows are computed again when needed
+            stream.seed(df, 0, count, times)
+            self.entries[key] = (stream, values, count)
+
+        result = {line: values[line][:count] for line in stream.lines}
+        if partial is not None:
+            for line, value in zip(stream.lines, stream.peek(partial)):
+                result[line] = np.append(result[line], value)
+        return result
+
+    def _compute(self, key, indicator: Indicator, df: pd.DataFrame, count: int, times: Optional[np.ndarray]):
+        """Compute an entry with the vectorized path and seed its state."""
+        stream = copy.copy(indicator)
+        computed = indicator.compute(df.iloc[:count])
+
+        # Room for the whole frame, so that extending never reallocates
+        values = {}
+        for line in stream.lines:
+            values[line] = np.full(max(len(df), count), np.nan)
+            values[line][:count] = computed[line]
+
+        stream.seed(df, 0, count, times)
+        entry = (stream, values, count)
+        self.entries[key] = entry
+        return entry
+
+    def _extend(self, key, entry, df: pd.DataFrame, count: int, times: Optional[np.ndarray]):
+        """Extend an entry bar by bar with the streaming updates."""
+        stream, values, length = entry
+        capacity = len(values[stream.lines[0]])
+        if capacity < count:
+            for line in stream.lines:
+                grown = np.full(max(count, 2 * capacity), np.nan)
+                grown[:length] = values[line][:length]
+                values[line] = grown
+
+        if self._columns[0] is not df:
+            self._columns = (df, bar_columns(df, times))
+        for row, bar in enumerate(_bars(self._columns[1], length, count), start=length):
+            for line, value in zip(stream.lines, stream.update(bar)):
+                values[line][row] = value
+
+        entry = (stream, values, count)
+        self.entries[key] = entry
+        return entry
+
+    def clear(self) -> None:
+        """Drop every entry, e.g. when the base data changes."""
+        self.entries.clear()
@@ -0,0 +1,256 @@
+"""
+Streaming conversion of large tick or bar CSV exports into an OHLCStore.
+
+The file is read in chunks of rows. Each chunk's timestamps are parsed in
+one vectorized call, its rows are aggregated into bars, and every completed
+bar is appended to the store. Only the bar still being formed at the end of
+a chunk is carried over to the next one, so memory use depends on the chunk
+size, not on the size of the file.
+
+Usage:
+    python ingest.py ticks.csv data/store --time-format "%Y-%m-%d %H:%M:%S.%f"
+"""
+import argparse
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from model import OHLCStore, OHLCStoreWriter
+from resampling import bucket_starts
+
+
+# Names tried, in order, for the price column of tick files
+PRICE_COLUMNS = ("Price", "Last", "Close", "Bid")
+
+# Names tried, in order, for the traded quantity
+VOLUME_COLUMNS = ("Volume", "Size", "Quantity")
+
+BAR_COLUMNS = ("Time", "Open", "High", "Low", "Close", "Volume")
+
+
+def parse_times(values: pd.Series, time_format: Optional[str] = None, unit: Optional[str] = None) -> np.ndarray:
+    """
+    Parse a column of timestamps in a single vectorized call.
+
+    Args:
+        values: Raw timestamps (strings or epoch numbers)
+        time_format: strptime format of the strings; ISO 8601 if not given
+        unit: Unit of epoch numbers ("s", "ms", "us" or "ns"), instead of
+            a format
+
+    Returns:
+        Array of ``datetime64[ns]``
+    """
+    if unit is not None:
+        parsed = pd.to_datetime(values, unit=unit)
+    else:
+        parsed = pd.to_datetime(values, format=time_format or "ISO8601")
+    return parsed.to_numpy(dtype="datetime64[ns]")
+
+
+def aggregate_bars(
+    starts: np.ndarray,
+    opens: np.ndarray,
+    highs: np.ndarray,
+    lows: np.ndarray,
+    closes: np.ndarray,
+    volumes: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """
+    Merge consecutive rows sharing the same bar start.
+
+    Ticks are aggregated by passing their price as open, high, low and
+    close. Already aggregated bars can be merged again the same way.
+
+    Args:
+        starts: Bar start of each row, in ascending order
+        opens, highs, lows, closes, volumes: Values of each row
+
+    Returns:
+        Dict of the bar columns (see ``BAR_COLUMNS``)
+    """
+    if len(starts) == 0:
+        return {name: np.empty(0, dtype="datetime64[ns]" if name == "Time" else np.float64) for name in BAR_COLUMNS}
+
+    first = np.concatenate(([0], np.flatnonzero(starts[1:] != starts[:-1]) + 1))
+    last = np.concatenate((first[1:], [len(starts)])) - 1
+    return {
+        "Time": starts[first],
+        "Open": opens[first],
+        "High": np.maximum.reduceat(highs, first),
+        "Low": np.minimum.reduceat(lows, first),
+        "Close": closes[last],
+        "Volume": np.add.reduceat(volumes, first)
+    }
+
+
+def _empty_bars() -> pd.DataFrame:
+    """Get a DataFrame of zero bars with the column types of real ones."""
+    empty = np.empty(0, dtype=np.float64)
+    return pd.DataFrame(aggregate_bars(np.empty(0, dtype="datetime64[ns]"), empty, empty, empty, empty, empty))
+
+
+def _find_column(columns: Iterable[str], names: Iterable[str]) -> Optional[str]:
+    """Get the first of ``names`` found in ``columns``."""
+    return next((name for name in names if name in columns), None)
+
+
+class BarBuilder:
+    """
+    Incremental aggregation of time-sorted rows into bars.
+
+    ``add`` returns the bars completed by a block of rows and keeps the
+    last, possibly incomplete, bar until a later block starts a new one or
+    ``finish`` is called.
+    """
+
+    def __init__(self, time_frame: str = "m1"):
+        """
+        Initialize an empty builder.
+
+        Args:
+            time_frame: Length of the bars ("m1", "m5", "h1", ...)
+        """
+        self.time_frame = time_frame
+        self.pending: Optional[Dict[str, np.ndarray]] = None
+
+    def add(
+        self,
+        times: np.ndarray,
+        opens: np.ndarray,
+        highs: np.ndarray,
+        lows: np.ndarray,
+        closes: np.ndarray,
+        volumes: np.ndarray
+    ) -> pd.DataFrame:
+        """
+        Aggregate a block of rows.
+
+        Args:
+            times: Timestamps (``datetime64[ns]``), not earlier than those
+                of the previous blocks
+            opens, highs, lows, closes, volumes: Values of each row
+
+        Returns:
+            The completed bars, as a DataFrame with ``BAR_COLUMNS``
+        """
+        if len(times) == 0:
+            return _empty_bars()
+
+        # Rows are usually sorted already; a stable sort keeps ties in file order
+        if np.any(times[1:] < times[:-1]):
+            order = np.argsort(times, kind="stable")
+            times, opens, highs, lows, closes, volumes = (
+                values[order] for values in (times, opens, highs, lows, closes, volumes)
+            )
+
+        bars = aggregate_bars(bucket_starts(times, self.time_frame), opens, highs, lows, closes, volumes)
+
+        if self.pending is not None:
+            if bars["Time"][0] < self.pending["Time"][0]:
+                raise ValueError(f"Rows are not in time order: {bars['Time'][0]} after {self.pending['Time'][0]}")
+            # Merge the carried bar with the first bar of the block if they overlap
+            merged = {name: np.concatenate((self.pending[name], bars[name])) for name in BAR_COLUMNS}
+            bars = aggregate_bars(*(merged[name] for name in BAR_COLUMNS))
+
+        # The last bar may continue in the next block
+        self.pending = {name: values[-1:] for name, values in bars.items()}
+        return pd.DataFrame({name: values[:-1] for name, values in bars.items()})
+
+    def finish(self) -> pd.DataFrame:
+        """Get the last bar, once every row was added."""
+        pending, self.pending = self.pending, None
+        if pending is None:
+            return _empty_bars()
+        return pd.DataFrame(pending)
+
+
+def ingest_csv(
+    path: str,
+    store_path: str,
+    time_frame: str = "m1",
+    time_column: str = "Time",
+    time_format: Optional[str] = None,
+    time_unit: Optional[str] = None,
+    chunk_rows: int = 1_000_000
+) -> OHLCStore:
+    """
+    Convert a tick or bar CSV file into a store of bars, chunk by chunk.
+
+    Files with Open, High, Low and Close columns are read as bars (e.g.
+    1-second bars) and merged into larger ones; otherwise the first column
+    of ``PRICE_COLUMNS`` is read as tick prices. The volume is taken from
+    the first column of ``VOLUME_COLUMNS``, or counts the rows if there is
+    none.
+
+    Args:
+        path: CSV file, sorted by time
+        store_path: Folder of the OHLCStore to create
+        time_frame: Length of the bars ("m1", "m5", "h1", ...)
+        time_column: Name of the timestamp column
+        time_format: strptime format of the timestamps (see ``parse_times``)
+        time_unit: Unit of epoch timestamps (see ``parse_times``)
+        chunk_rows: Number of rows parsed at once
+
+    Returns:
+        The opened store
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    if time_column not in header:
+        raise ValueError(f"No {time_column} column in {path}")
+
+    if all(name in header for name in ("Open", "High", "Low", "Close")):
+        price_columns = ["Open", "High", "Low", "Close"]
+    else:
+        # Ticks: the price is the open, high, low and close of the row
+        price_column = _find_column(header, PRICE_COLUMNS)
+        if price_column is None:
+            raise ValueError(f"No price column in {path}: expected one of {PRICE_COLUMNS}")
+        price_columns = [price_column] * 4
+    volume_column = _find_column(header, VOLUME_COLUMNS)
+
+    usecols = list(dict.fromkeys([time_column] + price_columns + ([volume_column] if volume_column else [])))
+    dtypes = {name: np.float64 for name in usecols if name != time_column}
+
+    builder = BarBuilder(time_frame)
+    writer = OHLCStoreWriter(store_path)
+    try:
+        for chunk in pd.read_csv(path, usecols=usecols, dtype=dtypes, chunksize=chunk_rows):
+            times = parse_times(chunk[time_column], time_format, time_unit)
+            prices = [chunk[name].to_numpy() for name in price_columns]
+            volumes = chunk[volume_column].to_numpy() if volume_column else np.ones(len(chunk))
+            writer.append(builder.add(times, *prices, volumes))
+        writer.append(builder.finish())
+    except BaseException:
+        writer.discard()
+        raise
+
+    return writer.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert a tick or bar CSV file into an OHLCStore.")
+    parser.add_argument("path", help="CSV file to read")
+    parser.add_argument("store", help="Folder of the store to create")
+    parser.add_argument("--time-frame", default="m1", help="Length of the bars (m1, m5, h1...)")
+    parser.add_argument("--time-column", default="Time", help="Name of the timestamp column")
+    parser.add_argument("--time-format", help="strptime format of the timestamps (ISO 8601 by default)")
+    parser.add_argument("--time-unit", choices=["s", "ms", "us", "ns"], help="Unit of epoch timestamps")
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000, help="Rows parsed at once")
+    args = parser.parse_args()
+
+    store = ingest_csv(
+        args.path,
+        args.store,
+        time_frame=args.time_frame,
+        time_column=args.time_column,
+        time_format=args.time_format,
+        time_unit=args.time_unit,
+        chunk_rows=args.chunk_rows
+    )
+    print(f"{len(store):,} bars written to {args.store}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import time
+from bisect import bisect_left
+from collections import deque
+from functools import wraps
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+BUCKET_BOUNDS_MS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 16.0, 25.0, 50.0, 100.0, 250.0, float("inf"))
+
+
+class PhaseStats:
+    """
+    Aggregated timings of one instrumented phase.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget every recorded call."""
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.items = 0
+        self.histogram = [0] * len(BUCKET_BOUNDS_MS)
+
+    def add(self, seconds: float, items: Optional[int] = None) -> None:
+        """
+        Record one call.
+
+        Args:
+            seconds: Duration of the call
+            items: Number of canvas items drawn by the call, if known
+        """
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if items is not None:
+            self.items += items
+        self.histogram[bisect_left(BUCKET_BOUNDS_MS, seconds * 1000)] += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Get the statistics in milliseconds, with the non-empty buckets of the histogram."""
+        return {
+            'count': self.count,
+            'mean_ms': self.total / self.count * 1000 if self.count else 0.0,
+            'max_ms': self.max * 1000,
+            'mean_items': self.items / self.count if self.count else 0.0,
+            'histogram_ms': {
+                f"<={bound:g}": count for bound, count in zip(BUCKET_BOUNDS_MS, self.histogram) if count
+            }
+        }
+
+
+class Profiler:
+    """
+    Timing histograms of the chart's hot paths, plus frame time and FPS.
+
+    The profiler does not hook anything by itself: ``wrap`` returns a timed
+    version of a function, and the owner installs it in place of the
+    original only while profiling is enabled (see
+    ``DragZoomApp.set_instrumentation``). When disabled, the original
+    functions are called directly and nothing is measured.
+    """
+
+    def __init__(self, window: int = 120):
+        """
+        Initialize an empty profiler.
+
+        Args:
+            window: Number of recent frames kept for the frame time and FPS
+        """
+        self.phases: Dict[str, PhaseStats] = {}
+        self.frames: Deque[tuple] = deque(maxlen=window)
+
+    def wrap(
+        self,
+        phase: str,
+        function: Callable[..., Any],
+        items: Optional[Callable[[], int]] = None,
+        frame: bool = False,
+        on_done: Optional[Callable[[], None]] = None
+    ) -> Callable[..., Any]:
+        """
+        Time every call of a function.
+
+        Args:
+            phase: Name under which the calls are aggregated
+            function: Function to time
+            items: Called after each call to count the items it drew
+            frame: If True, each call also counts as a displayed frame
+            on_done: Called after each call, e.g. to refresh a display
+
+        Returns:
+            Function with the same signature as ``function``
+        """
+        stats = self.phases.setdefault(phase, PhaseStats())
+
+        @wraps(function)
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                end = time.perf_counter()
+                stats.add(end - start, items() if items is not None else None)
+                if frame:
+                    self.frames.append((end, end - start))
+                if on_done is not None:
+                    on_done()
+
+        return timed
+
+    @property
+    def frame_time(self) -> Optional[float]:
+        """Mean duration of the last ten frames, in seconds."""
+        if not self.frames:
+            return None
+        recent = list(self.frames)[-10:]
+        return sum(duration for _, duration in recent) / len(recent)
+
+    @property
+    def fps(self) -> float:
+        """Number of frames drawn during the last second."""
+        since = time.perf_counter() - 1.0
+        return float(sum(1 for end, _ in self.frames if end >= since))
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Get the statistics of every phase called at least once."""
+        return {phase: stats.as_dict() for phase, stats in self.phases.items() if stats.count}
+
+    def summary(self) -> List[str]:
+        """Get one line per phase, slowest mean first."""
+        report = sorted(self.report().items(), key=lambda entry: -entry[1]['mean_ms'])
+        return [
+            f"{phase:<20} {stats['count']:>7} calls  mean {stats['mean_ms']:8.3f} ms  "
+            f"max {stats['max_ms']:8.3f} ms  items {stats['mean_items']:8.1f}"
+            for phase, stats in report
+        ]
+
+    def reset(self) -> None:
+        """Forget every measurement."""
+        for stats in self.phases.values():
+            stats.reset()
+        self.frames.clear()
@@ -0,0 +1,651 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import Future
+from datetime import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from resampling import bucket_starts, nests_in, resample_ohlc, to_datetime64
+
+
+# Folder, next to the source file, holding the binary caches
+CACHE_DIR_NAME = ".cache"
+
+# Bump when the cache layout changes so old caches are ignored
+CACHE_VERSION = 2
+
+
+def load_history(path: str, prepare: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None) -> pd.DataFrame:
+    """
+    Load historical OHLC data, going through a binary columnar cache.
+
+    The first load parses the source file (xlsx or csv) and writes every
+    column as a NumPy array to ``<folder>/.cache/<name>.npz``. Later loads
+    read the arrays back directly, which skips spreadsheet parsing. The
+    cache records the source's modification time, size and content hash.
+    A cache whose time and size still match is used without reading the
+    source; otherwise the source is hashed, and the cache is only rebuilt
+    if the content actually changed (if not, its stamp is updated so that
+    the next load skips the hash again).
+
+    Args:
+        path: Path to the source file
+        prepare: Optional function applied to the loaded DataFrame (the
+            cache holds the data before it)
+
+    Returns:
+        DataFrame with the columns of the source file
+    """
+    df = _load_history(path, _SourceVersion(path))
+    return df if prepare is None else prepare(df)
+
+
+def _load_history(path: str, source: "_SourceVersion") -> pd.DataFrame:
+    """Load a source file through its binary cache (see ``load_history``)."""
+    cache_path = _cache_path(path)
+    df = _read_cache(cache_path, source)
+    if df is None:
+        df = _read_source(path)
+        _write_cache(cache_path, source.stamp, source.digest, df)
+    return df
+
+
+def load_history_store(path: str, prepare: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None) -> "OHLCStore":
+    """
+    Open the OHLCStore of a history file, building it on first use.
+
+    The store is kept in ``<folder>/.cache/<name>.store`` and records the
+    stamp and content hash of its source, like the binary cache of
+    ``load_history``. It is rebuilt only when the source content changes, so
+    later calls just map the column files and nothing is read until the
+    chart asks for rows.
+
+    Args:
+        path: Path to the source file
+        prepare: Optional function applied to the loaded DataFrame before
+            it is written (the Time column must end up as datetime64)
+
+    Returns:
+        The opened store
+    """
+    store_path = os.path.splitext(_cache_path(path))[0] + ".store"
+    source = _SourceVersion(path)
+
+    if os.path.exists(os.path.join(store_path, OHLCStore.META_FILE)):
+        store = OHLCStore(store_path)
+        if store.source.get("stamp") == source.stamp:
+            return store
+        if store.source.get("digest") == source.digest:
+            store.set_source(source.describe())
+            return store
+
+    df = _load_history(path, source)
+    if prepare is not None:
+        df = prepare(df)
+    return OHLCStore.write(store_path, df, source=source.describe())
+
+
+def _cache_path(path: str) -> str:
+    """Get the cache file path of a source file."""
+    folder, name = os.path.split(os.path.abspath(path))
+    return os.path.join(folder, CACHE_DIR_NAME, os.path.splitext(name)[0] + ".npz")
+
+
+def _source_stamp(path: str) -> str:
+    """Identify the current version of a source file from its metadata only."""
+    stat = os.stat(path)
+    return f"v{CACHE_VERSION}-{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def _source_digest(path: str) -> str:
+    """Hash the content of a source file."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as source:
+        for chunk in iter(lambda: source.read(1 << 20), b""):
+            digest.update(chunk)
+    return f"v{CACHE_VERSION}-{digest.hexdigest()}"
+
+
+class _SourceVersion:
+    """
+    Version of a source file: its stamp, and its content hash on demand.
+
+    The hash is computed the first time it is needed and then kept, so a
+    load hashes the source at most once whatever the caches it checks.
+    """
+
+    def __init__(self, path: str):
+        """
+        Read the stamp of a source file.
+
+        Args:
+            path: Path to the source file
+        """
+        self.path = path
+        self.stamp = _source_stamp(path)
+        self._digest: Optional[str] = None
+
+    @property
+    def digest(self) -> str:
+        """Content hash of the source (see ``_source_digest``)."""
+        if self._digest is None:
+            self._digest = _source_digest(self.path)
+        return self._digest
+
+    def describe(self) -> Dict[str, str]:
+        """Get the stamp and hash as kept in the metadata of a store."""
+        return {"stamp": self.stamp, "digest": self.digest}
+
+
+def _read_source(path: str) -> pd.DataFrame:
+    """Parse a source file according to its extension."""
+    if path.lower().endswith(".csv"):
+        return pd.read_csv(path)
+    return pd.read_excel(path)
+
+
+def _read_cache(cache_path: str, source: _SourceVersion) -> Optional[pd.DataFrame]:
+    """
+    Read a cache file if it matches the source.
+
+    The source is only hashed when its stamp differs from the cached one
+    (e.g. the file was copied or touched). If the content is unchanged the
+    cache is written again with the new stamp.
+
+    Args:
+        cache_path: Path of the cache file
+        source: Current version of the source
+
+    Returns:
+        The cached DataFrame, or None if the cache is missing or stale
+    """
+    if not os.path.exists(cache_path):
+        return None
+
+    try:
+        with np.load(cache_path, allow_pickle=False) as cache:
+            stale = str(cache["__stamp__"]) != source.stamp
+            if stale and str(cache["__digest__"]) != source.digest:
+                return None
+            columns = [str(name) for name in cache["__columns__"]]
+            kinds = [str(kind) for kind in cache["__time_kinds__"]]
+            arrays = {name: cache[name] for name in columns}
+    except (OSError, KeyError, ValueError):
+        return None
+
+    if stale:
+        _save_cache(cache_path, source.stamp, source.digest, columns, kinds, arrays)
+
+    data = {name: _decode_column(arrays[name], kind) for name, kind in zip(columns, kinds)}
+    return pd.DataFrame(data, columns=columns)
+
+
+def _write_cache(cache_path: str, stamp: str, digest: str, df: pd.DataFrame) -> None:
+    """
+    Write a DataFrame to a cache file.
+
+    If a column cannot be stored as a plain array the cache is not written,
+    and the source is simply parsed on every load.
+
+    Args:
+        cache_path: Path of the cache file
+        stamp: Stamp of the source (see ``_source_stamp``)
+        digest: Content hash of the source (see ``_source_digest``)
+        df: DataFrame to cache
+    """
+    arrays = {}
+    time_kinds = []
+    for name in df.columns:
+        encoded = _encode_column(df[name])
+        if encoded is None:
+            return
+        arrays[name], kind = encoded
+        time_kinds.append(kind)
+
+    _save_cache(cache_path, stamp, digest, [str(name) for name in df.columns], time_kinds, arrays)
+
+
+def _save_cache(
+    cache_path: str,
+    stamp: str,
+    digest: str,
+    columns: List[str],
+    time_kinds: List[str],
+    arrays: Dict[str, np.ndarray]
+) -> None:
+    """Write encoded columns to a cache file, replacing it atomically."""
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    temp_path = cache_path + ".tmp"
+    with open(temp_path, "wb") as cache:
+        np.savez(
+            cache,
+            __stamp__=np.array(stamp),
+            __digest__=np.array(digest),
+            __columns__=np.array(columns),
+            __time_kinds__=np.array(time_kinds),
+            **{str(name): array for name, array in arrays.items()}
+        )
+    os.replace(temp_path, cache_path)
+
+
+def _encode_column(column: pd.Series) -> Optional[Tuple[np.ndarray, str]]:
+    """
+    Convert a column to a fixed-width array.
+
+    Returns:
+        Tuple of (array, kind) where kind is "datetime", "time" or "" for
+        plain numeric columns, or None if the column is not supported
+    """
+    if pd.api.types.is_datetime64_any_dtype(column):
+        return column.to_numpy(dtype="datetime64[ns]").view(np.int64), "datetime"
+
+    if pd.api.types.is_numeric_dtype(column):
+        return column.to_numpy(), ""
+
+    values = column.to_numpy()
+    if len(values) and all(isinstance(v, time) for v in values):
+        # Nanoseconds since midnight
+        nanoseconds = np.fromiter(
+            ((v.hour * 3600 + v.minute * 60 + v.second) * 1_000_000_000 + v.microsecond * 1000
+             for v in values),
+            dtype=np.int64, count=len(values)
+        )
+        return nanoseconds, "time"
+
+    return None
+
+
+def _decode_column(array: np.ndarray, kind: str) -> np.ndarray:
+    """Convert a cached array back to its column representation."""
+    if kind == "datetime":
+        return array.view("datetime64[ns]")
+    if kind == "time":
+        return (pd.Timestamp(0) + pd.to_timedelta(array, unit="ns")).time
+    return array
+
+
+class OHLCStore:
+    """
+    Memory-mapped OHLCV history stored as one binary file per column.
+
+    A store is a folder holding ``meta.json`` (length and column dtypes) and
+    a ``<column>.bin`` file of fixed-width values for every column. The Time
+    column is kept as sorted int64 nanoseconds and doubles as the timestamp
+    index. Opening a store only maps the files: rows are read from disk when
+    a slice of them is actually used.
+
+    Larger time frames are aggregated once into stores of their own, kept
+    in ``frames/<time frame>`` inside the folder (see ``aggregate``).
+    """
+
+    META_FILE = "meta.json"
+    FRAMES_DIR = "frames"
+
+    # Source rows aggregated at a time when a frame is built
+    FRAME_CHUNK_ROWS = 1_000_000
+
+    def __init__(self, path: str):
+        """
+        Open an existing store.
+
+        Args:
+            path: Folder of the store
+        """
+        self.path = path
+        with open(os.path.join(path, self.META_FILE)) as meta_file:
+            meta = json.load(meta_file)
+
+        self.length = meta["length"]
+        self.source: Dict[str, str] = meta.get("source", {})
+        self.columns: Dict[str, np.ndarray] = {}
+        for name, dtype in meta["columns"].items():
+            self.columns[name] = self._map(name, dtype)
+        self._frames: Dict[str, OHLCStore] = {}
+
+    @classmethod
+    def write(cls, path: str, df: pd.DataFrame, source: Optional[Dict[str, str]] = None) -> "OHLCStore":
+        """
+        Create (or overwrite) a store from a DataFrame.
+
+        Args:
+            path: Folder of the store
+            df: DataFrame with a Time column sorted in ascending order
+            source: Optional description of the data source, kept in the
+                metadata (see ``OHLCStore.source``)
+
+        Returns:
+            The opened store
+        """
+        writer = OHLCStoreWriter(path, source)
+        writer.append(df)
+        return writer.close()
+
+    def __len__(self) -> int:
+        return self.length
+
+    def set_source(self, source: Dict[str, str]) -> None:
+        """
+        Replace the description of the data source kept in the metadata.
+
+        Args:
+            source: New description (see ``OHLCStore.source``)
+        """
+        meta_path = os.path.join(self.path, self.META_FILE)
+        with open(meta_path) as meta_file:
+            meta = json.load(meta_file)
+        meta["source"] = source
+
+        temp_path = meta_path + ".tmp"
+        with open(temp_path, "w") as meta_file:
+            json.dump(meta, meta_file)
+        os.replace(temp_path, meta_path)
+        self.source = source
+
+    def _map(self, name: str, dtype: str) -> np.ndarray:
+        """Map a column file into memory (read-only)."""
+        storage = np.int64 if dtype == "datetime64[ns]" else np.dtype(dtype)
+        if self.length == 0:
+            values = np.empty(0, dtype=storage)
+        else:
+            values = np.memmap(
+                os.path.join(self.path, f"{name}.bin"),
+                dtype=storage, mode="r", shape=(self.length,)
+            )
+        if dtype == "datetime64[ns]":
+            values = np.asarray(values).view("datetime64[ns]")
+        return values
+
+    def search(self, timestamp, side: str = "left") -> int:
+        """
+        Find the row position of a timestamp with a binary search.
+
+        Args:
+            timestamp: Anything accepted by ``np.datetime64``
+            side: "left" for the first row at or after ``timestamp``,
+                "right" for the first row after it
+
+        Returns:
+            Row position
+        """
+        target = np.datetime64(pd.Timestamp(timestamp).to_datetime64(), "ns")
+        return int(np.searchsorted(self.columns["Time"], target, side=side))
+
+    def slice(self, start: int, end: int) -> pd.DataFrame:
+        """
+        Get rows ``[start, end)`` as a DataFrame backed by the mapped files.
+
+        Args:
+            start: First row
+            end: Row after the last row
+
+        Returns:
+            DataFrame sharing memory with the store
+        """
+        data = {name: pd.Series(values[start:end], copy=False) for name, values in self.columns.items()}
+        return pd.DataFrame(data, copy=False)
+
+    def frame(self) -> pd.DataFrame:
+        """Get every row as a DataFrame backed by the mapped files."""
+        return self.slice(0, self.length)
+
+    def aggregate(self, time_frame: str, finer: Sequence[str] = ()) -> "OHLCStore":
+        """
+        Get the bars of a larger time frame.
+
+        A frame is aggregated on first request and kept; on disk it is read
+        back from ``frames/<time frame>`` by later sessions. The largest
+        frame of ``finer`` whose bars nest in ``time_frame`` is aggregated
+        instead of the base rows, which keeps the work small for the
+        largest frames.
+
+        Args:
+            time_frame: Time frame to aggregate the base rows to
+            finer: Time frames between the base one and ``time_frame``, in
+                increasing order
+
+        Returns:
+            Store of the aggregated bars
+        """
+        if time_frame not in self._frames:
+            nested = [index for index, name in enumerate(finer) if nests_in(name, time_frame)]
+            source = self.aggregate(finer[nested[-1]], finer[:nested[-1]]) if nested else self
+            self._frames[time_frame] = self._build_frame(source, time_frame)
+        return self._frames[time_frame]
+
+    def _build_frame(self, source: "OHLCStore", time_frame: str) -> "OHLCStore":
+        """Open the stored bars of a time frame, or write them from the rows of ``source``."""
+        path = os.path.join(self.path, self.FRAMES_DIR, time_frame)
+        try:
+            frame = OHLCStore(path)
+            if frame.source.get("time_frame") == time_frame:
+                return frame
+        except (OSError, ValueError, KeyError):
+            pass
+
+        writer = OHLCStoreWriter(path, {"time_frame": time_frame})
+        times = source.columns["Time"]
+        start = 0
+        try:
+            while start < len(source):
+                end = min(len(source), start + self.FRAME_CHUNK_ROWS)
+                if end < len(source):
+                    # End the chunk where a bar starts so that no bar is split;
+                    # a bar longer than a chunk is read whole with the rest
+                    end = source.search(bucket_starts(times[end:end + 1], time_frame)[0])
+                    if end <= start:
+                        end = len(source)
+                writer.append(resample_ohlc(source.slice(start, end), time_frame))
+                start = end
+        except BaseException:
+            writer.discard()
+            raise
+        return writer.close()
+
+
+class OHLCMemoryStore(OHLCStore):
+    """
+    OHLCStore interface over a DataFrame held in memory.
+
+    Used by the chart for data that does not come from a store; the
+    aggregated frames are kept in memory as well.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        """
+        Wrap a DataFrame.
+
+        Args:
+            df: DataFrame with a ``datetime64[ns]`` Time column sorted in
+                ascending order (its columns are shared, not copied)
+        """
+        self.path = None
+        self.length = len(df)
+        self.source: Dict[str, str] = {}
+        self.columns: Dict[str, np.ndarray] = {name: df[name].to_numpy() for name in df.columns}
+        self._frames: Dict[str, OHLCStore] = {}
+
+    def set_source(self, source: Dict[str, str]) -> None:
+        self.source = source
+
+    def _build_frame(self, source: OHLCStore, time_frame: str) -> OHLCStore:
+        return OHLCMemoryStore(resample_ohlc(source.frame(), time_frame))
+
+
+class OHLCStoreWriter:
+    """
+    Create an OHLCStore one block of rows at a time.
+
+    Each block is appended to the column files as it arrives, so a store
+    larger than memory can be built from a stream. ``meta.json`` is only
+    written by ``close``: until then the folder cannot be opened as a store.
+    """
+
+    def __init__(self, path: str, source: Optional[Dict[str, str]] = None):
+        """
+        Start a new store (an existing store in the folder is overwritten).
+
+        Args:
+            path: Folder of the store
+            source: Optional description of the data source, kept in the
+                metadata
+        """
+        self.path = path
+        self.source = source or {}
+        self.length = 0
+        self.dtypes: Dict[str, str] = {}
+        self._files: Dict[str, Any] = {}
+
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, OHLCStore.META_FILE)
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        # Frames aggregated from the rows being replaced
+        shutil.rmtree(os.path.join(path, OHLCStore.FRAMES_DIR), ignore_errors=True)
+
+    def append(self, df: pd.DataFrame) -> None:
+        """
+        Append rows to the store.
+
+        Args:
+            df: Rows with the same columns as the first block, the Time
+                column continuing in ascending order
+        """
+        if not self._files:
+            # The first block fixes the columns and their types
+            for name in df.columns:
+                self.dtypes[name] = "datetime64[ns]" if name == "Time" else df[name].to_numpy().dtype.str
+                self._files[name] = open(os.path.join(self.path, f"{name}.bin"), "wb")
+        elif list(df.columns) != list(self.dtypes):
+            raise ValueError(f"Expected columns {list(self.dtypes)}, got {list(df.columns)}")
+
+        for name in df.columns:
+            if name == "Time":
+                values = to_datetime64(df[name]).view(np.int64)
+            else:
+                values = df[name].to_numpy(dtype=self.dtypes[name])
+            np.ascontiguousarray(values).tofile(self._files[name])
+        self.length += len(df)
+
+    def close(self) -> OHLCStore:
+        """
+        Finish the store.
+
+        Returns:
+            The opened store
+        """
+        for column_file in self._files.values():
+            column_file.close()
+        self._files = {}
+
+        with open(os.path.join(self.path, OHLCStore.META_FILE), "w") as meta_file:
+            json.dump(
+                {"version": CACHE_VERSION, "length": self.length, "columns": self.dtypes, "source": self.source},
+                meta_file
+            )
+
+        return OHLCStore(self.path)
+
+    def discard(self) -> None:
+        """Close the column files without finishing the store."""
+        for column_file in self._files.values():
+            column_file.close()
+        self._files = {}
+
+
+class HistoryProvider:
+    """
+    Lazily loaded, cached access to a history file.
+
+    Nothing is read until the data is first requested. Requests from the
+    GUI load the file on a background thread and hand the data (a DataFrame,
+    or whatever the loader returns) back on the Tk thread, so large files
+    never block the mainloop. Once loaded the data is kept and every later
+    request is answered immediately.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        prepare: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+        loader: Callable[..., Any] = load_history
+    ):
+        """
+        Initialize the provider.
+
+        Args:
+            path: Path to the source file
+            prepare: Optional function applied to the loaded DataFrame
+            loader: Function reading the data, called with ``path`` and
+                ``prepare``; ``load_history_store`` provides an OHLCStore
+                instead of a DataFrame
+        """
+        self.path = path
+        self.prepare = prepare
+        self.loader = loader
+        self._future: Optional[Future] = None
+        self._lock = threading.Lock()
+
+    def _start(self) -> Future:
+        """Start loading on a background thread unless already started."""
+        with self._lock:
+            if self._future is None:
+                self._future = Future()
+                threading.Thread(target=self._load, args=(self._future,), daemon=True).start()
+            return self._future
+
+    def _load(self, future: Future) -> None:
+        """Load and prepare the data, storing the outcome in ``future``."""
+        try:
+            data = self.loader(self.path, self.prepare)
+        except Exception as error:
+            future.set_exception(error)
+        else:
+            future.set_result(data)
+
+    @property
+    def loaded(self) -> bool:
+        """True once the data is available."""
+        return self._future is not None and self._future.done() and self._future.exception() is None
+
+    def get(self) -> Any:
+        """Get the data, blocking until it is loaded."""
+        return self._start().result()
+
+    def request(
+        self,
+        widget: Any,
+        callback: Callable[[Any], None],
+        on_error: Optional[Callable[[BaseException], None]] = None,
+        poll_ms: int = 50
+    ) -> None:
+        """
+        Get the data without blocking the Tk mainloop.
+
+        The callback is called from the Tk thread through ``widget.after``.
+        Nothing is called if ``widget`` is destroyed before the data is ready.
+
+        Args:
+            widget: Any Tk widget, used for scheduling
+            callback: Called with the data once loaded
+            on_error: Called with the exception if loading failed
+            poll_ms: Delay between two checks, in milliseconds
+        """
+        future = self._start()
+
+        def poll() -> None:
+            if not widget.winfo_exists():
+                return
+            if not future.done():
+                widget.after(poll_ms, poll)
+            elif future.exception() is not None:
+                if on_error is not None:
+                    on_error(future.exception())
+            else:
+                callback(future.result())
+
+        poll()
@@ -0,0 +1,72 @@
+import time
+from typing import Any, Callable, Optional, Set
+
+
+class RedrawScheduler:
+    """
+    Coalesce redraw requests into at most one redraw per display frame.
+
+    Event handlers mark the layers they invalidate instead of drawing. The
+    first request of a frame schedules a single callback: right away when
+    Tk is idle if the previous frame is old enough, otherwise at the start
+    of the next frame. Every layer marked until then is redrawn once, so a
+    burst of wheel or drag events costs one redraw per frame rather than
+    one per event.
+    """
+
+    def __init__(self, widget: Any, redraw: Callable[[Set[str]], None], frame_ms: int = 16):
+        """
+        Initialize the scheduler.
+
+        Args:
+            widget: Any Tk widget, used for scheduling
+            redraw: Called with the set of dirty layers
+            frame_ms: Minimum delay between two redraws, in milliseconds
+        """
+        self.widget = widget
+        self.redraw = redraw
+        self.frame_ms = frame_ms
+
+        self.dirty: Set[str] = set()
+        self._job: Optional[str] = None
+        self._last_frame = 0.0
+
+    @property
+    def pending(self) -> bool:
+        """True while a redraw is scheduled."""
+        return self._job is not None
+
+    def invalidate(self, *layers: str) -> None:
+        """
+        Mark layers as needing a redraw and schedule it.
+
+        Args:
+            *layers: Names of the layers to redraw
+        """
+        self.dirty.update(layers)
+        if self._job is not None or not self.dirty:
+            return
+
+        elapsed_ms = (time.perf_counter() - self._last_frame) * 1000
+        if elapsed_ms >= self.frame_ms:
+            self._job = self.widget.after_idle(self.flush)
+        else:
+            self._job = self.widget.after(max(1, int(self.frame_ms - elapsed_ms)), self.flush)
+
+    def flush(self) -> None:
+        """Redraw the dirty layers now."""
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+
+        layers, self.dirty = self.dirty, set()
+        if layers:
+            self._last_frame = time.perf_counter()
+            self.redraw(layers)
+
+    def discard(self) -> None:
+        """Forget the dirty layers, e.g. after a full synchronous redraw."""
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+        self.dirty.clear()
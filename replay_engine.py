@@ -0,0 +1,151 @@
+import time
+from typing import Callable, List
+
+from utils import DragZoomApp
+
+
+class ReplayEngine:
+    """
+    Bar-by-bar playback of the data of a DragZoomApp.
+
+    The chart starts with only the first bars revealed. While playing, the
+    engine wakes up once per display frame, works out how many bars are due
+    from the elapsed time and the speed, and reveals all of them with a
+    single ``append_bars`` call, so high speeds cost one chart update per
+    frame rather than one per bar.
+    """
+
+    # Playback speeds offered to the user, in bars per second
+    SPEEDS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+    def __init__(self, chart: DragZoomApp, start: int = 100, speed: float = 10, frame_ms: int = 16):
+        """
+        Initialize the engine and hide the bars after ``start``.
+
+        Args:
+            chart: Chart to drive
+            start: Number of bars revealed before playback
+            speed: Playback speed in bars per second
+            frame_ms: Delay between two updates, in milliseconds
+        """
+        self.chart = chart
+        self.speed = speed
+        self.frame_ms = frame_ms
+
+        self.playing = False
+        self._job = None
+        self._last_tick = 0.0
+        self._carry = 0.0
+
+        # Called with the new position after every change
+        self.listeners: List[Callable[[int], None]] = []
+
+        self.chart.set_revealed(start)
+
+    @property
+    def position(self) -> int:
+        """Number of bars currently revealed."""
+        return self.chart.revealed
+
+    @property
+    def length(self) -> int:
+        """Total number of bars available."""
+        return self.chart.history_length
+
+    @property
+    def finished(self) -> bool:
+        """True once every bar is revealed."""
+        return self.position >= self.length
+
+    def play(self) -> None:
+        """Start or resume playback."""
+        if self.playing or self.finished:
+            return
+        self.playing = True
+        self._last_tick = time.perf_counter()
+        self._carry = 0.0
+        self._schedule()
+
+    def pause(self) -> None:
+        """Pause playback."""
+        self.playing = False
+        if self._job is not None:
+            self.chart.root.after_cancel(self._job)
+            self._job = None
+
+    def toggle(self) -> None:
+        """Pause if playing, play otherwise."""
+        if self.playing:
+            self.pause()
+        else:
+            self.play()
+
+    def step(self, count: int = 1) -> None:
+        """
+        Pause and reveal a given number of bars.
+
+        Args:
+            count: Number of bars to reveal
+        """
+        self.pause()
+        self._advance(count)
+
+    def seek(self, position: int) -> None:
+        """
+        Jump to a position and schedule a redraw of the whole chart.
+
+        The redraw goes through the chart's scheduler, so the seeks made by
+        dragging the position slider are drawn once per display frame.
+
+        Args:
+            position: Number of bars to reveal
+        """
+        self.chart.set_revealed(position)
+        self.chart.request_redraw()
+        self._notify()
+
+    def set_speed(self, speed: float) -> None:
+        """
+        Change the playback speed.
+
+        Args:
+            speed: Playback speed in bars per second
+        """
+        self.speed = speed
+
+    def _schedule(self) -> None:
+        """Plan the next update."""
+        self._job = self.chart.root.after(self.frame_ms, self._tick)
+
+    def _tick(self) -> None:
+        """Reveal the bars due since the last update."""
+        self._job = None
+        if not self.playing:
+            return
+
+        now = time.perf_counter()
+        due = self._carry + (now - self._last_tick) * self.speed
+        self._last_tick = now
+
+        count = int(due)
+        self._carry = due - count
+        if count:
+            self._advance(count)
+
+        if self.playing:
+            self._schedule()
+
+    def _advance(self, count: int) -> None:
+        """Reveal up to ``count`` bars at once."""
+        count = min(count, self.length - self.position)
+        if count > 0:
+            self.chart.append_bars(count)
+            self._notify()
+
+    def _notify(self) -> None:
+        """Inform the listeners of the new position."""
+        # Playback stops at the last bar, before the listeners look at it
+        if self.finished:
+            self.pause()
+        for listener in self.listeners:
+            listener(self.position)
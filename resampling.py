@@ -0,0 +1,304 @@
+import re
+from datetime import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# Nominal length of each time frame in minutes, used to keep the on-screen
+# time scale continuous when the chart switches from one frame to the next
+TIME_FRAME_MINUTES = {
+    "m": 1,
+    "h": 60,
+    "d": 60 * 24,
+    "W": 60 * 24 * 7,
+    "M": 60 * 24 * 30,
+    "Y": 60 * 24 * 365,
+}
+
+
+def parse_time_frame(time_frame: str) -> Tuple[str, int]:
+    """
+    Parse a time frame string such as "m5", "h1", "1d" or "6M".
+
+    Args:
+        time_frame: Time frame string
+
+    Returns:
+        Tuple of (unit, interval)
+    """
+    unit = time_frame.strip("0123456789")
+    interval = time_frame.replace(unit, "")
+    return unit, int(interval) if interval else 1
+
+
+def time_frame_minutes(time_frame: str) -> int:
+    """Get the nominal length of a time frame in minutes."""
+    unit, interval = parse_time_frame(time_frame)
+    return TIME_FRAME_MINUTES[unit] * interval
+
+
+def nests_in(finer: str, coarser: str) -> bool:
+    """
+    Tell whether every bucket of a time frame lies inside one bucket of another.
+
+    Bars of ``finer`` can then be aggregated to ``coarser`` instead of the
+    base rows, with the same result. Weeks, for instance, nest in larger
+    weeks but not in months.
+
+    Args:
+        finer: Smaller time frame
+        coarser: Larger time frame
+
+    Returns:
+        True if the buckets of ``finer`` nest in those of ``coarser``
+    """
+    finer_unit, finer_interval = parse_time_frame(finer)
+    coarser_unit, coarser_interval = parse_time_frame(coarser)
+
+    if finer_unit in ("m", "h", "d"):
+        minutes = TIME_FRAME_MINUTES[finer_unit] * finer_interval
+        if coarser_unit in ("m", "h", "d"):
+            return time_frame_minutes(coarser) % minutes == 0
+        if coarser_unit == "W":
+            # Weeks start 3 days after a multiple of their length (see bucket_starts)
+            return (7 * coarser_interval * 1440) % minutes == 0 and (3 * 1440) % minutes == 0
+        return 1440 % minutes == 0
+
+    if finer_unit == "W":
+        return coarser_unit == "W" and coarser_interval % finer_interval == 0
+
+    if coarser_unit not in ("M", "Y"):
+        return False
+    months = finer_interval * (12 if finer_unit == "Y" else 1)
+    return coarser_interval * (12 if coarser_unit == "Y" else 1) % months == 0
+
+
+# A time of day without a date, e.g. "09:30:00" or "09:30:00.250"
+TIME_OF_DAY_PATTERN = re.compile(r"^\d{2}:\d{2}:\d{2}(\.\d+)?$")
+
+
+def to_datetime64(times: pd.Series) -> np.ndarray:
+    """
+    Convert a Time column to ``datetime64[ns]`` values.
+
+    Times of day without a date (``datetime.time`` objects or "HH:MM:SS"
+    strings) are laid out on consecutive days starting at the epoch, a new
+    day starting every time the clock goes backwards.
+
+    Args:
+        times: The chart's Time column
+
+    Returns:
+        Array of ``datetime64[ns]``
+    """
+    if pd.api.types.is_datetime64_any_dtype(times):
+        return times.to_numpy(dtype="datetime64[ns]")
+
+    values = times.to_numpy()
+    if len(values) and isinstance(values[0], time):
+        nanoseconds = np.fromiter(
+            ((v.hour * 3600 + v.minute * 60 + v.second) * 1_000_000_000 + v.microsecond * 1000
+             for v in values),
+            dtype=np.int64, count=len(values)
+        )
+    elif len(values) and isinstance(values[0], str) and TIME_OF_DAY_PATTERN.match(values[0]):
+        # Parsed on the epoch day in one vectorized call: the values are then
+        # nanoseconds since midnight
+        parsed = pd.to_datetime("1970-01-01T" + times, format="ISO8601")
+        nanoseconds = parsed.to_numpy(dtype="datetime64[ns]").view(np.int64)
+    else:
+        return pd.to_datetime(times).to_numpy(dtype="datetime64[ns]")
+
+    days = np.concatenate(([0], np.cumsum(np.diff(nanoseconds) < 0)))
+    return (days * 86_400_000_000_000 + nanoseconds).view("datetime64[ns]")
+
+
+def with_datetime64_times(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Get a DataFrame whose Time column holds ``datetime64[ns]`` values.
+
+    Args:
+        df: DataFrame with a Time column of any supported type (see
+            ``to_datetime64``)
+
+    Returns:
+        ``df`` itself if its Time column already has that type, otherwise
+        a copy with the converted column (other columns are shared)
+    """
+    if df["Time"].dtype == np.dtype("datetime64[ns]"):
+        return df
+    converted = df.copy(deep=False)
+    converted["Time"] = to_datetime64(df["Time"])
+    return converted
+
+
+def bucket_starts(times: np.ndarray, time_frame: str) -> np.ndarray:
+    """
+    Compute the start of the time frame bucket containing each timestamp.
+
+    Args:
+        times: Sorted ``datetime64[ns]`` values
+        time_frame: Target time frame (e.g. "m15", "h4", "1W", "6M")
+
+    Returns:
+        Array of ``datetime64[ns]`` bucket starts
+    """
+    unit, interval = parse_time_frame(time_frame)
+
+    if unit in ("m", "h", "d"):
+        period = np.timedelta64(TIME_FRAME_MINUTES[unit] * interval, "m").astype("timedelta64[ns]")
+        ticks = times.view(np.int64)
+        return (ticks - ticks % period.astype(np.int64)).view("datetime64[ns]")
+
+    if unit == "W":
+        # 1970-01-01 was a Thursday: shift by 3 days so weeks start on Monday
+        days = times.astype("datetime64[D]").view(np.int64) + 3
+        mondays = days - days % (7 * interval) - 3
+        return mondays.astype("datetime64[D]").astype("datetime64[ns]")
+
+    if unit == "M":
+        months = times.astype("datetime64[M]").view(np.int64)
+        return (months - months % interval).astype("datetime64[M]").astype("datetime64[ns]")
+
+    years = times.astype("datetime64[Y]").view(np.int64)
+    return (years - years % interval).astype("datetime64[Y]").astype("datetime64[ns]")
+
+
+def resample_ohlc(df: pd.DataFrame, time_frame: str) -> pd.DataFrame:
+    """
+    Aggregate OHLC(V) bars into a larger time frame.
+
+    Group boundaries are found where the bucket start changes, and every
+    column is reduced in one ``reduceat`` call: open is the first value,
+    high the max, low the min, close the last and volume the sum.
+
+    Args:
+        df: DataFrame with columns Time, Open, High, Low, Close and
+            optionally Volume, sorted by time
+        time_frame: Target time frame (e.g. "m5", "h1", "1M")
+
+    Returns:
+        Aggregated DataFrame with the same columns, Time being the bucket start
+    """
+    resampled, _ = _resample(df, to_datetime64(df["Time"]), time_frame)
+    return resampled
+
+
+def _resample(df: pd.DataFrame, times: np.ndarray, time_frame: str) -> Tuple[pd.DataFrame, np.ndarray]:
+    """Aggregate ``df`` given its ``datetime64`` times; also return the new times."""
+    starts = bucket_starts(times, time_frame)
+
+    if len(starts) == 0:
+        return df.iloc[0:0].copy(), starts
+
+    first = np.concatenate(([0], np.flatnonzero(starts[1:] != starts[:-1]) + 1))
+    last = np.concatenate((first[1:], [len(starts)])) - 1
+
+    result = {
+        "Time": starts[first],
+        "Open": df["Open"].to_numpy()[first],
+        "High": np.maximum.reduceat(df["High"].to_numpy(), first),
+        "Low": np.minimum.reduceat(df["Low"].to_numpy(), first),
+        "Close": df["Close"].to_numpy()[last],
+    }
+    if "Volume" in df.columns:
+        result["Volume"] = np.add.reduceat(df["Volume"].to_numpy(), first)
+
+    return pd.DataFrame(result), starts[first]
+
+
+class OHLCResampler:
+    """
+    Cache of a base OHLC series aggregated to each chart time frame.
+
+    The first time frame is the base series itself; every other frame is
+    built from it on first request and kept until the base data changes.
+    """
+
+    def __init__(self, df: pd.DataFrame, time_frames: List[str]):
+        """
+        Initialize the resampler.
+
+        Args:
+            df: Base DataFrame (the smallest time frame)
+            time_frames: Time frames in increasing order, the first one
+                being the time frame of ``df``
+        """
+        self.df = df
+        self.time_frames = time_frames
+        self.frames: Dict[str, pd.DataFrame] = {time_frames[0]: df}
+        self.times: Dict[str, np.ndarray] = {time_frames[0]: to_datetime64(df["Time"])}
+
+    def get(self, time_frame: str) -> pd.DataFrame:
+        """
+        Get the data aggregated to a time frame.
+
+        Args:
+            time_frame: One of ``self.time_frames``
+
+        Returns:
+            Aggregated DataFrame
+        """
+        if time_frame not in self.frames:
+            base_times = self.times[self.time_frames[0]]
+            self.frames[time_frame], self.times[time_frame] = _resample(self.df, base_times, time_frame)
+        return self.frames[time_frame]
+
+    def locate(self, time_frame: str, timestamp: np.datetime64) -> int:
+        """
+        Find the bar of a time frame that contains a timestamp.
+
+        Args:
+            time_frame: One of ``self.time_frames``
+            timestamp: Timestamp to look up
+
+        Returns:
+            Row position of the bar, clipped to the valid range
+        """
+        self.get(time_frame)
+        times = self.times[time_frame]
+        row = int(np.searchsorted(times, timestamp, side="right")) - 1
+        return min(max(row, 0), len(times) - 1)
+
+    def timestamp(self, time_frame: str, row: int) -> np.datetime64:
+        """Get the timestamp of a bar as ``datetime64[ns]``."""
+        self.get(time_frame)
+        return self.times[time_frame][row]
+
+    def base_range(self, time_frame: str, row: int) -> Tuple[int, int]:
+        """
+        Get the rows of the base series aggregated into a bar.
+
+        Args:
+            time_frame: One of ``self.time_frames``
+            row: Row position of the bar
+
+        Returns:
+            Tuple of (first, end) base rows, ``end`` being exclusive
+        """
+        self.get(time_frame)
+        frame_times = self.times[time_frame]
+        base_times = self.times[self.time_frames[0]]
+
+        first = int(np.searchsorted(base_times, frame_times[row], side="left"))
+        if row + 1 < len(frame_times):
+            end = int(np.searchsorted(base_times, frame_times[row + 1], side="left"))
+        else:
+            end = len(base_times)
+        return first, end
+
+    def ratio(self, from_index: int, to_index: int) -> float:
+        """
+        Get the nominal number of ``from_index`` bars in one ``to_index`` bar.
+
+        Args:
+            from_index: Index of the source time frame
+            to_index: Index of the target time frame
+
+        Returns:
+            Length ratio between the two time frames
+        """
+        return (time_frame_minutes(self.time_frames[to_index])
+                / time_frame_minutes(self.time_frames[from_index]))
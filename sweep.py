@@ -0,0 +1,368 @@
+import itertools
+import multiprocessing
+import os
+import queue
+import random
+import threading
+from concurrent.futures import CancelledError, ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backtest import BacktestResult, run_backtest
+from resampling import to_datetime64
+
+
+# Price columns copied to shared memory, after the Time column (int64 nanoseconds)
+SHARED_COLUMNS = ("Open", "High", "Low", "Close")
+
+# Chunks scheduled per worker: enough to balance uneven tasks, few enough to
+# keep the scheduling overhead negligible
+CHUNKS_PER_WORKER = 8
+
+Params = Dict[str, Any]
+Evaluator = Callable[[pd.DataFrame, Params], Dict[str, float]]
+
+
+def grid(**ranges: Iterable) -> List[Params]:
+    """
+    Build every combination of parameter values.
+
+    Example:
+        ``grid(fast=range(5, 50, 5), slow=range(20, 200, 10))``
+
+    Args:
+        **ranges: Values to try for each parameter
+
+    Returns:
+        List of parameter dicts
+    """
+    names = list(ranges)
+    return [dict(zip(names, values)) for values in itertools.product(*(list(r) for r in ranges.values()))]
+
+
+def random_search(count: int, seed: Optional[int] = None, **ranges: Sequence) -> List[Params]:
+    """
+    Draw random combinations of parameter values.
+
+    Args:
+        count: Number of combinations
+        seed: Seed of the random generator
+        **ranges: Values to draw from for each parameter
+
+    Returns:
+        List of parameter dicts
+    """
+    rng = random.Random(seed)
+    choices = {name: list(values) for name, values in ranges.items()}
+    return [{name: rng.choice(values) for name, values in choices.items()} for _ in range(count)]
+
+
+def summarize(result: BacktestResult, initial_equity: float = 0.0) -> Dict[str, float]:
+    """
+    Reduce a backtest to a few comparable figures.
+
+    Args:
+        result: Output of ``run_backtest``
+        initial_equity: Equity the backtest started with
+
+    Returns:
+        Dict with the final pnl, maximum drawdown, number of trades and win rate
+    """
+    equity = result.equity
+    if len(equity) == 0:
+        return {"pnl": 0.0, "max_drawdown": 0.0, "trades": 0, "win_rate": 0.0}
+
+    pnl = result.trades["pnl"].to_numpy()
+    return {
+        "pnl": float(equity[-1] - initial_equity),
+        "max_drawdown": float(np.max(np.maximum.accumulate(np.maximum(equity, initial_equity)) - equity)),
+        "trades": int(len(pnl)),
+        "win_rate": float(np.mean(pnl > 0)) if len(pnl) else 0.0,
+    }
+
+
+def moving_average(values: np.ndarray, period: int) -> np.ndarray:
+    """Simple moving average through a cumulative sum; NaN before ``period`` values."""
+    result = np.full(len(values), np.nan)
+    if 0 < period <= len(values):
+        sums = np.cumsum(np.concatenate(([0.0], values)))
+        result[period - 1:] = (sums[period:] - sums[:-period]) / period
+    return result
+
+
+def ma_crossover(df: pd.DataFrame, params: Params) -> Dict[str, float]:
+    """
+    Built-in evaluator: long when the fast average is above the slow one.
+
+    Args:
+        df: OHLC data
+        params: ``fast`` and ``slow`` periods, plus the optional ``short``
+            (also trade the short side), ``commission`` and ``slippage``
+
+    Returns:
+        Output of ``summarize``
+    """
+    closes = df["Close"].to_numpy()
+    fast = moving_average(closes, int(params["fast"]))
+    slow = moving_average(closes, int(params["slow"]))
+
+    signals = np.where(fast > slow, 1.0, -1.0 if params.get("short", False) else 0.0)
+    signals[np.isnan(slow) | np.isnan(fast)] = 0.0
+
+    return summarize(run_backtest(
+        df, signals,
+        commission=params.get("commission", 0.0),
+        slippage=params.get("slippage", 0.0)
+    ))
+
+
+class SharedOHLC:
+    """
+    OHLC columns copied once into a shared memory block.
+
+    Worker processes attach to the block by name and read the columns in
+    place, so the data is never pickled per task. The block holds the Time
+    column as int64 nanoseconds, followed by the price columns as float64.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        """
+        Copy the data to a new shared memory block.
+
+        Args:
+            df: DataFrame with columns Time, Open, High, Low, Close
+        """
+        self.length = len(df)
+        size = 8 * (1 + len(SHARED_COLUMNS)) * self.length
+        self.block = shared_memory.SharedMemory(create=True, size=max(1, size))
+        times, prices = _views(self.block, self.length)
+
+        times[:] = to_datetime64(df["Time"]).view(np.int64)
+        for row, name in enumerate(SHARED_COLUMNS):
+            prices[row] = df[name].to_numpy(dtype=np.float64)
+
+    @property
+    def spec(self) -> Tuple[str, int]:
+        """What a worker needs to attach: block name and number of rows."""
+        return self.block.name, self.length
+
+    def close(self) -> None:
+        """Release and delete the shared block."""
+        self.block.close()
+        self.block.unlink()
+
+
+# Per-process state of the workers, set by _init_worker
+_worker_block: Optional[shared_memory.SharedMemory] = None
+_worker_df: Optional[pd.DataFrame] = None
+_worker_cancel = None
+
+
+def _views(block: shared_memory.SharedMemory, length: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Get the int64 Time segment and the float64 price segment of a shared block."""
+    times = np.ndarray((length,), dtype=np.int64, buffer=block.buf)
+    prices = np.ndarray((len(SHARED_COLUMNS), length), dtype=np.float64, buffer=block.buf, offset=8 * length)
+    return times, prices
+
+
+def _attach(spec: Tuple[str, int]) -> Tuple[shared_memory.SharedMemory, pd.DataFrame]:
+    """Attach to a shared block and wrap its columns in a DataFrame without copying."""
+    name, length = spec
+    block = shared_memory.SharedMemory(name=name)
+    times, prices = _views(block, length)
+
+    data = {"Time": pd.Series(times.view("datetime64[ns]"), copy=False)}
+    for row, column in enumerate(SHARED_COLUMNS):
+        data[column] = pd.Series(prices[row], copy=False)
+    return block, pd.DataFrame(data, copy=False)
+
+
+def _init_worker(spec: Tuple[str, int], cancel_event) -> None:
+    """Attach a worker process to the shared data once, at start-up."""
+    global _worker_block, _worker_df, _worker_cancel
+    _worker_block, _worker_df = _attach(spec)
+    _worker_cancel = cancel_event
+
+
+def _run_chunk(evaluator: Evaluator, chunk: List[Tuple[int, Params]]) -> List[Tuple[int, Params, Dict[str, float]]]:
+    """Evaluate a chunk of parameter sets in a worker, stopping early on cancellation."""
+    results = []
+    for index, params in chunk:
+        if _worker_cancel.is_set():
+            break
+        results.append((index, params, evaluator(_worker_df, params)))
+    return results
+
+
+class SweepRunner:
+    """
+    Evaluate a strategy over many parameter sets on every core.
+
+    The data is put in shared memory once and every worker process attaches
+    to it at start-up. Parameter sets are sent in chunks, and results are
+    yielded as soon as a chunk completes, in completion order. ``cancel``
+    may be called from any thread (e.g. a GUI button): pending chunks are
+    dropped and running ones stop after their current evaluation.
+
+    Workers are started with the "spawn" method: forking the process of a
+    running GUI, from a background thread, would copy locks held by other
+    threads and the connection to the display. Scripts running a sweep
+    must therefore guard their entry point with ``if __name__ == "__main__"``.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        evaluator: Evaluator = ma_crossover,
+        workers: Optional[int] = None,
+        chunk_size: Optional[int] = None
+    ):
+        """
+        Initialize the runner.
+
+        Args:
+            df: DataFrame with columns Time, Open, High, Low, Close
+            evaluator: Module-level function ``(df, params) -> metrics``
+            workers: Number of worker processes (default: every core)
+            chunk_size: Parameter sets per task (default: balanced over the workers)
+        """
+        self.df = df
+        self.evaluator = evaluator
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+
+        self._context = multiprocessing.get_context("spawn")
+        self._cancel = self._context.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        """True once ``cancel`` was called."""
+        return self._cancel.is_set()
+
+    def cancel(self) -> None:
+        """Stop the sweep as soon as possible."""
+        self._cancel.set()
+
+    def _chunks(self, param_sets: List[Params]) -> List[List[Tuple[int, Params]]]:
+        """Split the parameter sets into indexed chunks."""
+        size = self.chunk_size or max(1, -(-len(param_sets) // (self.workers * CHUNKS_PER_WORKER)))
+        indexed = list(enumerate(param_sets))
+        return [indexed[i:i + size] for i in range(0, len(indexed), size)]
+
+    def results(self, param_sets: Iterable[Params]) -> Iterator[Tuple[int, Params, Dict[str, float]]]:
+        """
+        Run the sweep, yielding results as they complete.
+
+        Args:
+            param_sets: Parameter dicts, e.g. from ``grid`` or ``random_search``
+
+        Yields:
+            Tuples of (index in ``param_sets``, params, metrics)
+        """
+        self._cancel.clear()
+        chunks = self._chunks(list(param_sets))
+        if not chunks:
+            return
+
+        shared = SharedOHLC(self.df)
+        try:
+            with ProcessPoolExecutor(
+                max_workers=min(self.workers, len(chunks)),
+                mp_context=self._context,
+                initializer=_init_worker,
+                initargs=(shared.spec, self._cancel)
+            ) as executor:
+                futures = [executor.submit(_run_chunk, self.evaluator, chunk) for chunk in chunks]
+                try:
+                    for future in as_completed(futures):
+                        if self.cancelled:
+                            break
+                        try:
+                            yield from future.result()
+                        except CancelledError:
+                            continue
+                finally:
+                    # Also reached when the caller stops iterating early
+                    self._cancel.set()
+                    for future in futures:
+                        future.cancel()
+        finally:
+            shared.close()
+
+    def run(self, param_sets: Iterable[Params]) -> pd.DataFrame:
+        """
+        Run the sweep to completion (or cancellation) and collect the results.
+
+        Args:
+            param_sets: Parameter dicts
+
+        Returns:
+            DataFrame with one row per evaluated set, parameters then metrics,
+            in the order of ``param_sets``
+        """
+        rows = sorted(self.results(param_sets), key=lambda result: result[0])
+        return pd.DataFrame([{**params, **metrics} for _, params, metrics in rows])
+
+    def start(
+        self,
+        widget: Any,
+        param_sets: Iterable[Params],
+        on_result: Callable[[int, Params, Dict[str, float]], None],
+        on_done: Optional[Callable[[], None]] = None,
+        on_error: Optional[Callable[[BaseException], None]] = None,
+        poll_ms: int = 50
+    ) -> None:
+        """
+        Run the sweep without blocking the Tk mainloop.
+
+        The sweep runs on a background thread; its results are handed to
+        ``on_result`` from the Tk thread through ``widget.after``. Call
+        ``cancel`` to stop it early.
+
+        Args:
+            widget: Any Tk widget, used for scheduling
+            param_sets: Parameter dicts
+            on_result: Called with (index, params, metrics) for every result
+            on_done: Called once the sweep is finished or cancelled
+            on_error: Called with the exception instead of ``on_done`` if the
+                sweep failed (results received before are still delivered)
+            poll_ms: Delay between two checks, in milliseconds
+        """
+        param_sets = list(param_sets)
+        pending: "queue.Queue" = queue.Queue()
+        finished = threading.Event()
+        errors: List[BaseException] = []
+
+        def work() -> None:
+            try:
+                for result in self.results(param_sets):
+                    pending.put(result)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                finished.set()
+
+        threading.Thread(target=work, daemon=True).start()
+
+        def poll() -> None:
+            if not widget.winfo_exists():
+                self.cancel()
+                return
+            done = finished.is_set()
+            while True:
+                try:
+                    on_result(*pending.get_nowait())
+                except queue.Empty:
+                    break
+            if not done:
+                widget.after(poll_ms, poll)
+            elif errors:
+                if on_error is not None:
+                    on_error(errors[0])
+            elif on_done is not None:
+                on_done()
+
+        widget.after(poll_ms, poll)
@@ -0,0 +1,260 @@
+"""
+Synthetic OHLCV data for tests, benchmarks and replays at scale.
+
+Prices follow a geometric Brownian motion whose drift and volatility can
+switch between regimes (a Markov chain with a fixed switching probability
+per bar). Bars are laid out on trading sessions, optionally skipping
+weekends, and each session can open with a gap from the previous close.
+Everything is generated with array operations, so tens of millions of bars
+take seconds.
+
+Usage:
+    python synthetic.py 10000000 data/synthetic --time-frame m1 --session 08:00 22:00
+"""
+import argparse
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from model import OHLCStore
+from resampling import TIME_FRAME_MINUTES, parse_time_frame
+
+
+# (annual drift, annual volatility) of each regime: a calm trend and a volatile sell-off
+DEFAULT_REGIMES = ((0.05, 0.12), (-0.20, 0.40))
+
+# Trading sessions per year, used to turn annual parameters into per-bar ones
+SESSIONS_PER_YEAR = 252
+
+# Largest number of data rows of an xlsx sheet (one row is the header)
+XLSX_MAX_ROWS = 1_048_575
+
+
+def _parse_clock(value: str) -> int:
+    """Convert "HH:MM" (up to "24:00") to minutes since midnight."""
+    hours, minutes = value.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def _session_layout(time_frame: str, session: Tuple[str, str]) -> Tuple[int, int, int]:
+    """
+    Get the opening minute, bar length in minutes and number of bars of a session.
+    """
+    unit, interval = parse_time_frame(time_frame)
+    if unit not in ("m", "h", "d"):
+        raise ValueError(f"Unsupported time frame for generated data: {time_frame}")
+    bar_minutes = TIME_FRAME_MINUTES[unit] * interval
+
+    open_minute, close_minute = (_parse_clock(value) for value in session)
+    if not 0 <= open_minute < close_minute <= 24 * 60:
+        raise ValueError(f"Invalid session: {session}")
+    return open_minute, bar_minutes, max(1, (close_minute - open_minute) // bar_minutes)
+
+
+def session_times(
+    rows: int,
+    start: str = "2020-01-01",
+    time_frame: str = "m1",
+    session: Tuple[str, str] = ("00:00", "24:00"),
+    weekends: bool = False
+) -> np.ndarray:
+    """
+    Compute the opening time of consecutive bars within trading sessions.
+
+    Args:
+        rows: Number of bars
+        start: First day
+        time_frame: Length of a bar ("m1", "m15", "h1", "1d", ...)
+        session: Opening and closing time of each daily session, as "HH:MM"
+        weekends: Whether Saturdays and Sundays are trading days
+
+    Returns:
+        Array of ``rows`` sorted ``datetime64[ns]`` values
+    """
+    open_minute, bar_minutes, bars_per_session = _session_layout(time_frame, session)
+
+    # Enough calendar days to hold every session, weekends included
+    sessions = -(-rows // bars_per_session)
+    first_day = np.datetime64(pd.Timestamp(start).normalize().to_datetime64(), "D").view(np.int64)
+    days = first_day + np.arange(sessions * 7 // 5 + 7)
+    if not weekends:
+        # 1970-01-01 was a Thursday: Monday is 0 after shifting by 3 days
+        days = days[(days + 3) % 7 < 5]
+    days = days[:sessions]
+
+    minute = 60 * 1_000_000_000
+    offsets = (open_minute + np.arange(bars_per_session) * bar_minutes) * minute
+    times = (days[:, None] * 24 * 60 * minute + offsets[None, :]).ravel()[:rows]
+    return times.view("datetime64[ns]")
+
+
+def regime_path(rows: int, regimes: int, switch_probability: float, rng: np.random.Generator) -> np.ndarray:
+    """
+    Draw the regime of each bar from a Markov chain.
+
+    Regime durations are geometric, and each new regime is drawn uniformly
+    among the others.
+
+    Args:
+        rows: Number of bars
+        regimes: Number of regimes
+        switch_probability: Probability of leaving the current regime at each bar
+        rng: Random generator
+
+    Returns:
+        Array of ``rows`` regime indices
+    """
+    if regimes == 1 or switch_probability <= 0:
+        return np.zeros(rows, dtype=np.int64)
+
+    # Draw durations until they cover every bar
+    count = int(rows * switch_probability * 1.5) + 16
+    durations = rng.geometric(switch_probability, count)
+    while durations.sum() < rows:
+        durations = np.concatenate((durations, rng.geometric(switch_probability, count)))
+
+    # Each switch moves to one of the other regimes
+    steps = rng.integers(1, regimes, len(durations))
+    steps[0] = rng.integers(0, regimes)
+    states = np.cumsum(steps) % regimes
+    return np.repeat(states, durations)[:rows]
+
+
+def generate_ohlcv(
+    rows: int,
+    start: str = "2020-01-01",
+    time_frame: str = "m1",
+    session: Tuple[str, str] = ("00:00", "24:00"),
+    weekends: bool = False,
+    start_price: float = 2000.0,
+    regimes: Sequence[Tuple[float, float]] = DEFAULT_REGIMES,
+    switch_probability: float = 1e-4,
+    gap_probability: float = 0.3,
+    gap_volatility: float = 0.005,
+    base_volume: float = 100.0,
+    tick_size: float = 0.01,
+    seed: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Generate valid OHLCV bars.
+
+    The close-to-close log returns follow a geometric Brownian motion with
+    the drift and volatility of the current regime. Sessions after the first
+    open with a gap from the previous close with probability
+    ``gap_probability``. Highs and lows extend the bodies by half-normal
+    wicks, prices are rounded to ``tick_size`` and volumes grow with the
+    size of the move and at the start and end of each session.
+
+    Args:
+        rows: Number of bars
+        start: First day
+        time_frame: Length of a bar ("m1", "m15", "h1", "1d", ...)
+        session: Opening and closing time of each daily session, as "HH:MM"
+        weekends: Whether Saturdays and Sundays are trading days
+        start_price: Price before the first bar
+        regimes: (annual drift, annual volatility) of each regime; a single
+            regime gives a plain geometric Brownian motion
+        switch_probability: Probability of changing regime at each bar
+        gap_probability: Probability that a session opens with a gap
+        gap_volatility: Standard deviation of the log size of the gaps
+        base_volume: Typical volume of a bar
+        tick_size: Price increment
+        seed: Seed of the random generator
+
+    Returns:
+        DataFrame with columns Time, Open, High, Low, Close and Volume
+    """
+    rng = np.random.default_rng(seed)
+    times = session_times(rows, start, time_frame, session, weekends)
+
+    # Per-bar drift and volatility of each regime
+    _, _, bars_per_session = _session_layout(time_frame, session)
+    dt = 1.0 / (SESSIONS_PER_YEAR * bars_per_session)
+    drifts, volatilities = (np.asarray(values, dtype=np.float64) for values in zip(*regimes))
+    state = regime_path(rows, len(regimes), switch_probability, rng)
+    sigma = volatilities[state] * np.sqrt(dt)
+    body = (drifts[state] - 0.5 * volatilities[state] ** 2) * dt + sigma * rng.standard_normal(rows)
+
+    # Gaps at the session opens, the very first bar excepted
+    position = np.arange(rows) % bars_per_session
+    gap = np.where(
+        (position == 0) & (rng.random(rows) < gap_probability),
+        rng.normal(0.0, gap_volatility, rows),
+        0.0
+    )
+    gap[0] = 0.0
+
+    log_close = np.log(start_price) + np.cumsum(gap + body)
+    log_open = log_close - body
+    wick = 0.5 * sigma
+    log_high = np.maximum(log_open, log_close) + np.abs(rng.standard_normal(rows)) * wick
+    log_low = np.minimum(log_open, log_close) - np.abs(rng.standard_normal(rows)) * wick
+
+    def to_ticks(log_price: np.ndarray) -> np.ndarray:
+        return np.round(np.exp(log_price) / tick_size) * tick_size
+
+    opens, closes = to_ticks(log_open), to_ticks(log_close)
+    highs = np.maximum(to_ticks(log_high), np.maximum(opens, closes))
+    lows = np.minimum(to_ticks(log_low), np.minimum(opens, closes))
+
+    # Busier on large moves and around the session open and close
+    session_shape = 1.0 + (2.0 * position / bars_per_session - 1.0) ** 2
+    activity = 1.0 + np.abs(body) / sigma
+    volumes = base_volume * session_shape * activity * rng.lognormal(0.0, 0.5, rows)
+
+    return pd.DataFrame({
+        "Time": times,
+        "Open": opens,
+        "High": highs,
+        "Low": lows,
+        "Close": closes,
+        "Volume": np.maximum(1, np.rint(volumes)).astype(np.int64)
+    })
+
+
+def write_dataset(df: pd.DataFrame, path: str) -> None:
+    """
+    Write bars in one of the formats the app loads.
+
+    Args:
+        df: Bars to write
+        path: A ".csv" or ".xlsx" file (read by ``model.load_history``), or
+            any other path for an ``OHLCStore`` folder
+    """
+    if path.lower().endswith(".csv"):
+        df.to_csv(path, index=False)
+    elif path.lower().endswith(".xlsx"):
+        if len(df) > XLSX_MAX_ROWS:
+            raise ValueError(f"xlsx files hold at most {XLSX_MAX_ROWS:,} rows, got {len(df):,}")
+        df.to_excel(path, index=False)
+    else:
+        OHLCStore.write(path, df)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate synthetic OHLCV bars.")
+    parser.add_argument("rows", type=int, help="Number of bars")
+    parser.add_argument("path", help="Output .csv/.xlsx file or OHLCStore folder")
+    parser.add_argument("--start", default="2020-01-01", help="First day")
+    parser.add_argument("--time-frame", default="m1", help="Length of a bar (m1, m15, h1, 1d...)")
+    parser.add_argument("--session", nargs=2, default=["00:00", "24:00"], metavar=("OPEN", "CLOSE"))
+    parser.add_argument("--weekends", action="store_true", help="Trade on Saturdays and Sundays")
+    parser.add_argument("--gbm", action="store_true", help="Single regime (plain geometric Brownian motion)")
+    parser.add_argument("--seed", type=int, help="Seed of the random generator")
+    args = parser.parse_args()
+
+    df = generate_ohlcv(
+        args.rows,
+        start=args.start,
+        time_frame=args.time_frame,
+        session=tuple(args.session),
+        weekends=args.weekends,
+        regimes=DEFAULT_REGIMES[:1] if args.gbm else DEFAULT_REGIMES,
+        seed=args.seed
+    )
+    write_dataset(df, args.path)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,8 @@ import pandas as pd
 from datetime import datetime, timedelta
 import mplfinance as mpf
 
+from synthetic import generate_ohlcv
+
 class TradingApp:
     def __init__(self, root):
         self.root = root
@@ -80,44 +82,12 @@ class TradingApp:
         fig, ax = plt.subplots(figsize=(12, 5), dpi=100)
         
         # Generate sample price data
-        np.random.seed(42)  # For reproducible results
-        dates = pd.date_range(start="2023-01-01", periods=100, freq="15min")
-        
-        # Starting price around 2900
-        base_price = 2900
-        price_range = 50
-        
-        opens = [base_price + np.random.normal(0, price_range/10)]
-        highs = [opens[0] + abs(np.random.normal(0, price_range/15))]
-        lows = [opens[0] - abs(np.random.normal(0, price_range/15))]
-        closes = [opens[0] + np.random.normal(0, price_range/10)]
-        
-        # Generate rest of the prices with some trend and volatility
-        for i in range(1, len(dates)):
-            prev_close = closes[i-1]
-            price_change = np.random.normal(0, price_range/20)
-            if i % 20 < 10:  # Create some trend
-                price_change += 0.5
-            else:
-                price_change -= 0.5
-                
-            open_price = prev_close
-            close_price = open_price + price_change
-            high_price = max(open_price, close_price) + abs(np.random.normal(0, price_range/30))
-            low_price = min(open_price, close_price) - abs(np.random.normal(0, price_range/30))
-            
-            opens.append(open_price)
-            highs.append(high_price)
-            lows.append(low_price)
-            closes.append(close_price)
+        bars = generate_ohlcv(
+            100, start="2023-01-01", time_frame="m15", start_price=2900, regimes=((0.0, 0.25),), seed=42
+        )
         
         # Create DataFrame for mplfinance
-        ohlc_data = pd.DataFrame({
-            'Open': opens,
-            'High': highs,
-            'Low': lows,
-            'Close': closes
-        }, index=dates)
+        ohlc_data = bars.set_index("Time")[["Open", "High", "Low", "Close"]]
         
         # Plot with mplfinance
         mpf.plot(ohlc_data, type='candle', style='yahoo', ax=ax, 
@@ -142,7 +112,7 @@ class TradingApp:
         ax.axhline(y=current_price, color='r', linestyle='-', alpha=0.5)
         
         # Add current price label
-        ax.text(len(dates) - 5, current_price, f"2,904.970\n11:26", 
+        ax.text(len(ohlc_data) - 5, current_price, f"2,904.970\n11:26", 
                 color='white', fontweight='bold', 
                 bbox=dict(facecolor='red', alpha=0.8, boxstyle='round,pad=0.5'))
         
@@ -0,0 +1,249 @@
+"""
+Interaction with a headless chart: time frame switches, level of detail,
+the drawing layers and the price axis.
+"""
+import math
+from unittest import mock
+
+import numpy as np
+import pytest
+
+import benchmark
+import utils
+from canvas_pool import CanvasItemPool
+from chart_stats import estimate_tick_size, nice_ticks, step_decimals
+from instrumentation import Profiler
+from redraw_scheduler import RedrawScheduler
+from viewport import Viewport
+from model import OHLCStore
+from synthetic import generate_ohlcv
+
+
+def make_chart(rows: int, store_path=None) -> utils.DragZoomApp:
+    df = generate_ohlcv(rows, time_frame="m1", session=("08:00", "22:00"), seed=4)
+    store = None if store_path is None else OHLCStore.write(str(store_path), df)
+    with benchmark.headless():
+        chart = utils.DragZoomApp(benchmark.StubRoot(), None if store else df, store=store)
+    chart.initialize_chart()
+    return chart
+
+
+def zoom(chart, steps: int, delta: int) -> None:
+    for _ in range(steps):
+        chart.mouse_wheel_zoom(benchmark._event(delta=delta))
+        chart._redraw_layers(set(chart.LAYERS))
+
+
+@pytest.mark.parametrize("rows, time_frame", [(20_000, "m15"), (200_000, "h2")])
+def test_zoom_out_merges_candles_on_the_last_frame_that_fills_the_canvas(rows, time_frame):
+    chart = make_chart(rows)
+    with mock.patch.object(utils, "compute_lod_geometry", wraps=utils.compute_lod_geometry) as lod:
+        zoom(chart, 120, -120)
+
+    assert chart.time_frames[chart.current_tf_index] == time_frame
+    assert len(chart.df) >= chart.canvas_width
+    assert chart.viewport.step < chart.lod_threshold and lod.called
+    # One envelope per pixel column at most
+    assert chart.item_pools['candle_bodies'].active <= chart.canvas_width
+
+    zoom(chart, 120, 120)
+    assert chart.current_tf_index == 0 and chart.viewport.step >= chart.lod_threshold
+
+
+def test_store_backed_chart_reads_aggregated_frames(tmp_path):
+    chart = make_chart(200_000, tmp_path / "store")
+    # Aggregated from the base rows once, then read back
+    frames = [chart._frame_store(index) for index in range(1, len(chart.time_frames))]
+    with mock.patch.object(chart.store, "slice", wraps=chart.store.slice) as base_slice:
+        zoom(chart, 40, -120)
+
+    time_frame = chart.time_frames[chart.current_tf_index]
+    assert time_frame != "m1" and chart.frame_store in frames
+    # Coarse frames load a window of their own bars, never the base rows
+    assert not base_slice.called
+    first, end = chart.window
+    assert (chart.df["Time"].to_numpy() == chart.frame_store.columns["Time"][first:end]).all()
+
+
+def test_item_pool_reuses_items_and_sends_only_changes():
+    canvas = benchmark.StubCanvas()
+    pool = CanvasItemPool(canvas, "rectangle", ("bodies",), width=1)
+    pool.draw([(0, 0, 1, 1), (2, 2, 3, 3), (4, 4, 5, 5)], [{'fill': "red"}] * 3)
+    items = list(pool.items)
+
+    with mock.patch.object(canvas, "itemconfig", wraps=canvas.itemconfig) as itemconfig:
+        pool.draw([(6, 6, 7, 7), (8, 8, 9, 9)], [{'fill': "red"}, {'fill': "green"}])
+    # Same items; one color change and one item hidden
+    assert pool.items == items and pool.active == 2
+    assert itemconfig.call_args_list == [mock.call(items[1], fill="green"), mock.call(items[2], state="hidden")]
+    assert canvas.items[items[0]][1] == [6, 6, 7, 7] and canvas.items[items[2]][2]['state'] == "hidden"
+
+    pool.shift(1)
+    assert pool.items[:2] == [items[1], items[0]] and pool.items[2] == items[2]
+
+    # Shrinks once less than half of it is used
+    pool.draw([(0, 0, 1, 1)] * 4)
+    pool.draw([(0, 0, 1, 1)])
+    assert len(pool) == 1 and len(canvas.items) == 1
+
+
+@pytest.mark.parametrize("decimals", [0, 2, 5])
+def test_tick_size_is_the_quoted_precision(decimals):
+    prices = np.round(np.random.default_rng(1).uniform(1, 2000, 10_000), decimals)
+    assert estimate_tick_size(prices) == pytest.approx(10.0 ** -decimals)
+
+
+@pytest.mark.parametrize("low, high", [(0.0, 1.0), (1.08, 1.0935), (97.3, 18_450.0), (-4.2, 3.3)])
+def test_nice_ticks_cover_the_range_with_round_steps(low, high):
+    ticks, step = nice_ticks(low, high, target=7)
+    mantissa = step / 10 ** math.floor(math.log10(step))
+    assert round(mantissa, 9) in (1, 2, 5)
+    assert 3 <= len(ticks) <= 14
+    assert ticks[0] >= low and ticks[-1] <= high
+    assert ticks[0] - step < low and ticks[-1] + step > high
+    assert np.allclose(np.diff(ticks), step)
+    # Labels with step_decimals decimals tell every tick apart
+    assert len({f"{tick:.{step_decimals(step)}f}" for tick in ticks}) == len(ticks)
+
+
+def test_nice_ticks_stop_at_the_tick_size():
+    ticks, step = nice_ticks(100.0, 100.004, minimum_step=0.01)
+    assert step == 0.01 and len(ticks) <= 1
+    ticks, step = nice_ticks(5.0, 5.0)
+    assert len(ticks) == 0 and step == 0.0
+
+
+class FakeWidget:
+    """Records the jobs scheduled with ``after`` and ``after_idle``."""
+
+    def __init__(self):
+        self.jobs = {}
+
+    def after(self, delay_ms, callback):
+        job = f"after#{len(self.jobs)}"
+        self.jobs[job] = (delay_ms, callback)
+        return job
+
+    def after_idle(self, callback):
+        return self.after("idle", callback)
+
+    def after_cancel(self, job):
+        del self.jobs[job]
+
+
+def test_scheduler_redraws_once_per_frame():
+    widget, frames = FakeWidget(), []
+    scheduler = RedrawScheduler(widget, frames.append, frame_ms=1000)
+
+    scheduler.invalidate("candles")
+    scheduler.invalidate("grid", "candles")
+    scheduler.invalidate()
+    # The first frame is drawn as soon as Tk is idle
+    assert [delay for delay, _ in widget.jobs.values()] == ["idle"] and scheduler.pending
+    scheduler.flush()
+    assert frames == [{"candles", "grid"}] and not widget.jobs and not scheduler.pending
+
+    # The next one waits for the end of the frame
+    scheduler.invalidate("time_labels")
+    [(delay, callback)] = widget.jobs.values()
+    assert 0 < delay <= 1000
+    callback()
+    assert frames[-1] == {"time_labels"}
+
+    scheduler.invalidate("grid")
+    scheduler.discard()
+    scheduler.flush()
+    assert len(frames) == 2 and not widget.jobs and not scheduler.pending
+
+
+def make_viewport() -> Viewport:
+    viewport = Viewport(1100, 700, candle_space=10, x_center=1000)
+    viewport.set_price_range(100.0, 0.1, 0.9)
+    return viewport
+
+
+def test_viewport_moves_like_the_drawn_items():
+    viewport, canvas = make_viewport(), benchmark.StubCanvas()
+    rows, prices = np.arange(200), np.linspace(100.0, 160.0, 200)
+
+    def positions(length):
+        xs = viewport.x_newest - (length - 1 - rows) * viewport.step
+        return np.column_stack((xs, viewport.price_to_y(prices)))
+
+    items = [canvas.create_line(x, y, x, y) for x, y in positions(200)]
+    for dx, dy, zoom_x, zoom_y in [(35, -12, 1.5, 1.0), (-240, 40, 0.4, 2.0), (0, 0, 3.0, 0.7)]:
+        viewport.pan(dx, dy)
+        canvas.move("all", dx, dy)
+        viewport.zoom_x(zoom_x)
+        canvas.scale("all", viewport.width, viewport.height / 2, zoom_x, 1)
+        viewport.zoom_y(zoom_y)
+        canvas.scale("all", viewport.width, viewport.height / 2, 1, zoom_y)
+
+        drawn = np.array([canvas.items[item][1][:2] for item in items])
+        np.testing.assert_allclose(drawn, positions(200), atol=1e-9)
+
+
+def test_viewport_maps_back_to_rows_and_prices():
+    viewport = make_viewport()
+    viewport.zoom_x(0.37)
+    viewport.pan(-300, 25)
+    length = 5000
+
+    start, end, x_start = viewport.visible_range(length)
+    xs = viewport.x_newest - (length - 1 - np.arange(length)) * viewport.step
+    on_screen = np.flatnonzero((xs >= 0) & (xs <= viewport.width))
+    # Every bar on the canvas is drawn, with at most a bar of margin
+    assert start <= on_screen[0] and on_screen[-1] < end and end - start <= len(on_screen) + 2
+    assert x_start == pytest.approx(xs[end - 1])
+    assert [viewport.x_to_row(x + 0.3 * viewport.step, length) for x in xs[start:end]] == list(range(start, end))
+
+    assert viewport.y_to_price(viewport.price_to_y(123.45)) == pytest.approx(123.45)
+    viewport.anchor_newest(500.0)
+    assert viewport.x_newest == pytest.approx(500.0) and viewport.scale_x == 0.37
+
+
+def test_profiler_records_calls_items_and_frames():
+    profiler, done = Profiler(), []
+
+    def fail():
+        raise ValueError("draw failed")
+
+    draw = profiler.wrap("draw", lambda count: count, items=lambda: 7, frame=True, on_done=lambda: done.append(1))
+    failing = profiler.wrap("fail", fail)
+    profiler.wrap("unused", print)
+
+    assert [draw(3), draw(4)] == [3, 4]
+    with pytest.raises(ValueError):
+        failing()
+
+    report = profiler.report()
+    assert set(report) == {"draw", "fail"} and report["fail"]["count"] == 1
+    assert report["draw"]["count"] == 2 and report["draw"]["mean_items"] == 7
+    assert sum(report["draw"]["histogram_ms"].values()) == 2
+    assert len(profiler.frames) == 2 and profiler.frame_time is not None and profiler.fps == 2
+    assert done == [1, 1]
+
+    profiler.reset()
+    assert profiler.report() == {} and profiler.frame_time is None
+
+
+def test_instrumentation_is_installed_only_while_enabled():
+    chart = make_chart(2000)
+    methods = list(utils.DragZoomApp.INSTRUMENTED) + list(utils.DragZoomApp.FRAMES)
+
+    chart.set_instrumentation(True)
+    assert all(name in vars(chart) for name in methods)
+    assert chart.scheduler.redraw is chart._redraw_layers
+    zoom(chart, 3, 120)
+    chart.draw_chart()
+    report = chart.profiler.report()
+    assert report["mouse_wheel_zoom"]["count"] == 3 and report["draw_chart"]["count"] == 1
+    assert report["draw_candlesticks"]["mean_items"] > 0
+    assert chart.button_panel.find_withtag("hud")
+
+    chart.set_instrumentation(False)
+    assert not any(name in vars(chart) for name in methods)
+    assert chart.scheduler.redraw == chart._redraw_layers
+    chart.profiler.reset()
+    chart.draw_chart()
+    assert chart.profiler.report() == {} and not chart.button_panel.find_withtag("hud")
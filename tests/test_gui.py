@@ -0,0 +1,75 @@
+"""
+Screen cache of the main window, driven with stand-in screens so that no
+display is needed.
+"""
+from collections import OrderedDict
+
+import pytest
+
+pytest.importorskip("customtkinter")
+import gui  # noqa: E402
+
+
+class FakeScreen:
+    """Records how a screen is built, packed and destroyed."""
+
+    built = []
+
+    def __init__(self, master, controller):
+        self.name = type(self).__name__
+        self.alive = True
+        self.packed = False
+        FakeScreen.built.append(self.name)
+
+    def pack(self, **options):
+        self.packed = True
+
+    def pack_forget(self):
+        self.packed = False
+
+    def destroy(self):
+        self.alive = False
+
+    def winfo_exists(self):
+        return self.alive
+
+
+SCREENS = {name: type(name, (FakeScreen,), {}) for name in ("Home", "Settings", "Profile", "Replay", "Help")}
+
+
+@pytest.fixture
+def app():
+    FakeScreen.built = []
+    app = gui.MainApp.__new__(gui.MainApp)
+    app.container = None
+    app.frame = FakeScreen(None, app)
+    app.frames_class = SCREENS
+    app.frames = OrderedDict()
+    app.keep_alive = ("Replay",)
+    app.max_cached_screens = 2
+    FakeScreen.built = []
+    return app
+
+
+def test_screens_are_reused_until_evicted(app):
+    for name in ("Replay", "Home", "Settings", "Home", "Profile", "Help"):
+        app.show_frame(name)
+
+    # Replay is kept alive, the two most recent others stay cached
+    assert FakeScreen.built == ["Replay", "Home", "Settings", "Profile", "Help"]
+    assert list(app.frames) == ["Replay", "Home", "Profile", "Help"]
+    assert app.frame.name == "Help" and app.frame.packed
+    assert all(not screen.packed for name, screen in app.frames.items() if name != "Help")
+
+    app.show_frame("Settings")
+    app.show_frame("Replay")
+    assert FakeScreen.built[-1] == "Settings" and "Home" not in app.frames
+    assert app.frames["Replay"].alive and FakeScreen.built.count("Replay") == 1
+
+
+def test_destroyed_screen_is_rebuilt(app):
+    app.show_frame("Home")
+    app.frames["Home"].destroy()
+    app.show_frame("Settings")
+    app.show_frame("Home")
+    assert FakeScreen.built == ["Home", "Settings", "Home"] and app.frame.alive
@@ -0,0 +1,180 @@
+"""
+History loading: the binary cache, the OHLCStore and the lazy provider.
+"""
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import model
+from resampling import nests_in, resample_ohlc
+from synthetic import generate_ohlcv
+
+
+@pytest.fixture
+def source(tmp_path) -> str:
+    df = generate_ohlcv(500, time_frame="m1", seed=5)
+    df["Time"] = df["Time"].astype(np.int64)
+    path = str(tmp_path / "history.csv")
+    df.to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture
+def hashes(monkeypatch) -> list:
+    """Paths hashed by the loaders, in order."""
+    calls = []
+    digest = model._source_digest
+
+    def counting(path):
+        calls.append(path)
+        return digest(path)
+
+    monkeypatch.setattr(model, "_source_digest", counting)
+    return calls
+
+
+def touch(path: str) -> None:
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_cache_hit_reads_no_source(source, hashes, monkeypatch):
+    expected = model.load_history(source)
+    assert os.path.exists(model._cache_path(source)) and len(hashes) == 1
+
+    monkeypatch.setattr(model, "_read_source", lambda path: pytest.fail("source parsed"))
+    pd.testing.assert_frame_equal(model.load_history(source), expected)
+    assert len(hashes) == 1
+
+
+def test_touched_source_is_hashed_once(source, hashes):
+    expected = model.load_history(source)
+    touch(source)
+    hashes.clear()
+
+    pd.testing.assert_frame_equal(model.load_history(source), expected)
+    pd.testing.assert_frame_equal(model.load_history(source), expected)
+    assert len(hashes) == 1
+
+
+def test_changed_source_rebuilds_the_cache(source):
+    model.load_history(source)
+    df = pd.read_csv(source)
+    df.loc[0, "Close"] += 1
+    df.to_csv(source, index=False)
+    touch(source)
+
+    assert model.load_history(source)["Close"].iat[0] == df["Close"].iat[0]
+
+
+def test_store_is_built_once_and_follows_the_source(source, hashes):
+    prepare = lambda df: df.assign(Time=pd.to_datetime(df["Time"]))
+    store = model.load_history_store(source, prepare)
+    # One hash for the npz cache and the store together
+    assert len(store) == 500 and len(hashes) == 1
+    assert store.columns["Time"].dtype == "datetime64[ns]"
+
+    touch(source)
+    hashes.clear()
+    model.load_history_store(source, prepare)
+    model.load_history_store(source, prepare)
+    assert len(hashes) == 1
+
+
+def test_store_slice_and_search(tmp_path):
+    df = generate_ohlcv(1000, time_frame="m1", seed=6)
+    store = model.OHLCStore.write(str(tmp_path / "store"), df)
+
+    pd.testing.assert_frame_equal(store.slice(100, 200).copy(), df.iloc[100:200].reset_index(drop=True))
+    assert store.search(df["Time"].iat[150]) == 150
+    assert store.search(df["Time"].iat[150], side="right") == 151
+
+
+@pytest.mark.parametrize("time_frame, finer", [("h1", ["m5", "m15"]), ("1M", ["h4", "1d", "1W"])])
+def test_store_frames_are_aggregated_once(tmp_path, monkeypatch, time_frame, finer):
+    df = generate_ohlcv(100_000, time_frame="m1", seed=7)
+    path = str(tmp_path / "store")
+    store = model.OHLCStore.write(path, df)
+    # Small chunks, so that bars would be split if chunks were cut anywhere
+    monkeypatch.setattr(model.OHLCStore, "FRAME_CHUNK_ROWS", 777)
+
+    expected = resample_ohlc(df, time_frame)
+    pd.testing.assert_frame_equal(store.aggregate(time_frame, finer).frame().copy(), expected)
+    pd.testing.assert_frame_equal(
+        model.OHLCMemoryStore(df).aggregate(time_frame, finer).frame(), expected, check_exact=False
+    )
+
+    # Read back from disk by a new session, dropped when the rows are rewritten
+    monkeypatch.setattr(model, "resample_ohlc", lambda *args: pytest.fail("frame rebuilt"))
+    assert len(model.OHLCStore(path).aggregate(time_frame, finer)) == len(expected)
+    model.OHLCStore.write(path, df.iloc[:10])
+    assert not os.path.exists(os.path.join(path, model.OHLCStore.FRAMES_DIR))
+
+
+def test_nesting_time_frames():
+    assert nests_in("m5", "h1") and nests_in("h4", "1d") and nests_in("h4", "1W") and nests_in("1d", "1M")
+    assert nests_in("1M", "6M") and nests_in("6M", "1Y") and nests_in("1Y", "4Y")
+    assert not nests_in("1W", "1M") and not nests_in("h5", "1d") and not nests_in("m7", "h1")
+
+
+class FakeWidget:
+    """Runs the callbacks scheduled with ``after`` when ``run`` is called."""
+
+    def __init__(self):
+        self.jobs = []
+        self.exists = True
+
+    def after(self, delay_ms, callback):
+        self.jobs.append(callback)
+
+    def winfo_exists(self):
+        return self.exists
+
+    def run(self, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        while self.jobs and time.monotonic() < deadline:
+            self.jobs.pop(0)()
+            time.sleep(0.001)
+        assert not self.jobs, "loading did not finish"
+
+
+def test_provider_loads_once_in_the_background(source):
+    release, calls = threading.Event(), []
+
+    def loader(path, prepare):
+        calls.append(threading.current_thread())
+        release.wait(10)
+        return prepare(model.load_history(path))
+
+    provider = model.HistoryProvider(source, prepare=lambda df: df.iloc[:100], loader=loader)
+    assert not calls and not provider.loaded
+
+    widget, received = FakeWidget(), []
+    provider.request(widget, received.append, poll_ms=1)
+    # Polled from the Tk side while the loader runs on its own thread
+    assert widget.jobs and not received
+    release.set()
+    widget.run()
+
+    assert len(received) == 1 and len(received[0]) == 100 and provider.loaded
+    assert provider.get() is received[0]
+    assert len(calls) == 1 and calls[0] is not threading.current_thread()
+
+
+def test_provider_reports_errors_and_skips_destroyed_widgets(source, tmp_path):
+    failing = model.HistoryProvider(str(tmp_path / "missing.csv"))
+    widget, errors = FakeWidget(), []
+    failing.request(widget, lambda data: pytest.fail("no data expected"), on_error=errors.append, poll_ms=1)
+    widget.run()
+    assert len(errors) == 1 and isinstance(errors[0], OSError) and not failing.loaded
+
+    provider = model.HistoryProvider(source, loader=model.load_history_store)
+    widget = FakeWidget()
+    widget.exists = False
+    provider.request(widget, lambda data: pytest.fail("widget destroyed"), poll_ms=1)
+    widget.run()
+    assert isinstance(provider.get(), model.OHLCStore) and len(provider.get()) == 500
@@ -0,0 +1,327 @@
+"""
+Invariants of the data pipeline, checked on synthetic bars.
+
+Every fast path is compared with a straightforward reference computation:
+range queries with slicing, resampling with a pandas groupby, time labels
+with a scan of every row, chunked
+ingestion with a single aggregation, the vectorized backtest with the
+event-driven loop, streaming indicators with their vectorized form, and the
+chart read through windows of an OHLCStore with the chart of the whole
+DataFrame.
+"""
+import copy
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import benchmark
+import time_labels
+import utils
+from backtest import run_backtest
+from chart_geometry import MinMaxPyramid, SparseTable, compute_lod_geometry
+from indicators import ATR, EMA, RSI, SMA, VWAP, Bollinger, IndicatorCache, bars
+from ingest import BarBuilder, aggregate_bars, ingest_csv
+from model import OHLCStore
+from resampling import OHLCResampler, bucket_starts, resample_ohlc, to_datetime64
+from synthetic import generate_ohlcv
+from time_labels import TimeLabelIndex
+
+
+INDICATORS = [SMA(20), EMA(20), RSI(14), ATR(14), Bollinger(20, 2), VWAP()]
+
+
+@pytest.fixture(scope="module")
+def df() -> pd.DataFrame:
+    return generate_ohlcv(20_000, time_frame="m1", session=("08:00", "22:00"), seed=7)
+
+
+def assert_lines_equal(expected, actual, lines) -> None:
+    for line in lines:
+        np.testing.assert_allclose(actual[line], expected[line], rtol=1e-9, atol=1e-7, equal_nan=True)
+
+
+def test_generated_bars_are_valid(df):
+    assert len(df) == 20_000
+    assert (df["High"] >= df[["Open", "Close"]].max(axis=1)).all()
+    assert (df["Low"] <= df[["Open", "Close"]].min(axis=1)).all()
+    assert (df["Volume"] > 0).all()
+    assert df["Time"].is_monotonic_increasing
+    assert df["Time"].dt.hour.between(8, 21).all()
+
+
+def test_generator_is_reproducible():
+    pd.testing.assert_frame_equal(generate_ohlcv(500, seed=1), generate_ohlcv(500, seed=1))
+
+
+@pytest.mark.parametrize("reduce, reference", [(np.maximum, np.max), (np.minimum, np.min)])
+def test_sparse_table_matches_slices(df, reduce, reference):
+    values = df["High"].to_numpy()
+    table = SparseTable(values, reduce, block=16)
+    rng = np.random.default_rng(0)
+    for start, end in rng.integers(0, len(values) + 1, size=(500, 2)):
+        start, end = sorted((start, end))
+        expected = reference(values[start:end]) if end > start else None
+        assert table.query(start, end) == expected
+
+
+def test_resampler_matches_groupby(df):
+    resampler = OHLCResampler(df, ["m1", "m5", "h1", "1d", "1W"])
+    for time_frame, frequency in (("m5", "5min"), ("h1", "1h"), ("1d", "1D")):
+        groups = df.groupby(df["Time"].dt.floor(frequency))
+        expected = pd.DataFrame({
+            "Time": groups["Time"].first().index,
+            "Open": groups["Open"].first().to_numpy(),
+            "High": groups["High"].max().to_numpy(),
+            "Low": groups["Low"].min().to_numpy(),
+            "Close": groups["Close"].last().to_numpy(),
+            "Volume": groups["Volume"].sum().to_numpy(),
+        })
+        pd.testing.assert_frame_equal(resampler.get(time_frame), expected, check_dtype=False)
+        pd.testing.assert_frame_equal(resample_ohlc(df, time_frame), expected, check_dtype=False)
+
+
+def test_resampler_locates_base_rows(df):
+    resampler = OHLCResampler(df, ["m1", "h1"])
+    hourly = resampler.get("h1")
+    for row in (0, 1, len(hourly) // 2, len(hourly) - 1):
+        first, end = resampler.base_range("h1", row)
+        assert df["Low"].iloc[first:end].min() == hourly["Low"].iat[row]
+        assert resampler.locate("h1", resampler.timestamp("m1", first)) == row
+        assert resampler.locate("h1", resampler.timestamp("m1", end - 1)) == row
+
+
+def test_time_of_day_strings_roll_over_days():
+    times = to_datetime64(pd.Series(["23:58:00", "23:59:00", "00:00:00", "00:01:30.5"]))
+    expected = pd.to_datetime(
+        ["1970-01-01 23:58:00", "1970-01-01 23:59:00", "1970-01-02 00:00:00", "1970-01-02 00:01:30.5"], format="ISO8601"
+    )
+    np.testing.assert_array_equal(times, expected.to_numpy())
+
+
+LABEL_RULES = {
+    ("m", 15): (lambda t: t.minute % 15 == 0, "%H:%M"),
+    ("h", 2): (lambda t: t.minute == 0 and t.hour % 2 == 0, "%H:%M"),
+    ("d", 2): (lambda t: t.day % 2 == 0, "%d-%m"),
+    ("W", 1): (lambda t: t.weekday() == 0, "%d-%m"),
+    ("M", 1): (lambda t: t.day == 1, "%b %Y"),
+}
+
+
+@pytest.mark.parametrize("units, interval", list(LABEL_RULES))
+def test_time_label_index_matches_row_scan(monkeypatch, units, interval):
+    # Daily bars reach every label unit; small chunks cross chunk edges
+    times = pd.Series(pd.date_range("2020-01-01 22:00", periods=3000, freq="37min").append(
+        pd.date_range("2020-03-01", periods=1000, freq="D")))
+    monkeypatch.setattr(time_labels, "INDEX_CHUNK_SIZE", 256)
+    qualifies, label_format = LABEL_RULES[units, interval]
+    expected = [(row, t.strftime(label_format)) for row, t in enumerate(times) if qualifies(t)]
+
+    index = TimeLabelIndex(times)
+    positions, labels = index.build(units, interval)
+    assert list(zip(positions.tolist(), labels.tolist())) == expected
+
+    start, end = 1234, 3456
+    visible = [(row, label) for row, label in expected if start <= row < end]
+    positions, labels = index.visible(units, interval, start, end)
+    assert list(zip(positions.tolist(), labels.tolist())) == visible
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 7, 1000, 50_000])
+def test_bar_builder_carries_bars_across_chunks(df, chunk_rows):
+    times = to_datetime64(df["Time"])
+    prices = df["Close"].to_numpy()
+    volumes = df["Volume"].to_numpy(dtype=np.float64)
+    rows = slice(0, 3000) if chunk_rows == 1 else slice(None)
+    times, prices, volumes = times[rows], prices[rows], volumes[rows]
+
+    builder = BarBuilder("m15")
+    parts = [
+        builder.add(*(values[start:start + chunk_rows] for values in (times, prices, prices, prices, prices, volumes)))
+        for start in range(0, len(times), chunk_rows)
+    ]
+    built = pd.concat(parts + [builder.finish()], ignore_index=True)
+
+    expected = pd.DataFrame(aggregate_bars(bucket_starts(times, "m15"), prices, prices, prices, prices, volumes))
+    pd.testing.assert_frame_equal(built, expected)
+
+
+def test_ingest_ticks_matches_groupby(tmp_path):
+    rng = np.random.default_rng(3)
+    times = pd.Timestamp("2024-03-01 09:00") + pd.to_timedelta(np.cumsum(rng.integers(1, 4000, 5000)), unit="ms")
+    ticks = pd.DataFrame({
+        "Time": times.strftime("%Y-%m-%d %H:%M:%S.%f"),
+        "Price": np.round(100 + np.cumsum(rng.normal(0, 0.05, 5000)), 2),
+        "Size": rng.integers(1, 50, 5000).astype(np.float64),
+    })
+    path = tmp_path / "ticks.csv"
+    ticks.to_csv(path, index=False)
+
+    store = ingest_csv(str(path), str(tmp_path / "store"), time_frame="m5",
+                       time_format="%Y-%m-%d %H:%M:%S.%f", chunk_rows=333)
+
+    grouped = ticks.groupby(times.floor("5min"))
+    expected = pd.DataFrame({
+        "Time": grouped["Price"].first().index.to_numpy(),
+        "Open": grouped["Price"].first().to_numpy(),
+        "High": grouped["Price"].max().to_numpy(),
+        "Low": grouped["Price"].min().to_numpy(),
+        "Close": grouped["Price"].last().to_numpy(),
+        "Volume": grouped["Size"].sum().to_numpy(),
+    })
+    pd.testing.assert_frame_equal(store.frame().copy(), expected, check_dtype=False)
+
+
+def test_ingest_bars_matches_resampling(df, tmp_path):
+    path = tmp_path / "bars.csv"
+    df.assign(Time=df["Time"].astype(np.int64) // 1_000_000).to_csv(path, index=False)
+
+    store = ingest_csv(str(path), str(tmp_path / "store"), time_frame="h1", time_unit="ms", chunk_rows=1000)
+    pd.testing.assert_frame_equal(store.frame().copy(), resample_ohlc(df, "h1"), check_dtype=False)
+
+    df[["Time", "Volume"]].to_csv(path, index=False)
+    with pytest.raises(ValueError, match="No price column"):
+        ingest_csv(str(path), str(tmp_path / "other"))
+
+
+@pytest.mark.parametrize("costs", [{}, {"commission": 0.05, "slippage": 0.02}])
+def test_vectorized_backtest_matches_event_loop(df, costs):
+    closes = df["Close"].to_numpy()
+    fast = pd.Series(closes).rolling(10).mean().to_numpy()
+    slow = pd.Series(closes).rolling(50).mean().to_numpy()
+    signals = np.where(fast > slow, 1.0, -1.0)
+
+    vectorized = run_backtest(df, signals, **costs)
+    # Stops too far away to trigger force the event-driven loop
+    looped = run_backtest(df, signals, stop_loss=1e9, take_profit=1e9, **costs)
+
+    np.testing.assert_allclose(vectorized.equity, looped.equity, rtol=1e-9, atol=1e-6)
+    np.testing.assert_array_equal(vectorized.position, looped.position)
+    pd.testing.assert_frame_equal(vectorized.trades, looped.trades, check_dtype=False)
+
+
+def test_backtest_fills_at_next_open(df):
+    signals = np.zeros(len(df))
+    signals[10] = 1.0
+    result = run_backtest(df, signals)
+    trade = result.trades.iloc[0]
+    assert result.position[11] == 1.0 and result.position[12] == 0.0
+    assert trade["entry_price"] == df["Open"].iat[11]
+    assert trade["pnl"] == pytest.approx(df["Open"].iat[12] - df["Open"].iat[11])
+
+
+@pytest.mark.parametrize("stops", [{}, {"stop_loss": 0.5, "take_profit": 1.0}])
+def test_trade_ledger_adds_up_to_equity(df, stops):
+    signals = np.sign(np.sin(np.arange(len(df)) / 40.0)).round()
+    result = run_backtest(df, signals, size=3.0, commission=0.05, slippage=0.02, initial_equity=100.0, **stops)
+    assert result.trades["pnl"].sum() == pytest.approx(result.equity[-1] - 100.0)
+
+
+def test_backtest_rejects_fractional_signals(df):
+    signals = np.zeros(len(df))
+    signals[5] = 0.5
+    with pytest.raises(ValueError, match="row 5"):
+        run_backtest(df, signals)
+
+
+@pytest.mark.parametrize("indicator", INDICATORS, ids=lambda indicator: indicator.name)
+def test_streaming_matches_compute(df, indicator):
+    expected = indicator.compute(df)
+
+    stream = copy.copy(indicator)
+    stream.reset()
+    streamed = np.array([stream.update(bar) for bar in bars(df)])
+    assert_lines_equal(expected, dict(zip(indicator.lines, streamed.T)), indicator.lines)
+
+    # Seeding half way, then streaming the rest
+    stream.seed(df, 0, 10_000)
+    streamed = np.array([stream.update(bar) for bar in bars(df, 10_000)])
+    tail = {line: expected[line][10_000:] for line in indicator.lines}
+    assert_lines_equal(tail, dict(zip(indicator.lines, streamed.T)), indicator.lines)
+
+
+@pytest.mark.parametrize("indicator", INDICATORS, ids=lambda indicator: indicator.name)
+def test_indicator_cache_follows_replay(df, indicator):
+    expected = indicator.compute(df)
+    cache = IndicatorCache()
+
+    # Grow bar by bar, jump ahead, then seek back with a partial bar
+    for count in (100, 101, 102, 5000, 5003, 12_000, 4000, 4000, 4001):
+        partial = next(bars(df, count, count + 1))
+        values = cache.get(indicator, "m1", df, count, partial=partial)
+        head = {line: expected[line][:count + 1] for line in indicator.lines}
+        assert_lines_equal(head, values, indicator.lines)
+
+
+def test_lod_envelope_stops_at_the_last_row(df):
+    highs, lows = df["High"].to_numpy(), df["Low"].to_numpy()
+    opens, closes = df["Open"].to_numpy(), df["Close"].to_numpy()
+    pyramid = MinMaxPyramid(highs, lows)
+    end = 10_005
+    newest = (1.0, 1e6, -1e6, 2.0)
+
+    geometry = compute_lod_geometry(opens, closes, pyramid, 5000, end, 900.0, 0.1, 0.7, (1.0, 0.0), newest)
+
+    block = 1 << pyramid.level_for(0.1)
+    first = (end - 1) // block * block
+    # Wick (x, high, x, low) and body (x0, open, x1, close) of the newest block
+    assert geometry.wicks[0][1] == 1e6 and geometry.wicks[0][3] == -1e6
+    assert geometry.bodies[0][1] == opens[first] and geometry.bodies[0][3] == 2.0
+    assert geometry.wicks[1][1] == highs[first - block:first].max()
+    assert geometry.wicks[1][3] == lows[first - block:first].min()
+
+
+class SmallWindowApp(utils.DragZoomApp):
+    WINDOW_ROWS = 2000
+
+
+def visible_bars(app):
+    start, end, x_start = app._visible_range()
+    times = app.df["Time"].to_numpy()[start:end].tolist()
+    positions = (x_start - app.viewport.step * np.arange(end - start)[::-1]).tolist()
+    return {time: (pytest.approx(x, abs=1e-6), *ohlc) for time, x, *ohlc in zip(times, positions, *app._visible_ohlc(start, end))}
+
+
+def assert_same_bars(expected_app, actual_app):
+    expected, actual = visible_bars(expected_app), visible_bars(actual_app)
+    # A bar right on the edge of the canvas may be kept on one side only,
+    # the two viewports being computed with different rounding
+    common = expected.keys() & actual.keys()
+    assert len(expected) - len(common) <= 2 and len(actual) - len(common) <= 2
+    assert {time: actual[time] for time in common} == {time: expected[time] for time in common}
+
+
+@pytest.mark.parametrize("revealed", [None, 15_000])
+def test_store_window_matches_dataframe(df, tmp_path, revealed):
+    store = OHLCStore.write(str(tmp_path / "store"), df)
+    with benchmark.headless():
+        apps = [utils.DragZoomApp(benchmark.StubRoot(), df), SmallWindowApp(benchmark.StubRoot(), store=store)]
+    for app in apps:
+        app.set_revealed(revealed)
+        app.initialize_chart()
+        app.start_drag(benchmark._event(500, 300), "canvas")
+
+    def frame(handler, *args):
+        for app in apps:
+            handler(app, *args)
+            app._redraw_layers(set(app.LAYERS))
+        assert_same_bars(*apps)
+
+    # Pan back through several windows, zoom out to larger time frames and back
+    for x in range(3500, 60_000, 3000):
+        frame(utils.DragZoomApp.drag_to_pan, benchmark._event(x, 300), "canvas")
+    for _ in range(25):
+        frame(utils.DragZoomApp.mouse_wheel_zoom, benchmark._event(delta=-120))
+    assert apps[1].current_tf_index > 0
+    for _ in range(25):
+        frame(utils.DragZoomApp.mouse_wheel_zoom, benchmark._event(delta=120))
+    assert apps[1].window != (len(store) - 2000, len(store))
+
+    if revealed is not None:
+        for position in (100, 19_000, 3000):
+            for app in apps:
+                app.set_revealed(position)
+                app.draw_chart()
+            assert_same_bars(*apps)
+            for _ in range(5):
+                frame(utils.DragZoomApp.append_bars, 700)
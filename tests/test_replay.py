@@ -0,0 +1,68 @@
+"""
+Replay of a headless chart: the engine, the incremental chart updates and
+the time axis while bars are revealed.
+"""
+import pytest
+
+import benchmark
+import utils
+from replay_engine import ReplayEngine
+from synthetic import generate_ohlcv
+
+
+@pytest.fixture
+def chart() -> utils.DragZoomApp:
+    df = generate_ohlcv(5000, time_frame="m1", seed=3)
+    with benchmark.headless():
+        chart = utils.DragZoomApp(benchmark.StubRoot(), df)
+    chart.set_revealed(1000)
+    chart.initialize_chart()
+    return chart
+
+
+def drawn_labels(chart):
+    pool = chart.item_pools['time_labels']
+    items = chart.canvas_date.items
+    return [items[item][2]['text'] for item in pool.items[:pool.active]]
+
+
+def test_time_labels_stay_while_bars_are_revealed(chart):
+    labels = drawn_labels(chart)
+    assert labels
+
+    for _ in range(10):
+        chart.append_bars(1)
+        # The newest bar stays anchored, so labels only drift left by whole bars
+        assert set(drawn_labels(chart)) & set(labels)
+
+
+def test_append_bars_matches_full_redraw(chart):
+    chart.append_bars(37)
+    incremental = chart.item_pools['candle_bodies'].active, chart.drawn_range
+    chart.draw_chart()
+    assert (chart.item_pools['candle_bodies'].active, chart.drawn_range) == incremental
+    assert chart.drawn_range[1] == 1037
+
+
+def test_seeks_are_drawn_once_per_frame(chart):
+    engine = ReplayEngine(chart, start=1000)
+    frames = []
+    chart.scheduler.redraw = frames.append
+
+    for position in range(1100, 1500, 50):
+        engine.seek(position)
+    assert frames == [] and chart.scheduler.pending
+
+    chart.scheduler.flush()
+    assert len(frames) == 1 and chart.revealed == 1450
+
+
+def test_playback_stops_before_listeners_see_the_end(chart):
+    engine = ReplayEngine(chart, start=4990)
+    seen = []
+    engine.listeners.append(lambda position: seen.append((position, engine.playing)))
+
+    engine.play()
+    engine._advance(100)
+    assert seen == [(5000, False)]
+    assert engine.finished and not engine.playing
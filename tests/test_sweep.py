@@ -0,0 +1,95 @@
+"""
+Parameter sweeps: results match a serial evaluation, the shared block
+round-trips the data, and failures reach the Tk-side callbacks.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sweep import SharedOHLC, SweepRunner, _attach, grid, ma_crossover, random_search
+from synthetic import generate_ohlcv
+
+
+@pytest.fixture(scope="module")
+def df() -> pd.DataFrame:
+    return generate_ohlcv(5000, time_frame="m1", seed=11)
+
+
+def failing_evaluator(df, params):
+    raise ValueError(f"bad params {params}")
+
+
+class FakeWidget:
+    """Runs the callbacks scheduled with ``after`` when ``run`` is called."""
+
+    def __init__(self):
+        self.jobs = []
+
+    def after(self, delay_ms, callback):
+        self.jobs.append(callback)
+
+    def winfo_exists(self):
+        return True
+
+    def run(self, timeout=60.0):
+        deadline = time.monotonic() + timeout
+        while self.jobs and time.monotonic() < deadline:
+            self.jobs.pop(0)()
+            time.sleep(0.01)
+        assert not self.jobs, "sweep did not finish"
+
+
+def test_grid_and_random_search():
+    assert grid(a=[1, 2], b="xy") == [{"a": 1, "b": "x"}, {"a": 1, "b": "y"}, {"a": 2, "b": "x"}, {"a": 2, "b": "y"}]
+    drawn = random_search(20, seed=1, a=range(5))
+    assert drawn == random_search(20, seed=1, a=range(5))
+    assert all(0 <= params["a"] < 5 for params in drawn)
+
+
+def test_shared_block_round_trips_the_data(df):
+    shared = SharedOHLC(df)
+    try:
+        block, attached = _attach(shared.spec)
+        pd.testing.assert_frame_equal(attached, df[list(attached.columns)])
+        del attached
+        block.close()
+    finally:
+        shared.close()
+
+
+def test_sweep_matches_serial_evaluation(df):
+    param_sets = grid(fast=[5, 10], slow=[20, 50])
+    results = SweepRunner(df, workers=2).run(param_sets)
+
+    assert len(results) == len(param_sets)
+    for row, params in zip(results.to_dict("records"), param_sets):
+        expected = ma_crossover(df, params)
+        assert {name: row[name] for name in expected} == pytest.approx(expected)
+
+
+def test_start_reports_worker_errors(df):
+    widget = FakeWidget()
+    received, done, errors = [], [], []
+    SweepRunner(df, evaluator=failing_evaluator, workers=1).start(
+        widget, grid(fast=[5]), received.append,
+        on_done=lambda: done.append(True), on_error=errors.append, poll_ms=10
+    )
+    widget.run()
+
+    assert not received and not done
+    assert len(errors) == 1 and "bad params" in str(errors[0])
+
+
+def test_start_delivers_results_then_done(df):
+    widget = FakeWidget()
+    received, done = [], []
+    SweepRunner(df, workers=1).start(
+        widget, grid(fast=[5, 10], slow=[30]), lambda *result: received.append(result),
+        on_done=lambda: done.append(True), poll_ms=10
+    )
+    widget.run()
+
+    assert sorted(index for index, _, _ in received) == [0, 1] and done == [True]
+    assert np.isfinite([metrics["pnl"] for _, _, metrics in received]).all()
@@ -0,0 +1,189 @@
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def time_components(times: pd.Series) -> Dict[str, np.ndarray]:
+    """
+    Split a time column into integer calendar components.
+
+    The components are computed with integer arithmetic on the raw
+    nanoseconds of the ``datetime64`` values. Missing times (NaT) get -1 in
+    every component.
+
+    Args:
+        times: The chart's Time column (``datetime64``)
+
+    Returns:
+        Dict of int arrays (minute, hour, day, weekday, month) plus the
+        boolean array ``valid`` (value is not NaT)
+    """
+    values = times.to_numpy(dtype="datetime64[ns]")
+    valid = ~np.isnat(values)
+    minutes = values.view(np.int64) // 60_000_000_000
+    days = values.astype("datetime64[D]")
+    months = values.astype("datetime64[M]")
+    components = {
+        'minute': minutes % 60,
+        'hour': (minutes // 60) % 24,
+        'day': (days - months.astype("datetime64[D]")).view(np.int64) + 1,
+        'weekday': (days.view(np.int64) + 3) % 7,  # 1970-01-01 was a Thursday
+        'month': months.view(np.int64) % 12 + 1,
+    }
+    for key in components:
+        components[key][~valid] = -1
+    components['valid'] = valid
+    return components
+
+
+def label_mask(components: Dict[str, np.ndarray], units: str, interval: int) -> np.ndarray:
+    """
+    Compute which rows qualify for a time label, for every row at once.
+
+    Args:
+        components: Output of ``time_components``
+        units: Time unit (m, h, d, W, M, Y)
+        interval: Interval value
+
+    Returns:
+        Boolean array, True where a label should be drawn
+    """
+    valid = components['valid']
+    minute = components['minute']
+
+    if units == "m":
+        return valid & (minute % interval == 0)
+    elif units == "h":
+        return valid & (components['hour'] % interval == 0) & (minute == 0)
+    elif units == "d":
+        return valid & (components['day'] % interval == 0)
+    elif units == "W":
+        return valid & (components['weekday'] == 0)  # Monday
+    elif units == "M":
+        return valid & (components['day'] == 1)  # First day of month
+    elif units == "Y":
+        return valid & (components['month'] == 1) & (components['day'] == 1)
+
+    return np.zeros(len(valid), dtype=bool)
+
+
+def label_ordinals(values: np.ndarray, units: str, interval: int) -> np.ndarray:
+    """
+    Number label times by their time unit, counting from the epoch.
+
+    Consecutive ticks of a unit get consecutive numbers whatever rows they
+    fall on, so labels thinned out by these numbers stay the same when bars
+    are added to the chart.
+
+    Args:
+        values: ``datetime64[ns]`` times of the ticks
+        units: Time unit (m, h, d, W, M, Y)
+        interval: Interval value
+
+    Returns:
+        Int array of tick numbers
+    """
+    minutes = values.view(np.int64) // 60_000_000_000
+    if units == "m":
+        return minutes // interval
+    elif units == "h":
+        return minutes // (60 * interval)
+
+    days = values.astype("datetime64[D]").view(np.int64)
+    if units == "d":
+        return days // interval
+    elif units == "W":
+        return (days + 3) // 7  # Weeks starting on Monday
+    elif units == "M":
+        return values.astype("datetime64[M]").view(np.int64)
+    return values.astype("datetime64[Y]").view(np.int64)
+
+
+# Rows processed at once when building an index, to bound temporary memory
+INDEX_CHUNK_SIZE = 1 << 20
+
+# strftime formats per time unit
+DATE_LABEL_FORMATS = {
+    "m": "%H:%M",
+    "h": "%H:%M",
+    "d": "%d-%m",
+    "W": "%d-%m",
+    "M": "%b %Y",
+    "Y": "%Y",
+}
+
+
+class TimeLabelIndex:
+    """
+    Tick positions and pre-formatted label strings for each time unit.
+
+    Each (unit, interval) entry holds the sorted row positions that qualify
+    as a tick mark together with their label text, so finding the labels of a
+    viewport is a binary search instead of a scan over the rows. Entries are
+    built in chunks so that only the positions, not the calendar components
+    of every row, are kept in memory.
+    """
+
+    def __init__(self, times: pd.Series):
+        """
+        Initialize the index for a time column.
+
+        Args:
+            times: The chart's Time column (``datetime64``)
+        """
+        self.times = times
+        self.entries: Dict[Tuple[str, int], Tuple[np.ndarray, np.ndarray]] = {}
+
+    def build(self, units: str, interval: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get (and build on first use) the entry for a time unit.
+
+        Args:
+            units: Time unit (m, h, d, W, M, Y)
+            interval: Interval value
+
+        Returns:
+            Tuple of (positions, labels) sorted by position
+        """
+        key = (units, interval)
+        if key not in self.entries:
+            chunks = [np.empty(0, dtype=np.int64)]
+            for offset in range(0, len(self.times), INDEX_CHUNK_SIZE):
+                components = time_components(self.times.iloc[offset:offset + INDEX_CHUNK_SIZE])
+                chunks.append(np.flatnonzero(label_mask(components, units, interval)) + offset)
+            positions = np.concatenate(chunks)
+            self.entries[key] = (positions, self._format(positions, units))
+        return self.entries[key]
+
+    def visible(self, units: str, interval: int, start: int, end: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the tick positions and labels that fall in ``[start, end)``.
+
+        Args:
+            units: Time unit (m, h, d, W, M, Y)
+            interval: Interval value
+            start: First row of the range
+            end: Row after the last row of the range
+
+        Returns:
+            Tuple of (positions, labels) sorted by position
+        """
+        positions, labels = self.build(units, interval)
+        lo, hi = np.searchsorted(positions, (start, end))
+        return positions[lo:hi], labels[lo:hi]
+
+    def _format(self, positions: np.ndarray, units: str) -> np.ndarray:
+        """Format the label text of the given rows."""
+        # Format each distinct label once and broadcast it back
+        values = self.times.to_numpy(dtype="datetime64[ns]")[positions]
+        if units in ("m", "h"):
+            minutes = (values.view(np.int64) // 60_000_000_000) % 1440  # Minute of the day
+            uniques, inverse = np.unique(minutes, return_inverse=True)
+            texts = np.array([f"{m // 60:02d}:{m % 60:02d}" for m in uniques.tolist()], dtype=object)
+        else:
+            resolution = {"d": "D", "W": "D", "M": "M"}.get(units, "Y")
+            uniques, inverse = np.unique(values.astype(f"datetime64[{resolution}]"), return_inverse=True)
+            texts = pd.DatetimeIndex(uniques.astype("datetime64[ns]")).strftime(DATE_LABEL_FORMATS.get(units, "%Y"))
+            texts = texts.to_numpy(dtype=object)
+        return texts[inverse]
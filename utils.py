@@ -1,8 +1,22 @@
 import tkinter as tk
 from functools import partial
-from datetime import datetime, time
+import numpy as np
 import pandas as pd
-from typing import List, Tuple, Union, Optional, Dict, Any
+from typing import List, Set, Tuple, Union, Optional, Dict, Any
+
+from canvas_pool import CanvasItemPool
+from chart_geometry import (
+    MinMaxPyramid, SparseTable, compute_candle_geometry, compute_lod_geometry, compute_polyline
+)
+from indicator_pane import LINE_COLORS, IndicatorPane, VolumePane
+from indicators import Bar, Indicator, IndicatorCache
+from instrumentation import Profiler
+from chart_stats import ChartStatistics, StatisticsCache, nice_ticks, step_decimals
+from model import OHLCMemoryStore, OHLCStore, load_history
+from redraw_scheduler import RedrawScheduler
+from resampling import parse_time_frame, time_frame_minutes, with_datetime64_times
+from time_labels import TimeLabelIndex, label_ordinals
+from viewport import Viewport
 
 
 class DragZoomApp:
@@ -11,26 +25,92 @@ class DragZoomApp:
     zoom/pan capabilities.
     """
     
-    def __init__(self, root: tk.Tk, df: pd.DataFrame):
+    # Drawing layers, in drawing order
+    LAYERS = ("candles", "volume", "indicators", "time_labels", "price_labels", "grid")
+    
+    # Methods timed while instrumentation is on, with the item pools they fill
+    INSTRUMENTED = {
+        "draw_candlesticks": ("candle_wicks", "candle_bodies"),
+        "draw_volume": (),
+        "draw_indicators": ("overlays",),
+        "draw_time_labels": ("time_labels",),
+        "draw_price_labels": ("price_labels",),
+        "draw_grid": ("grid_h", "grid_v"),
+        "drag_to_zoom": None,
+        "drag_to_pan": None,
+        "mouse_wheel_zoom": None,
+        "append_bars": None,
+    }
+    
+    # Methods that draw a whole frame
+    FRAMES = ("draw_chart", "_redraw_layers")
+    
+    # Bars of the current time frame loaded at least from an OHLCStore, and
+    # the number of screens of bars they must cover
+    WINDOW_ROWS = 100_000
+    WINDOW_SCREENS = 5
+    
+    def __init__(self, root: tk.Tk, df: Optional[pd.DataFrame] = None, store: Optional[OHLCStore] = None):
         """
         Initialize the DragZoomApp with the root window and financial data.
         
+        The data is either a DataFrame held in memory or an OHLCStore, of
+        which only a window of bars around the viewport is loaded (see
+        ``_update_window``). Larger time frames are read from the frames
+        aggregated once by the store.
+        
         Args:
             root: The Tkinter root window
-            df: DataFrame containing financial data with columns Time, Open, High, Low, Close
+            df: DataFrame containing financial data with columns Time, Open, High, Low, Close.
+                The Time column is converted to ``datetime64[ns]`` if needed
+            store: OHLCStore to read the data from instead of ``df``
         """
         # Time frame settings
         self.time_frames = ["m1", "m5", "m15", "m30", "h1", "h2", "h4", "1d", "1W", "1M", "6M", "1Y", "4Y"]
         self.current_tf_index = 0
         self.label_tf_index = self.current_tf_index + 2
         
-        # Data and UI elements
-        self.df = df
+        # Data and UI elements: store holds the whole history (a DataFrame is
+        # wrapped, and then never windowed), frame_store the bars of the
+        # current time frame and df its rows [window[0], window[1])
+        self.windowed = store is not None
+        if store is None:
+            store = OHLCMemoryStore(with_datetime64_times(df))
+        self.store = store
+        self.frame_store = store
+        self.window = (max(0, len(store) - self.WINDOW_ROWS) if self.windowed else 0, len(store))
+        self.df = df = store.slice(*self.window)
+        self.indicator_cache = IndicatorCache()
+        self.statistics = StatisticsCache()
         self.root = root
+        self.scheduler = RedrawScheduler(root, self._redraw_layers)
+        
+        # Indicators drawn over the candles, and those drawn in their own pane
+        self.overlays: List[Tuple[Indicator, Dict[str, str]]] = []
+        self.panes: List[IndicatorPane] = []
+        self.volume_pane: Optional[VolumePane] = None
+        self.initialized = False
+        
+        # Replay state: number of base rows revealed, counted from the start
+        # of the history (None shows everything), rows of self.df available
+        # for drawing and the partly formed last bar
+        self.revealed = None
+        self.data_length = len(df)
+        self.partial_bar = None
+        
+        # Fit the price axis to the visible candles instead of the whole data
+        self.auto_scale = False
+        
+        # Timings of the hot paths, collected only while instrumented
+        self.profiler = Profiler()
+        self.instrumented = False
         
         # Configure root window layout
         self._configure_layout()
         self._create_ui_components()
+        if "Volume" in df.columns:
+            self.volume_pane = VolumePane(self.root)
+            self._layout_panes()
         
         # Initialize state variables
         self.drag_state = {
@@ -38,12 +118,18 @@ class DragZoomApp:
             'last_y': None
         }
         
-        # Initialize zoom settings
+        # Initialize zoom settings (the zoom itself is held by self.viewport)
         self.zoom_settings = {
-            'scale_factor': [1.0, 1.0],
-            'scale_label': [1.0, 1.0],
+            # Horizontal zoom at which the time label unit last changed
+            'scale_label': 1.0,
             'min_scale': [0.2, 0.5],
-            'max_scale': [4.0, 4.0]
+            'max_scale': [4.0, 4.0],
+            # Horizontal zoom-out limit once no larger time frame fills the
+            # canvas, where the candles end up merged per pixel column (see
+            # lod_threshold)
+            'min_scale_lod': 0.01,
+            # Horizontal zoom levels at which the next/previous time frame is used
+            'tf_switch': [0.5, 4.0]
         }
         
         # Schedule initialization after UI is fully rendered
@@ -70,19 +156,35 @@ class DragZoomApp:
         self.canvas_date.grid(row=1, column=0, sticky="ew")
         self.button_panel.grid(row=1, column=1)
     
+    def _create_item_pools(self) -> None:
+        """Create the reusable canvas item pools for every chart layer."""
+        self.item_pools = {
+            'candle_wicks': CanvasItemPool(self.canvas, "line", ("candlesticks",)),
+            'candle_bodies': CanvasItemPool(self.canvas, "rectangle", ("candlesticks",)),
+            'grid_h': CanvasItemPool(self.canvas, "line", ("grid",), fill="#EEEEEE", dash=(2, 4)),
+            'grid_v': CanvasItemPool(self.canvas, "line", ("grid",), fill="#EEEEEE", dash=(2, 4)),
+            'overlays': CanvasItemPool(self.canvas, "line", ("overlays",), width=1.5),
+            'time_labels': CanvasItemPool(
+                self.canvas_date, "text", ("time_labels",),
+                fill="black", anchor="n", font=("Arial", 10)
+            ),
+            'price_labels': CanvasItemPool(
+                self.canvas_price, "text", ("price_labels",),
+                fill="black", anchor="w", font=("Arial", 10)
+            ),
+        }
+    
     def initialize_chart(self) -> None:
         """Initialize the chart after the UI is fully rendered."""
         self._calculate_chart_parameters()
+        self._create_item_pools()
         self._setup_event_bindings()
+        self._draw_auto_scale_button()
+        self.initialized = True
         self.draw_chart()
     
     def _calculate_chart_parameters(self) -> None:
         """Calculate chart parameters based on data and canvas dimensions."""
-        # Price range parameters
-        self.price_min = self.df['Low'].min()
-        self.price_max = self.df['High'].max()
-        self.price_range = self.price_max - self.price_min
-        
         # Canvas dimensions
         self.canvas_height = self.canvas.winfo_height()
         self.canvas_width = self.canvas.winfo_width()
@@ -90,24 +192,181 @@ class DragZoomApp:
         # Chart drawing parameters
         self.height_ratio = 0.9  # Percentage of canvas height used for chart
         self.height_price = self.canvas_height * self.height_ratio
-        self.price_height_ratio = self.price_range / self.height_price
         self.margin = 50
         
         # Candlestick parameters
         self.candle_width = 10
         self.candle_space_between = 15
         
-        # Calculate initial positions
-        self.x_center = self.canvas_width - self.margin
-        self.x_first = self.x_center
+        # Below this spacing (in pixels) candles are merged per pixel column
+        self.lod_threshold = 2.0
         
-        # Store parameters used for drawing
-        self.graph_params = {
-            'price_min': self.price_min,
-            'price_height_ratio': self.price_height_ratio,
-            'height_ratio': self.height_ratio,
-            'canvas_height': self.canvas_height
-        }
+        # Pixel mapping shared by every drawing function, newest bar at the right margin
+        self.viewport = Viewport(
+            self.canvas_width, self.canvas_height, self.candle_space_between, self.canvas_width - self.margin
+        )
+        # Rows drawn by the last redraw of the candles
+        self.drawn_range = (0, 0)
+        
+        # Price range parameters
+        statistics = self._chart_statistics()
+        self._set_price_range(statistics.price_min, statistics.price_max)
+    
+    def _set_price_range(self, price_min: float, price_max: float) -> None:
+        """
+        Set the prices mapped to the chart area and the drawing parameters.
+        
+        Args:
+            price_min: Price drawn at the bottom of the chart area
+            price_max: Price drawn at the top of the chart area
+        """
+        self.price_min = price_min
+        self.price_max = price_max
+        self.price_range = self.price_max - self.price_min
+        self.price_height_ratio = self.price_range / self.height_price
+        self.viewport.set_price_range(self.price_min, self.price_height_ratio, self.height_ratio)
+    
+    def _fit_price_range(self) -> bool:
+        """
+        Fit the price range to the visible candles when auto-scale is on.
+        
+        The lowest Low and highest High of the visible rows come from sparse
+        tables built once per time frame, so each fit costs a couple of
+        lookups whatever the number of visible bars. The vertical zoom still
+        applies on top of the fitted range (zooming in crops the extremes),
+        and the vertical pan is reset.
+        
+        Returns:
+            True if the price range changed
+        """
+        if not self.auto_scale:
+            return False
+        
+        visible_start, visible_end, _ = self._visible_range()
+        high_table, low_table = self._price_tables()
+        end = visible_end
+        if self.partial_bar is not None and visible_end == self.data_length:
+            end -= 1
+        
+        highs = [high_table.query(visible_start, end)]
+        lows = [low_table.query(visible_start, end)]
+        if end < visible_end:
+            highs.append(self.partial_bar[1])
+            lows.append(self.partial_bar[2])
+        highs = [value for value in highs if value is not None]
+        lows = [value for value in lows if value is not None]
+        if not highs:
+            return False
+        
+        low, high = float(min(lows)), float(max(highs))
+        if high <= low:
+            low, high = low - 1, high + 1
+        
+        # At zoom 1 the candles fill the chart; the price transform applies
+        # the vertical zoom around the middle of the fitted range
+        if low == self.price_min and high == self.price_max and not self.viewport.y_offset:
+            return False
+        self.viewport.y_offset = 0.0
+        self._set_price_range(low, high)
+        return True
+    
+    def _price_tables(self) -> Tuple[SparseTable, SparseTable]:
+        """
+        Get the range-max table of High and range-min table of Low.
+        
+        Built on first use and rebuilt only when ``self.df`` is replaced.
+        """
+        if getattr(self, '_price_tables_source', None) is not self.df:
+            self._price_tables_source = self.df
+            self._price_tables_cache = (
+                SparseTable(self.df["High"].to_numpy(), np.maximum),
+                SparseTable(self.df["Low"].to_numpy(), np.minimum)
+            )
+        return self._price_tables_cache
+    
+    def toggle_auto_scale(self, event: Optional[tk.Event] = None) -> None:
+        """Switch the auto-scale mode of the price axis on or off."""
+        self.auto_scale = not self.auto_scale
+        if not self.auto_scale:
+            # Back to the range of the whole data
+            statistics = self._chart_statistics()
+            self._set_price_range(statistics.price_min, statistics.price_max)
+        self._draw_auto_scale_button()
+        self.request_redraw()
+    
+    def _draw_auto_scale_button(self) -> None:
+        """Show the state of the auto-scale mode in the button panel."""
+        color = "#2962FF" if self.auto_scale else "#9E9E9E"
+        if not self.button_panel.find_withtag("auto_scale"):
+            self.button_panel.create_text(
+                50, 15, text="Auto", font=("Arial", 10, "bold"), tags=("auto_scale",)
+            )
+            self.button_panel.tag_bind("auto_scale", "<ButtonPress-1>", self.toggle_auto_scale)
+        self.button_panel.itemconfig("auto_scale", fill=color)
+
+    def set_instrumentation(self, enabled: bool) -> None:
+        """
+        Turn the timing of the hot paths and the frame time HUD on or off.
+    
+        While on, the methods of ``INSTRUMENTED`` and ``FRAMES`` are replaced
+        on the instance by timed versions recorded in ``self.profiler``. While
+        off, the class methods are called directly, so the instrumentation
+        costs nothing.
+    
+        Args:
+            enabled: True to collect timings and show the HUD
+        """
+        if enabled == self.instrumented:
+            return
+        self.instrumented = enabled
+    
+        names = list(self.INSTRUMENTED) + list(self.FRAMES)
+        for name in names:
+            if enabled:
+                method = getattr(self, name)
+                pools = self.INSTRUMENTED.get(name)
+                items = partial(self._count_items, name, pools) if pools is not None else None
+                if name in self.FRAMES:
+                    timed = self.profiler.wrap(name, method, items, frame=True, on_done=self._draw_hud)
+                else:
+                    timed = self.profiler.wrap(name, method, items)
+                setattr(self, name, timed)
+            else:
+                self.__dict__.pop(name, None)
+    
+        # Callbacks registered earlier still point to the previous methods
+        self.scheduler.redraw = self._redraw_layers
+        if self.initialized:
+            self._setup_event_bindings()
+        self._draw_hud()
+    
+    def toggle_instrumentation(self, event: Optional[tk.Event] = None) -> None:
+        """Switch the instrumentation on or off."""
+        self.set_instrumentation(not self.instrumented)
+    
+    def _count_items(self, name: str, pools: Tuple[str, ...]) -> int:
+        """Count the items shown by a drawing method after it ran."""
+        count = sum(self.item_pools[pool].active for pool in pools)
+        if name == "draw_volume" and self.volume_pane is not None:
+            count += self.volume_pane.bars.active
+        elif name == "draw_indicators":
+            count += sum(pane.lines.active for pane in self.panes)
+        return count
+    
+    def _draw_hud(self) -> None:
+        """Show the recent frame time and FPS in the button panel while instrumented."""
+        if not self.instrumented:
+            self.button_panel.delete("hud")
+            self.button_panel.coords("auto_scale", 50, 15)
+            return
+    
+        if not self.button_panel.find_withtag("hud"):
+            self.button_panel.create_text(72, 15, font=("Arial", 8), fill="#616161", tags=("hud",))
+        self.button_panel.coords("auto_scale", 25, 15)
+    
+        frame_time = self.profiler.frame_time
+        text = "-- ms" if frame_time is None else f"{frame_time * 1000:.1f} ms"
+        self.button_panel.itemconfig("hud", text=f"{text}\n{self.profiler.fps:.0f} fps")
     
     def _setup_event_bindings(self) -> None:
         """Set up mouse event bindings for interaction."""
@@ -128,112 +387,625 @@ class DragZoomApp:
         
         # Mouse wheel for zooming
         self.canvas.bind("<MouseWheel>", self.mouse_wheel_zoom)
+        
+        # F3 shows the frame time HUD and collects timings
+        self.root.winfo_toplevel().bind("<F3>", self.toggle_instrumentation)
     
     def draw_chart(self) -> None:
         """Draw all chart components."""
+        self.scheduler.discard()
+        self._update_window()
+        self._fit_price_range()
         self.draw_candlesticks()
+        self.draw_volume()
+        self.draw_indicators()
         self.draw_time_labels()
         self.draw_price_labels()
         self.draw_grid()
     
+    def request_redraw(self, *layers: str) -> None:
+        """
+        Schedule a redraw of some layers for the next display frame.
+        
+        Requests made before the frame is drawn are merged, so event handlers
+        can call this on every event.
+        
+        Args:
+            *layers: Names from ``LAYERS`` (default: every layer)
+        """
+        if self.initialized:
+            self.scheduler.invalidate(*(layers or self.LAYERS))
+    
+    def _redraw_layers(self, layers: Set[str]) -> None:
+        """
+        Redraw the given layers, in drawing order.
+        
+        Args:
+            layers: Names of the dirty layers
+        """
+        # A new window of rows or a refit of the price axis moves every layer
+        if "candles" in layers:
+            moved = self._update_window()
+            if self._fit_price_range() or moved:
+                layers = set(self.LAYERS)
+        
+        drawers = {
+            "candles": self.draw_candlesticks,
+            "volume": self.draw_volume,
+            "indicators": self.draw_indicators,
+            "time_labels": self.draw_time_labels,
+            "price_labels": self.draw_price_labels,
+            "grid": self.draw_grid,
+        }
+        for layer in self.LAYERS:
+            if layer in layers:
+                drawers[layer]()
+    
     def draw_candlesticks(self) -> None:
         """
         Draw candlestick chart on the main canvas.
         Only renders visible candlesticks for performance.
         """
-        self.canvas.delete("candlesticks")
-        
         # Calculate visible range
-        visible_width = self.canvas_width / self.zoom_settings['scale_factor'][0]
-        visible_count = int(visible_width / self.candle_space_between) + 2
-        visible_start = max(0, len(self.df) - int((self.x_first - self.x_center) / self.candle_space_between))
-        visible_end = min(len(self.df), visible_start + visible_count)
-        
-        # Get only visible data
-        visible_data = self.df.iloc[visible_start:visible_end].iloc[::-1]
-        x_pos = self.x_center
-        
-        for idx, (_, row) in enumerate(visible_data.iterrows()):
-            # Determine candle color
-            color = "green" if row["Close"] >= row["Open"] else "red"
-            
-            # Calculate y-coordinates
-            high_y = self._calculate_y_position(row["High"])
-            low_y = self._calculate_y_position(row["Low"])
-            open_y = self._calculate_y_position(row["Open"])
-            close_y = self._calculate_y_position(row["Close"])
+        visible_start, visible_end, x_start = self._visible_range()
+        step = self.viewport.step
+        transform = self.viewport.price_transform()
+        
+        if step < self.lod_threshold:
+            # Sub-pixel candles: draw one high/low envelope per column
+            newest = None
+            if self.partial_bar is not None and visible_end == self.data_length:
+                newest = self.partial_bar[:4]
+            geometry = compute_lod_geometry(
+                self.df["Open"].to_numpy(),
+                self.df["Close"].to_numpy(),
+                self._lod_pyramid(),
+                visible_start,
+                visible_end,
+                x_start,
+                step,
+                self.candle_width / self.candle_space_between,
+                transform,
+                newest
+            )
+        else:
+            # Convert the whole visible slice to pixel coordinates at once
+            geometry = compute_candle_geometry(
+                *self._visible_ohlc(visible_start, visible_end),
+                x_start,
+                step,
+                self.candle_width * self.viewport.scale_x,
+                transform
+            )
+        
+        # Reposition the pooled items instead of recreating them
+        colors = np.where(geometry.up, "green", "red").tolist()
+        self.item_pools['candle_wicks'].draw(
+            geometry.wicks.tolist(),
+            [{'fill': color} for color in colors]
+        )
+        self.item_pools['candle_bodies'].draw(
+            geometry.bodies.tolist(),
+            [{'fill': color, 'outline': color} for color in colors]
+        )
+        self.drawn_range = (visible_start, visible_end)
+    
+    def add_indicator(self, indicator: Indicator, colors: Optional[Dict[str, str]] = None) -> None:
+        """
+        Show an indicator, over the candles or in a pane below them.
+        
+        Args:
+            indicator: Indicator to show; ``indicator.overlay`` decides where
+            colors: Optional color of each line, picked from ``LINE_COLORS`` otherwise
+        """
+        used = len(self.overlays) + len(self.panes)
+        line_colors = {
+            name: LINE_COLORS[(used + i) % len(LINE_COLORS)] for i, name in enumerate(indicator.lines)
+        }
+        line_colors.update(colors or {})
+        
+        if indicator.overlay:
+            self.overlays.append((indicator, line_colors))
+        else:
+            self.panes.append(IndicatorPane(self.root, indicator, line_colors))
+            self._layout_panes()
+        
+        self.request_redraw("indicators")
+    
+    def remove_indicator(self, indicator: Indicator) -> None:
+        """
+        Stop showing an indicator.
+        
+        Args:
+            indicator: Indicator to remove (matched by its key)
+        """
+        self.overlays = [entry for entry in self.overlays if entry[0].key != indicator.key]
+        for pane in [pane for pane in self.panes if pane.indicator.key == indicator.key]:
+            pane.destroy()
+            self.panes.remove(pane)
+        self._layout_panes()
+        
+        self.request_redraw("indicators")
+    
+    def _all_panes(self) -> List[Union[VolumePane, IndicatorPane]]:
+        """Get the panes below the chart, from top to bottom."""
+        return ([self.volume_pane] if self.volume_pane is not None else []) + self.panes
+    
+    def _layout_panes(self) -> None:
+        """Stack the volume and indicator panes between the chart and the time labels."""
+        panes = self._all_panes()
+        for row, pane in enumerate(panes, start=1):
+            pane.place(row)
+            self.root.rowconfigure(row, weight=0, minsize=pane.height)
+        
+        date_row = len(panes) + 1
+        self.canvas_date.grid(row=date_row, column=0, sticky="ew")
+        self.button_panel.grid(row=date_row, column=1)
+        self.root.rowconfigure(date_row, weight=0, minsize=30)
+        # Release the row left free by a removed pane
+        self.root.rowconfigure(date_row + 1, weight=0, minsize=0)
+    
+    def draw_indicators(self) -> None:
+        """
+        Draw the overlays and the panes for the visible rows.
+        
+        Each line is one polyline item moved with a single ``coords`` call,
+        whatever the number of visible bars.
+        """
+        visible_start, visible_end, x_start = self._visible_range()
+        step = self.viewport.step
+        transform = self.viewport.price_transform()
+        
+        coords = []
+        styles = []
+        for indicator, colors in self.overlays:
+            values = self.indicator_values(indicator)
+            for name in indicator.lines:
+                points = compute_polyline(values[name], visible_start, visible_end, x_start, step, transform)
+                if len(points) >= 4:
+                    coords.append(points.tolist())
+                    styles.append({'fill': colors[name]})
+        self.item_pools['overlays'].draw(coords, styles)
+        
+        for pane in self.panes:
+            pane.draw(self.indicator_values(pane.indicator), visible_start, visible_end, x_start, step)
+    
+    def draw_volume(self) -> None:
+        """
+        Draw the volume pane for the visible rows.
+        
+        When bars are narrower than a pixel, the rows are merged in blocks
+        drawn with their highest volume.
+        """
+        if self.volume_pane is None:
+            return
+        
+        visible_start, visible_end, x_start = self._visible_range()
+        step = self.viewport.step
+        opens, _, _, closes = self._visible_ohlc(visible_start, visible_end)
+        volumes = self.df["Volume"].to_numpy()[visible_start:visible_end].astype(np.float64)
+        
+        # Scale on the highest volume in view, partial bar included
+        max_volume = self._volume_table().query(visible_start, visible_end)
+        if self.partial_bar is not None and visible_end == self.data_length and visible_end > visible_start:
+            volumes[-1] = self.partial_bar[4]
+            max_volume = self._volume_table().query(visible_start, visible_end - 1)
+            max_volume = volumes[-1] if max_volume is None else max(max_volume, volumes[-1])
+        
+        block = max(1, int(np.ceil(1 / step)))
+        if block > 1 and len(volumes):
+            # Blocks counted back from the newest row so that it ends a block
+            starts = np.arange(len(volumes) - block, -block, -block)[::-1].clip(0)
+            volumes = np.maximum.reduceat(volumes, starts)
+            opens = opens[starts]
+            closes = closes[np.concatenate((starts[1:], [len(closes)])) - 1]
+        
+        self.volume_pane.draw(
+            volumes,
+            closes >= opens,
+            max_volume,
+            x_start,
+            step * block,
+            max(1.0, self.candle_width * self.viewport.scale_x * block)
+        )
+    
+    def _volume_table(self) -> SparseTable:
+        """
+        Get the range-max table of the current Volume column.
+        
+        Built on first use and rebuilt only when ``self.df`` is replaced.
+        """
+        if getattr(self, '_volume_table_source', None) is not self.df:
+            self._volume_table_source = self.df
+            self._volume_table_cache = SparseTable(self.df["Volume"].to_numpy())
+        return self._volume_table_cache
+    
+    def _visible_ohlc(self, start: int, end: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get the Open, High, Low and Close arrays of rows ``[start, end)``.
+        
+        During a replay the last bar of a larger time frame may only be
+        partly revealed; its values are then replaced by the aggregate of the
+        revealed base rows.
+        
+        Args:
+            start: First row
+            end: Row after the last row
             
-            # Draw candlestick wick
-            self.canvas.create_line(
-                x_pos, high_y, x_pos, low_y, 
-                fill=color, 
-                tags=("candlesticks", f"candle-{idx}")
+        Returns:
+            Tuple of (opens, highs, lows, closes)
+        """
+        rows = self.df.iloc[start:end]
+        columns = [rows[name].to_numpy() for name in ("Open", "High", "Low", "Close")]
+        
+        if self.partial_bar is not None and end == self.data_length and end > start:
+            columns = [column.copy() for column in columns]
+            for column, value in zip(columns, self.partial_bar):
+                column[-1] = value
+        
+        return tuple(columns)
+    
+    def _lod_pyramid(self) -> MinMaxPyramid:
+        """
+        Get the min/max pyramid of the current data.
+        
+        The pyramid is built the first time level-of-detail rendering is
+        needed and rebuilt only when ``self.df`` is replaced.
+        
+        Returns:
+            MinMaxPyramid over the High and Low columns of ``self.df``
+        """
+        if getattr(self, '_lod_pyramid_source', None) is not self.df:
+            self._lod_pyramid_source = self.df
+            self._lod_pyramid_cache = MinMaxPyramid(
+                self.df["High"].to_numpy(),
+                self.df["Low"].to_numpy()
             )
+        return self._lod_pyramid_cache
+    
+    def _visible_range(self) -> Tuple[int, int, float]:
+        """
+        Compute the slice of rows that falls inside the canvas.
+        
+        Returns:
+            Tuple of (start, end, x_start) where ``df.iloc[start:end]`` are the
+            visible rows and ``x_start`` is the x-coordinate of row ``end - 1``
+        """
+        return self.viewport.visible_range(self.data_length)
+    
+    @property
+    def history_length(self) -> int:
+        """Number of base rows in the whole history, loaded or not."""
+        return len(self.store)
+    
+    def _frame_store(self, tf_index: int) -> OHLCStore:
+        """Get the store of the bars of a time frame (the base store for the first one)."""
+        if tf_index == 0:
+            return self.store
+        return self.store.aggregate(self.time_frames[tf_index], self.time_frames[1:tf_index])
+    
+    def _time_frame_ratio(self, from_index: int, to_index: int) -> float:
+        """Get the nominal number of ``from_index`` bars in one ``to_index`` bar."""
+        return (time_frame_minutes(self.time_frames[to_index])
+                / time_frame_minutes(self.time_frames[from_index]))
+    
+    def _revealed_bar(self) -> int:
+        """Get the row of ``self.frame_store`` holding the last revealed base row."""
+        if self.frame_store is self.store:
+            return self.revealed - 1
+        last_time = self.store.columns["Time"][self.revealed - 1]
+        return int(np.searchsorted(self.frame_store.columns["Time"], last_time, side="right")) - 1
+    
+    def _bar_count(self) -> int:
+        """Get the number of bars of the current time frame that can be drawn."""
+        if self.revealed is None:
+            return len(self.frame_store)
+        return self._revealed_bar() + 1
+    
+    def _window_rows(self) -> int:
+        """Get the number of bars of the current time frame to load."""
+        if not self.windowed:
+            return len(self.frame_store)
+        if not self.initialized:
+            return self.WINDOW_ROWS
+        screen_bars = self.canvas_width / self.viewport.step
+        return int(max(self.WINDOW_ROWS, self.WINDOW_SCREENS * screen_bars))
+    
+    def _window_bounds(self, row: int) -> Tuple[int, int]:
+        """
+        Choose the bars of the current time frame to load around a bar.
+        
+        During a replay the window always reaches the last revealed bar.
+        
+        Args:
+            row: Row of ``self.frame_store`` to put in the middle of the window
+            
+        Returns:
+            Tuple of (first, end) rows, ``end`` being exclusive
+        """
+        length = self._bar_count()
+        rows = self._window_rows()
+        row = min(row, length - 1)
+        
+        first = max(0, min(row - rows // 2, length - rows))
+        end = min(len(self.frame_store), first + rows)
+        if self.revealed is not None:
+            end = max(end, length)
+        return first, end
+    
+    def _slice_window(self, first: int, end: int) -> None:
+        """
+        Load rows ``[first, end)`` of the current time frame's store.
+        
+        The indicator values of a windowed store are dropped with the
+        previous window; the other caches follow ``self.df``.
+        
+        Args:
+            first: First row
+            end: Row after the last row
+        """
+        self.window = (first, end)
+        self.df = self.frame_store.slice(first, end)
+        if self.windowed:
+            self.indicator_cache.clear()
+        self._update_data_length()
+    
+    def _near_window_edge(self) -> bool:
+        """True if the viewport gets within a screen of a side of the window where the store has more bars."""
+        if not self.windowed or not self.initialized:
+            return False
+        
+        first, end = self.window
+        visible_start, visible_end, _ = self._visible_range()
+        screen = int(self.canvas_width / self.viewport.step) + 1
+        return (
+            (first > 0 and visible_start < screen)
+            or (end < self._bar_count() and visible_end > self.data_length - screen)
+        )
+    
+    def _update_window(self) -> bool:
+        """
+        Load another window of bars when the viewport nears an edge of the loaded one.
+        
+        The new window is centered on the newest visible bar (or the loaded
+        bar closest to it), which stays at the same position on screen. A
+        viewport far from the loaded bars, e.g. after a seek, is reached by
+        loading windows one after the other.
+        
+        Returns:
+            True if another window was loaded
+        """
+        moved = False
+        
+        while self._near_window_edge():
+            _, visible_end, _ = self._visible_range()
+            anchor_row = min(max(visible_end, 1), self.data_length) - 1
+            x_anchor = self.viewport.x_newest - (self.data_length - 1 - anchor_row) * self.viewport.step
+            
+            row = self.window[0] + anchor_row
+            bounds = self._window_bounds(row)
+            if bounds == self.window:
+                break
+            self._slice_window(*bounds)
+            moved = True
             
-            # Draw candlestick body
-            self.canvas.create_rectangle(
-                x_pos - self.candle_width / 2, open_y, 
-                x_pos + self.candle_width / 2, close_y, 
-                fill=color, outline=color, 
-                tags=("candlesticks", f"candle-{idx}")
+            new_row = row - self.window[0]
+            self.viewport.anchor_newest(x_anchor + (self.data_length - 1 - new_row) * self.viewport.step)
+        
+        return moved
+    
+    def set_revealed(self, count: Optional[int]) -> None:
+        """
+        Limit the chart to the first rows of the history, for replays.
+        
+        Reading from a store, another window is loaded when the last
+        revealed bar falls outside the current one. Nothing is redrawn; call
+        ``draw_chart`` or use ``append_bars``.
+        
+        Args:
+            count: Number of base rows to show, or None to show all of them
+        """
+        if count is not None:
+            count = max(1, min(count, self.history_length))
+        self.revealed = count
+        
+        first, end = self.window
+        if count is not None and not first <= self._revealed_bar() < end:
+            self._slice_window(*self._window_bounds(self._revealed_bar()))
+        else:
+            self._update_data_length()
+    
+    def _update_data_length(self) -> None:
+        """Compute the drawable rows of ``self.df`` from the revealed base rows."""
+        self.partial_bar = None
+        first, end = self.window
+        
+        if self.revealed is None:
+            self.data_length = end - first
+            return
+        
+        last_row = self._revealed_bar()
+        self.data_length = last_row + 1 - first
+        if self.current_tf_index == 0:
+            return
+        
+        # Aggregate the revealed part of the last bar if it is not complete yet
+        frame_times = self.frame_store.columns["Time"]
+        if last_row + 1 < len(self.frame_store):
+            bar_end = self.store.search(frame_times[last_row + 1])
+        else:
+            bar_end = len(self.store)
+        if self.revealed < bar_end:
+            revealed_rows = self.store.slice(self.store.search(frame_times[last_row]), self.revealed)
+            self.partial_bar = (
+                revealed_rows["Open"].iat[0],
+                revealed_rows["High"].max(),
+                revealed_rows["Low"].min(),
+                revealed_rows["Close"].iat[-1],
+                revealed_rows["Volume"].sum() if "Volume" in revealed_rows.columns else 1.0
             )
+    
+    def indicator_values(self, indicator: Indicator) -> Dict[str, np.ndarray]:
+        """
+        Get the values of an indicator for the drawable rows of the current time frame.
+        
+        Values are cached per indicator, parameters and time frame, and
+        during a replay only the newly revealed bars are computed. The partly
+        formed last bar gets provisional values that are not cached.
+        
+        Args:
+            indicator: Indicator to evaluate
+        
+        Returns:
+            Dict mapping each line name to an array of ``self.data_length`` values
+        """
+        time_frame = self.time_frames[self.current_tf_index]
+        times = self.df["Time"].to_numpy()
+        
+        if self.partial_bar is None:
+            return self.indicator_cache.get(indicator, time_frame, self.df, self.data_length, times=times)
+        
+        last_row = self.data_length - 1
+        partial = Bar(times[last_row], *self.partial_bar)
+        return self.indicator_cache.get(indicator, time_frame, self.df, last_row, partial=partial, times=times)
+    
+    def append_bars(self, count: int = 1) -> None:
+        """
+        Reveal more base rows and update the chart incrementally.
+        
+        The newest bar stays anchored, so the drawn candles are scrolled left
+        with a single ``canvas.move`` and only the new candles (and the
+        previous newest one, which may have been completed) are positioned.
+        Candles that leave the viewport are recycled for the new ones. A full
+        redraw is only done when the number of visible candles changes.
+        
+        Args:
+            count: Number of base rows to reveal
+        """
+        if self.revealed is None:
+            return
+        
+        old_length = self.data_length
+        old_window = self.window
+        if self.initialized:
+            old_start, old_end, _ = self._visible_range()
+        self.set_revealed(self.revealed + count)
+        if not self.initialized:
+            return
+        
+        # A new window of rows or new extremes move every candle
+        if self.window != old_window or self._fit_price_range():
+            self.draw_chart()
+            return
+        
+        added = self.data_length - old_length
+        visible_start, visible_end, x_start = self._visible_range()
+        visible_count = visible_end - visible_start
+        step = self.viewport.step
+        wicks = self.item_pools['candle_wicks']
+        bodies = self.item_pools['candle_bodies']
+        
+        incremental = (
+            step >= self.lod_threshold
+            and visible_count == old_end - old_start
+            and added < visible_count
+            and wicks.active == visible_count
+        )
+        
+        if not incremental:
+            self.draw_candlesticks()
+        else:
+            # Scroll the existing candles and recycle those that left the view
+            if added:
+                self.canvas.move("candlesticks", -added * step, 0)
+                wicks.shift(added)
+                bodies.shift(added)
+            self.drawn_range = (visible_start, visible_end)
             
-            # Move to next position
-            x_pos -= self.candle_space_between
+            refresh = min(added + 1, visible_count)
+            geometry = compute_candle_geometry(
+                *self._visible_ohlc(visible_end - refresh, visible_end),
+                x_start,
+                step,
+                self.candle_width * self.viewport.scale_x,
+                self.viewport.price_transform()
+            )
+            colors = np.where(geometry.up, "green", "red").tolist()
+            for index, (wick, body, color) in enumerate(
+                zip(geometry.wicks.tolist(), geometry.bodies.tolist(), colors)
+            ):
+                wicks.place(index, wick, {'fill': color})
+                bodies.place(index, body, {'fill': color, 'outline': color})
+        
+        self.draw_volume()
+        self.draw_indicators()
+        self.draw_time_labels()
+        self.draw_grid()
     
     def draw_time_labels(self) -> None:
         """
         Draw time labels on the date canvas.
         Adjusts density and format based on the current time frame and zoom level.
         """
-        self.canvas_date.delete("all")
-        
         # Get current time frame parameters
         current_tf = self.time_frames[self.label_tf_index]
-        units, interval = self._parse_time_frame(current_tf)
+        units, interval = parse_time_frame(current_tf)
         
         # Calculate label spacing based on zoom
         label_density = self._calculate_label_density()
         
-        # Starting position
-        x_pos = self.canvas_width + (self.x_first - self.canvas_width) * self.zoom_settings['scale_factor'][0]
+        # Only walk the rows inside the viewport
+        visible_start, visible_end, x_start = self._visible_range()
+        step = self.viewport.step
+        rows, labels = self._time_label_index().visible(units, interval, visible_start, visible_end)
+        
+        # Skip some labels based on density, counted in time units so that
+        # the same labels stay when bars are revealed
+        times = self.df["Time"].to_numpy()[rows]
+        kept = label_ordinals(times, units, interval) % label_density == 0
+        rows, labels = rows[kept], labels[kept]
+        
         drawn_positions = set()
+        label_coords = []
+        label_styles = []
         
-        # Draw time labels
-        for idx, (_, row) in enumerate(self.df.iloc[::-1].iterrows()):
-            time_value = row["Time"]
+        # Collect time labels, newest first
+        for row, time_label in zip(rows[::-1].tolist(), labels[::-1].tolist()):
+            x_pos = x_start - (visible_end - 1 - row) * step
             
-            # Skip some labels based on density
-            if idx % label_density != 0:
-                x_pos -= self.candle_space_between * self.zoom_settings['scale_factor'][0]
+            # Only draw if within canvas boundaries
+            if not 0 <= x_pos <= self.canvas_width:
                 continue
             
             # Prevent label overlap
             rounded_pos = round(x_pos / 10) * 10
             if rounded_pos in drawn_positions and abs(x_pos - rounded_pos) < 30:
-                x_pos -= self.candle_space_between * self.zoom_settings['scale_factor'][0]
                 continue
             
-            # Check if this time point should have a label
-            if self._should_draw_time_label(time_value, units, interval):
-                time_label = self._format_time_label(time_value, units)
-                
-                # Only draw if within canvas boundaries
-                if 0 <= x_pos <= self.canvas_width:
-                    self.canvas_date.create_text(
-                        x_pos, 15, 
-                        text=time_label, 
-                        fill="black", 
-                        anchor="n", 
-                        font=("Arial", 10)
-                    )
-                    drawn_positions.add(rounded_pos)
-            
-            x_pos -= self.candle_space_between * self.zoom_settings['scale_factor'][0]
+            label_coords.append((x_pos, 15))
+            label_styles.append({'text': time_label})
+            drawn_positions.add(rounded_pos)
+        
+        self.item_pools['time_labels'].draw(label_coords, label_styles)
+    
+    def _time_label_index(self) -> TimeLabelIndex:
+        """
+        Get the time label index of the current data.
+        
+        The index is built once per dataframe and rebuilt only when
+        ``self.df`` is replaced.
+        
+        Returns:
+            TimeLabelIndex over the Time column of ``self.df``
+        """
+        if getattr(self, '_label_index_source', None) is not self.df:
+            self._label_index_source = self.df
+            self._label_index = TimeLabelIndex(self.df["Time"])
+        return self._label_index
     
     def _calculate_label_density(self) -> int:
         """Calculate the density of time labels based on current zoom level."""
-        zoom = self.zoom_settings['scale_factor'][0]
+        zoom = self.viewport.scale_x
         if zoom < 0.5:
             return 5  # Show fewer labels when zoomed out
         elif zoom > 2.0:
@@ -241,219 +1013,74 @@ class DragZoomApp:
         else:
             return 3  # Default density
     
-    def _parse_time_frame(self, time_frame: str) -> Tuple[str, int]:
-        """
-        Parse a time frame string into units and interval.
-        
-        Args:
-            time_frame: Time frame string (e.g., "m5", "h1", "1d")
-            
-        Returns:
-            Tuple of (unit, interval)
-        """
-        for unit in ["m", "h", "d", "W", "M", "Y"]:
-            if unit in time_frame:
-                try:
-                    interval = int(time_frame.replace(unit, ""))
-                    return unit, interval
-                except ValueError:
-                    # Handle special cases like "1d", "1W"
-                    if time_frame.startswith("1") and unit in ["d", "W", "M", "Y"]:
-                        return unit, 1
-                    elif time_frame.startswith("6M"):
-                        return "M", 6
-                    else:
-                        return "m", 1  # Default to minutes
-        return "m", 1  # Default
-    
-    def _should_draw_time_label(self, time_value: Union[datetime, time], units: str, interval: int) -> bool:
-        """
-        Determine if a time label should be drawn based on time frame and interval.
-        
-        Args:
-            time_value: The time value to check
-            units: Time unit (m, h, d, W, M, Y)
-            interval: Interval value
-            
-        Returns:
-            True if label should be drawn, False otherwise
-        """
-        if not isinstance(time_value, (datetime, time)):
-            return False
-            
-        if isinstance(time_value, datetime):
-            if units == "m":
-                return time_value.minute % interval == 0
-            elif units == "h":
-                return time_value.hour % interval == 0 and time_value.minute == 0
-            elif units == "d":
-                return time_value.day % interval == 0
-            elif units == "W":
-                return time_value.weekday() == 0  # Monday
-            elif units == "M":
-                return time_value.day == 1  # First day of month
-            elif units == "Y":
-                return time_value.month == 1 and time_value.day == 1  # First day of year
-        else:  # time object
-            if units == "m":
-                return time_value.minute % interval == 0
-            elif units == "h":
-                return time_value.hour % interval == 0 and time_value.minute == 0
-        
-        return False
-    
-    def _format_time_label(self, time_value: Union[datetime, time], units: str) -> str:
-        """
-        Format time value based on time frame.
-        
-        Args:
-            time_value: The time value to format
-            units: Time unit (m, h, d, W, M, Y)
-            
-        Returns:
-            Formatted time string
-        """
-        if not isinstance(time_value, (datetime, time)):
-            return ""
-            
-        if isinstance(time_value, datetime):
-            if units in ["m", "h"]:
-                return time_value.strftime("%H:%M")
-            elif units == "d":
-                return time_value.strftime("%d-%m")
-            elif units == "W":
-                return time_value.strftime("%d-%m")
-            elif units == "M":
-                return time_value.strftime("%b %Y")
-            else:  # Year
-                return time_value.strftime("%Y")
-        else:  # time object
-            return time_value.strftime("%H:%M")
-    
     def draw_price_labels(self) -> None:
         """
         Draw price labels on the price canvas.
         Adjusts spacing and precision based on price range and zoom level.
         """
-        self.canvas_price.delete("all")
-        
-        # Determine appropriate price increment based on data range
-        price_increment = self._calculate_price_increment()
+        ticks, step = self._price_ticks()
+        decimals = step_decimals(step)
         
-        # Calculate center price and adjust for zoom
-        center_price = (self.price_min + self.price_range / 2)
-        price_increment = price_increment / self.zoom_settings['scale_label'][1]
-        
-        # Number of price levels to display
-        levels = 7
-        
-        # Draw price labels
-        for i in range(-levels, levels + 1):
-            price = center_price + i * price_increment
-            if self.price_min <= price <= self.price_max:
-                y_pos = self._calculate_y_position(price)
-                
-                # Format price with appropriate precision
-                price_text = f"{price:.2f}" if price < 1000 else f"{price:.0f}"
-                
-                self.canvas_price.create_text(
-                    15, y_pos, 
-                    text=price_text, 
-                    fill="black", 
-                    anchor="w", 
-                    font=("Arial", 10)
-                )
-    
-    def _calculate_price_increment(self) -> float:
-        """Calculate appropriate price increment based on data range."""
-        # Get average price movement
-        avg_movement = (self.df['High'] - self.df['Low']).mean()
-        
-        # Scale factor to normalize
-        scale = 1
-        while avg_movement < 10:
-            scale *= 10
-            avg_movement *= 10
-        
-        # Round to appropriate increment
-        if avg_movement <= 50:
-            increment = 50
-        else:
-            increment = 100
-            
-        return increment / scale
+        self.item_pools['price_labels'].draw(
+            [(15, y_pos) for y_pos in self._price_to_y(ticks).tolist()],
+            [{'text': f"{price:.{decimals}f}"} for price in ticks.tolist()]
+        )
     
-    def draw_grid(self) -> None:
-        """Draw grid lines on the main canvas for better readability."""
-        self.canvas.delete("grid")
-        
-        # Draw horizontal grid lines at price label positions
-        price_increment = self._calculate_price_increment() / self.zoom_settings['scale_label'][1]
-        center_price = (self.price_min + self.price_range / 2)
-        levels = 7
-        
-        for i in range(-levels, levels + 1):
-            price = center_price + i * price_increment
-            if self.price_min <= price <= self.price_max:
-                y_pos = self._calculate_y_position(price)
-                
-                self.canvas.create_line(
-                    0, y_pos, self.canvas_width, y_pos,
-                    fill="#EEEEEE", 
-                    dash=(2, 4),
-                    tags="grid"
-                )
-        
-        # Draw vertical grid lines at significant time points
-        x_pos = self.x_center
-        current_tf = self.time_frames[self.label_tf_index]
-        units, interval = self._parse_time_frame(current_tf)
+    def _chart_statistics(self) -> ChartStatistics:
+        """
+        Get the statistics of the current time frame's data.
         
-        for _, row in self.df.iloc[::-1].iterrows():
-            time_value = row["Time"]
-            
-            if self._should_draw_time_label(time_value, units, interval):
-                self.canvas.create_line(
-                    x_pos, 0, x_pos, self.canvas_height,
-                    fill="#EEEEEE", 
-                    dash=(2, 4),
-                    tags="grid"
-                )
-                
-            x_pos -= self.candle_space_between * self.zoom_settings['scale_factor'][0]
+        Computed once per time frame and recomputed only when the data changes.
+        """
+        return self.statistics.get(self.time_frames[self.current_tf_index], self.df)
     
-    def _calculate_y_position(self, price: float) -> float:
+    def _price_ticks(self) -> Tuple[np.ndarray, float]:
         """
-        Convert a price value to y-coordinate on the canvas.
+        Pick the prices to label on the visible part of the price axis.
+        
+        Ticks are round numbers ("nice numbers") about 50 pixels apart and
+        never closer than the tick size of the data. Everything is derived
+        from the price transform and the cached statistics, so no column is
+        scanned.
         
-        Args:
-            price: Price value to convert
-            
         Returns:
-            Y-coordinate position
+            Tuple of (tick prices, step between ticks)
         """
-        # Extract parameters
-        price_min = self.graph_params['price_min']
-        price_height_ratio = self.graph_params['price_height_ratio']
-        height_ratio = self.graph_params['height_ratio']
-        canvas_height = self.graph_params['canvas_height']
+        low, high = sorted((self.viewport.y_to_price(0), self.viewport.y_to_price(self.canvas_height)))
+        return nice_ticks(
+            low,
+            high,
+            target=max(2, int(self.canvas_height // 50)),
+            minimum_step=self._chart_statistics().tick_size
+        )
+    
+    def _price_to_y(self, prices: np.ndarray) -> np.ndarray:
+        """Convert an array of prices to y-coordinates on the canvas."""
+        return self.viewport.price_to_y(prices)
+    
+    def draw_grid(self) -> None:
+        """Draw grid lines on the main canvas for better readability."""
+        # Horizontal grid lines at price label positions
+        ticks, _ = self._price_ticks()
+        horizontal_lines = [(0, y_pos, self.canvas_width, y_pos) for y_pos in self._price_to_y(ticks).tolist()]
         
-        # Calculate rendering height
-        rendering_height = height_ratio * canvas_height
+        self.item_pools['grid_h'].draw(horizontal_lines)
         
-        # Calculate base coordinate
-        price_offset = (price - price_min)
-        base_y = price_offset / price_height_ratio
+        # Vertical grid lines at significant time points
+        current_tf = self.time_frames[self.label_tf_index]
+        units, interval = parse_time_frame(current_tf)
+        visible_start, visible_end, x_start = self._visible_range()
+        step = self.viewport.step
         
-        # Apply zoom transformation
-        zoom_factor = self.zoom_settings['scale_factor'][1]
-        midpoint = rendering_height / 2
-        zoomed_y = midpoint - zoom_factor * (base_y - midpoint)
+        rows, _ = self._time_label_index().visible(units, interval, visible_start, visible_end)
+        x_positions = x_start - (visible_end - 1 - rows) * step
+        x_positions = x_positions[(x_positions >= 0) & (x_positions <= self.canvas_width)]
+        vertical_lines = [(x_pos, 0, x_pos, self.canvas_height) for x_pos in x_positions.tolist()]
         
-        # Final adjustment for display
-        y_position = canvas_height - zoomed_y - (1 - height_ratio) * canvas_height / 2
+        self.item_pools['grid_v'].draw(vertical_lines)
         
-        return y_position
+        # Keep the grid behind the candles even after the pools grow
+        self.canvas.tag_lower("grid")
     
     def start_drag(self, event: tk.Event, axis: str) -> None:
         """
@@ -494,32 +1121,33 @@ class DragZoomApp:
             if delta != 0:
                 # Calculate new scale based on drag direction
                 zoom_direction = 1.02 if delta > 0 else 0.98
-                new_scale = self.zoom_settings['scale_factor'][axis_index] * zoom_direction
+                new_scale = self.viewport.scale[axis_index] * zoom_direction
                 
                 # Apply limits
-                min_scale = self.zoom_settings['min_scale'][axis_index]
+                min_scale = self._min_scale(axis_index)
                 max_scale = self.zoom_settings['max_scale'][axis_index]
                 new_scale = max(min_scale, min(new_scale, max_scale))
-                
-                # Prepare scale parameters
-                width = self.canvas.winfo_width()
-                height = self.canvas.winfo_height()
-                scale_change = new_scale / self.zoom_settings['scale_factor'][axis_index]
-                
-                # Create scale parameters based on axis
-                if axis == "y":
-                    scale_params = (width, height/2, 1, scale_change)
-                else:  # x-axis
-                    scale_params = (width, height/2, scale_change, 1)
+                scale_change = new_scale / self.viewport.scale[axis_index]
                 
                 # Check if we need to update label scale
-                self._update_label_scale(axis_index, new_scale)
+                if axis_index == 0:
+                    self._update_label_scale(new_scale)
                 
-                # Apply the scaling
-                self._apply_scaling(scale_params, axis_index)
+                # Zoom the viewport and the drawn items together
+                self._apply_scaling(axis_index, scale_change)
                 
-                # Update scale factor
-                self.zoom_settings['scale_factor'][axis_index] = new_scale
+                # Switch time frame when the candles get too small or too large,
+                # and refit the price axis to the new visible range
+                if axis_index == 0 and (self._update_time_frame() or self.auto_scale):
+                    self.request_redraw()
+                elif axis_index == 0:
+                    self._follow_viewport("grid")
+                else:
+                    if self.auto_scale:
+                        # Zooming the price axis by hand leaves auto-scale
+                        self.auto_scale = False
+                        self._draw_auto_scale_button()
+                    self._follow_viewport("price_labels", "grid")
             
             # Update last position
             if axis == "x":
@@ -527,57 +1155,182 @@ class DragZoomApp:
             else:
                 self.drag_state['last_y'] = current_pos
     
-    def _update_label_scale(self, axis_index: int, new_scale: float) -> None:
+    def _min_scale(self, axis_index: int) -> float:
         """
-        Update label scale and adjust timeframe index if necessary.
+        Get the zoom-out limit of an axis.
+        
+        Time frames are replaced by larger ones before their candles get
+        narrow, as long as a larger one still fills the canvas. Once none
+        does, the current time frame can be zoomed out further, down to
+        sub-pixel candles merged per pixel column.
         
         Args:
             axis_index: Axis index (0 for x, 1 for y)
-            new_scale: New scale value
         """
-        current_label_scale = self.zoom_settings['scale_label'][axis_index]
+        if axis_index == 0 and not self._larger_frame_fits():
+            return self.zoom_settings['min_scale_lod']
+        return self.zoom_settings['min_scale'][axis_index]
+    
+    def _larger_frame_fits(self) -> bool:
+        """
+        Tell whether switching to the next larger time frame is worthwhile.
+        
+        It is when that frame has at least a canvas width of bars, estimated
+        from the length of the whole history, so that zooming out on it
+        still has more bars to show.
+        """
+        tf_index = self.current_tf_index + 1
+        if tf_index == len(self.time_frames):
+            return False
+        return self.history_length / self._time_frame_ratio(0, tf_index) >= self.canvas_width
+    
+    def _update_label_scale(self, new_scale: float) -> None:
+        """
+        Update the time label scale and adjust the label time frame if necessary.
+        
+        Price labels need no such step: their ticks follow the price transform.
+        
+        Args:
+            new_scale: New horizontal scale value
+        """
+        current_label_scale = self.zoom_settings['scale_label']
         
         # Check if scale changed significantly
-        if axis_index == 1:  # Y-axis (price)
-            if new_scale > 2 * current_label_scale:
-                self.zoom_settings['scale_label'][axis_index] *= 2
-                self.draw_price_labels()
-            elif new_scale < current_label_scale / 2:
-                self.zoom_settings['scale_label'][axis_index] /= 2
-                self.draw_price_labels()
-        elif axis_index == 0:  # X-axis (time)
-            if new_scale > 2 * current_label_scale:
-                self.zoom_settings['scale_label'][axis_index] *= 2
-                self.label_tf_index = max(0, self.label_tf_index - 1)
-                self.draw_time_labels()
-            elif new_scale < current_label_scale / 2:
-                self.zoom_settings['scale_label'][axis_index] /= 2
-                self.label_tf_index = min(len(self.time_frames) - 1, self.label_tf_index + 1)
-                self.draw_time_labels()
-    
-    def _apply_scaling(self, scale_params: Tuple[float, float, float, float], axis_index: int) -> None:
-        """
-        Apply scaling to canvas elements.
+        if new_scale > 2 * current_label_scale:
+            self.zoom_settings['scale_label'] *= 2
+            self.label_tf_index = max(0, self.label_tf_index - 1)
+            self.request_redraw("time_labels")
+        elif new_scale < current_label_scale / 2:
+            self.zoom_settings['scale_label'] /= 2
+            self.label_tf_index = min(len(self.time_frames) - 1, self.label_tf_index + 1)
+            self.request_redraw("time_labels")
+    
+    def _update_time_frame(self) -> bool:
+        """
+        Pick the time frame matching the current horizontal zoom.
+        
+        Zooming out below the lower threshold switches to the next (larger)
+        time frame and zooming in to the upper threshold switches back, which
+        keeps the number of drawn candles bounded at any zoom level. A larger
+        time frame with too few bars to fill the canvas is not used; the
+        candles of the current one are merged per pixel column instead.
+        
+        Returns:
+            True if the time frame changed
+        """
+        lower, upper = self.zoom_settings['tf_switch']
+        start_index = self.current_tf_index
+        
+        while True:
+            scale = self.viewport.scale_x
+            if scale < lower and self._larger_frame_fits():
+                self._set_time_frame(self.current_tf_index + 1)
+            elif scale >= upper and self.current_tf_index > 0:
+                self._set_time_frame(self.current_tf_index - 1)
+            else:
+                break
+        
+        return self.current_tf_index != start_index
+    
+    def _set_time_frame(self, tf_index: int) -> None:
+        """
+        Display the data aggregated to another time frame.
+        
+        The horizontal scale is adjusted by the ratio between the two time
+        frames so that a given time span keeps the same width on screen, and
+        the newest visible bar stays at the same position.
         
         Args:
-            scale_params: (center_x, center_y, scale_x, scale_y)
-            axis_index: Axis index (0 for x, 1 for y)
+            tf_index: Index in ``self.time_frames`` of the new time frame
         """
-        center_x, center_y, scale_x, scale_y = scale_params
+        # Remember which moment is drawn at the right of the viewport: the
+        # end of the newest visible bar, i.e. just before the next bar starts
+        # (None when that bar is the newest one that can be drawn)
+        _, visible_end, x_start = self._visible_range()
+        next_row = self.window[0] + visible_end
+        if visible_end < self.data_length or (self.revealed is None and next_row < len(self.frame_store)):
+            anchor = self.frame_store.columns["Time"][next_row] - np.timedelta64(1, "ns")
+        else:
+            anchor = None
         
-        # Scale main canvas
-        self.canvas.scale("all", center_x, center_y, scale_x, scale_y)
+        # Rescale so that a time span keeps the same width on screen
+        ratio = self._time_frame_ratio(self.current_tf_index, tf_index)
+        self.viewport.zoom_x(ratio)
+        self.zoom_settings['scale_label'] *= ratio
+        self.current_tf_index = tf_index
+        self.frame_store = self._frame_store(tf_index)
+        
+        # Load the bars around the anchor
+        if anchor is None:
+            row = self._bar_count() - 1
+        else:
+            row = int(np.searchsorted(self.frame_store.columns["Time"], anchor, side="right")) - 1
+            row = min(max(row, 0), self._bar_count() - 1)
+        self._slice_window(*self._window_bounds(row))
+        
+        # Put the bar containing the anchor back at the same position
+        if anchor is None:
+            hidden_right = 0
+        else:
+            hidden_right = max(0, self.data_length - 1 - (row - self.window[0]))
+        self.viewport.anchor_newest(x_start + hidden_right * self.viewport.step)
+    
+    def _apply_scaling(self, axis_index: int, scale_change: float) -> None:
+        """
+        Zoom one axis of the viewport and scale the drawn items to match.
+        
+        Args:
+            axis_index: Axis index (0 for x, 1 for y)
+            scale_change: Ratio between the new and the current zoom
+        """
+        # Same origin as the viewport: right edge, middle of the canvas
+        center_x = self.viewport.width
+        center_y = self.viewport.height / 2
         
-        # Scale auxiliary canvases
         if axis_index == 0:  # X-axis
-            self.canvas_date.scale("all", center_x, center_y, scale_x, 1)
+            self.viewport.zoom_x(scale_change)
+            self.canvas.scale("all", center_x, center_y, scale_change, 1)
+            self.canvas_date.scale("all", center_x, center_y, scale_change, 1)
+            for pane in self._all_panes():
+                pane.canvas.scale("all", center_x, center_y, scale_change, 1)
         else:  # Y-axis
-            self.canvas_price.scale("all", center_x, center_y, 1, scale_y)
+            self.viewport.zoom_y(scale_change)
+            self.canvas.scale("all", center_x, center_y, 1, scale_change)
+            self.canvas_price.scale("all", center_x, center_y, 1, scale_change)
+    
+    def _follow_viewport(self, *layers: str) -> None:
+        """
+        Schedule what must be redrawn after the drawn items were moved or
+        scaled along with the viewport.
+        
+        The moved items already sit where a redraw would put them, so the
+        data layers are only recomputed when rows that were not drawn come
+        into view, when candles are merged per pixel column (the merged
+        blocks depend on the zoom) or when another window of store rows is
+        about to be loaded.
+        
+        Args:
+            *layers: Layers to redraw in any case
+        """
+        visible_start, visible_end, _ = self._visible_range()
+        drawn_start, drawn_end = self.drawn_range
+        if (
+            visible_start < drawn_start
+            or visible_end > drawn_end
+            or self.viewport.step < self.lod_threshold
+            or self._near_window_edge()
+        ):
+            layers += ("candles", "volume", "indicators", "time_labels", "grid")
+        if layers:
+            self.request_redraw(*layers)
     
     def drag_to_pan(self, event: tk.Event, axis: str) -> None:
         """
         Handle drag events for panning.
         
+        The viewport and the drawn items are translated by the same amount;
+        see ``_follow_viewport`` for what gets redrawn.
+        
         Args:
             event: Tkinter event
             axis: Pan axis ('canvas')
@@ -587,10 +1340,20 @@ class DragZoomApp:
             dx = event.x - self.drag_state['last_x']
             dy = event.y - self.drag_state['last_y']
             
-            # Move content on all canvases
+            # The price axis follows the visible candles in auto-scale mode
+            if self.auto_scale:
+                dy = 0
+            
+            # Move the viewport and the content on all canvases
+            self.viewport.pan(dx, dy)
             self.canvas.move('all', dx, dy)
             self.canvas_date.move('all', dx, 0)
             self.canvas_price.move('all', 0, dy)
+            for pane in self._all_panes():
+                pane.canvas.move('all', dx, 0)
+            
+            # Horizontal grid lines span the canvas and new ticks may show up
+            self._follow_viewport(*(("grid", "price_labels") if dy else ("grid",)))
             
             # Update last position
             self.drag_state['last_x'] = event.x
@@ -619,7 +1382,7 @@ class DragZoomApp:
         
         # Apply zoom to both axes
         for axis_index in range(2):
-            new_scale = self.zoom_settings['scale_factor'][axis_index]
+            new_scale = self.viewport.scale[axis_index]
             
             if zoom_in:
                 new_scale *= 1.1
@@ -627,26 +1390,33 @@ class DragZoomApp:
                 new_scale /= 1.1
             
             # Apply limits
-            min_scale = self.zoom_settings['min_scale'][axis_index]
+            min_scale = self._min_scale(axis_index)
             max_scale = self.zoom_settings['max_scale'][axis_index]
             new_scale = max(min_scale, min(new_scale, max_scale))
             
             # Calculate scale change
-            scale_change = new_scale / self.zoom_settings['scale_factor'][axis_index]
+            scale_change = new_scale / self.viewport.scale[axis_index]
             
-            # Update scale factor
-            self.zoom_settings['scale_factor'][axis_index] = new_scale
+            # Update the viewport (everything is redrawn below)
+            if axis_index == 0:
+                self.viewport.zoom_x(scale_change)
+            else:
+                self.viewport.zoom_y(scale_change)
             
             # Check if we need to update label scale
-            self._update_label_scale(axis_index, new_scale)
+            if axis_index == 0:
+                self._update_label_scale(new_scale)
         
-        # Redraw chart
-        self.draw_chart()
+        # Switch time frame when the candles get too small or too large
+        self._update_time_frame()
+        
+        # Redraw chart once for all the wheel events of this frame
+        self.request_redraw()
 
 
 # Example usage
 if __name__ == "__main__":
-    df = pd.read_excel("./data/historique/donne.xlsx")
+    df = load_history("./data/historique/donne.xlsx")
     
     # Create Tkinter app
     root = tk.Tk()
@@ -0,0 +1,161 @@
+from typing import Dict, Tuple
+
+import numpy as np
+
+from chart_geometry import price_transform
+
+
+class Viewport:
+    """
+    The mapping between data coordinates (row, price) and canvas pixels.
+
+    Horizontally, the newest row is anchored at ``x_center`` (in unzoomed
+    pixels) and every older row is ``step`` pixels further left; zooming is
+    applied around the right edge of the canvas. Vertically, prices go
+    through the affine ``price_transform`` of the price range, zoomed around
+    the middle of the canvas, then shifted by ``y_offset``.
+
+    Every drawing function and hit-test reads this object, and every
+    interaction updates it. The same pans and zooms can then be applied to
+    the drawn items with ``canvas.move``/``canvas.scale`` (see
+    ``pan``/``zoom_x``/``zoom_y``), so what is on screen always matches the
+    model and redraws are only needed when other rows come into view.
+    """
+
+    def __init__(self, width: float, height: float, candle_space: float, x_center: float):
+        """
+        Initialize the viewport without zoom or pan.
+
+        Args:
+            width: Canvas width in pixels
+            height: Canvas height in pixels
+            candle_space: Distance between two bars at zoom 1, in pixels
+            x_center: x-coordinate of the newest bar at zoom 1
+        """
+        self.width = width
+        self.height = height
+        self.candle_space = candle_space
+        self.x_center = x_center
+        self.y_offset = 0.0
+        self.scale_x = 1.0
+        self.scale_y = 1.0
+        self.graph_params: Dict[str, float] = {}
+
+    @property
+    def scale(self) -> Tuple[float, float]:
+        """Zoom factors as (x, y)."""
+        return self.scale_x, self.scale_y
+
+    @property
+    def step(self) -> float:
+        """Distance between two bars, in pixels."""
+        return self.candle_space * self.scale_x
+
+    @property
+    def x_newest(self) -> float:
+        """x-coordinate of the newest bar (which may be off screen)."""
+        return self.width + (self.x_center - self.width) * self.scale_x
+
+    def set_price_range(self, price_min: float, price_height_ratio: float, height_ratio: float) -> None:
+        """
+        Set the prices mapped to the chart area.
+
+        Args:
+            price_min: Price at the bottom of the chart area
+            price_height_ratio: Price units per pixel at zoom 1
+            height_ratio: Fraction of the canvas height used by the chart area
+        """
+        self.graph_params = {
+            'price_min': price_min,
+            'price_height_ratio': price_height_ratio,
+            'height_ratio': height_ratio,
+            'canvas_height': self.height
+        }
+
+    def price_transform(self) -> Tuple[float, float]:
+        """
+        Get the price-to-y mapping as ``y = a * price + b``.
+
+        Returns:
+            Tuple of (a, b)
+        """
+        a, b = price_transform(self.graph_params, self.scale_y)
+        return a, b + self.y_offset
+
+    def price_to_y(self, prices):
+        """Convert prices (scalar or array) to y-coordinates."""
+        a, b = self.price_transform()
+        return prices * a + b
+
+    def y_to_price(self, y):
+        """Convert y-coordinates (scalar or array) to prices."""
+        a, b = self.price_transform()
+        return (y - b) / a
+
+    def x_to_row(self, x: float, data_length: int) -> int:
+        """
+        Find the row drawn nearest to an x-coordinate.
+
+        Args:
+            x: x-coordinate on the canvas
+            data_length: Number of drawable rows
+
+        Returns:
+            Row position, possibly outside ``[0, data_length)``
+        """
+        return data_length - 1 - int(round((self.x_newest - x) / self.step))
+
+    def visible_range(self, data_length: int) -> Tuple[int, int, float]:
+        """
+        Compute the slice of rows that falls inside the canvas.
+
+        Args:
+            data_length: Number of drawable rows
+
+        Returns:
+            Tuple of (start, end, x_start) where rows ``[start, end)`` are
+            visible and ``x_start`` is the x-coordinate of row ``end - 1``
+        """
+        step = self.step
+        x_newest = self.x_newest
+
+        # Skip bars pushed past the right edge of the canvas
+        hidden_right = max(0, int(np.ceil((x_newest - self.width) / step)))
+        visible_end = max(0, data_length - hidden_right)
+        x_start = x_newest - hidden_right * step
+
+        # Keep only as many bars as fit in the canvas width
+        visible_count = int(max(0.0, x_start) / step) + 2
+        visible_start = max(0, visible_end - visible_count)
+
+        return visible_start, visible_end, x_start
+
+    def pan(self, dx: float, dy: float) -> None:
+        """
+        Move the content by a number of pixels.
+
+        The drawn items follow with ``canvas.move(..., dx, dy)``.
+        """
+        self.x_center += dx / self.scale_x
+        self.y_offset += dy
+
+    def zoom_x(self, factor: float) -> None:
+        """
+        Zoom horizontally around the right edge of the canvas.
+
+        The drawn items follow with ``canvas.scale(..., width, height / 2, factor, 1)``.
+        """
+        self.scale_x *= factor
+
+    def zoom_y(self, factor: float) -> None:
+        """
+        Zoom vertically around the middle of the canvas.
+
+        The drawn items follow with ``canvas.scale(..., width, height / 2, 1, factor)``.
+        """
+        self.scale_y *= factor
+        self.y_offset *= factor
+
+    def anchor_newest(self, x_newest: float) -> None:
+        """Put the newest bar at a given x-coordinate without changing the zoom."""
+        self.x_center = self.width + (x_newest - self.width) / self.scale_x